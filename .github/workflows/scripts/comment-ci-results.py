@@ -9,6 +9,15 @@ import sys
 import github
 from github.GithubException import GithubException
 
+# The resources used by the backtests, with their label and unit. Less is better, and differences
+# within the tolerance, relative to the previous value, are measurement noise
+RESOURCE_KEYS = {
+    "runtime_seconds": ("Runtime", " s"),
+    "cpu_seconds": ("CPU Time", " s"),
+    "peak_rss_mib": ("Peak RSS", " MiB"),
+}
+RESOURCE_TOLERANCE = 0.1
+
 
 def delete_previous_comments(commit, created_comment_ids, exchanges):
     comment_starts = tuple({f"# {exchange.capitalize()}" for exchange in exchanges})
@@ -29,8 +38,10 @@ def delete_previous_comments(commit, created_comment_ids, exchanges):
         comment.delete()
 
 
-def build_row_line(*, current_value, previous_value, higher_is_better=True, percentage=True):
-    if percentage is True:
+def build_row_line(*, current_value, previous_value, higher_is_better=True, percentage=True, unit=None, tolerance=0):
+    if unit is not None:
+        pct = unit
+    elif percentage is True:
         pct = " %"
     else:
         pct = ""
@@ -48,7 +59,9 @@ def build_row_line(*, current_value, previous_value, higher_is_better=True, perc
         lower = "\N{ROCKET}"
         higher = "\N{COLLISION SYMBOL}"
     row_line = ""
-    if current_value > previous_value:
+    if abs(current_value - previous_value) <= tolerance * abs(previous_value):
+        row_line += f" {same} | {current_value}{pct} |"
+    elif current_value > previous_value:
         row_line += f" {higher} | {current_value}{pct} |"
     elif current_value == previous_value:
         row_line += f" {same} | {current_value}{pct} |"
@@ -93,18 +106,53 @@ def comment_results(options, results_data):
                     comment_body += f"|     |      | Current | {previous_report_label} |\n"
                     comment_body += "|  --: | :--: |     --: |                     --: |\n"
 
-                    # Sort key, making sure buy tags are also sorted, but last in the list
+                    # Sort key, making sure the resources and buy tags are also sorted, but last in the list
                     buy_tags = []
+                    resources = []
                     sorted_keys = []
                     for key in sorted(timeranges[timerange]):
                         if key.startswith("buy_signal_"):
                             buy_tags.append(key)
                             continue
+                        if key in RESOURCE_KEYS:
+                            resources.append(key)
+                            continue
                         sorted_keys.append(key)
 
-                    for key in sorted_keys + buy_tags:
+                    for key in sorted_keys + resources + buy_tags:
                         row_line = "| "
-                        if key == "max_drawdown":
+                        if key in RESOURCE_KEYS:
+                            label, unit = RESOURCE_KEYS[key]
+                            current_value = get_value_for_report(
+                                results_data=results_data,
+                                exchange=exchange,
+                                currency=currency,
+                                strategy=strategy,
+                                timerange=timerange,
+                                report_name="Current",
+                                key=key,
+                                round_cases=1,
+                            )
+                            previous_value = get_value_for_report(
+                                results_data=results_data,
+                                exchange=exchange,
+                                currency=currency,
+                                strategy=strategy,
+                                timerange=timerange,
+                                report_name="Previous",
+                                key=key,
+                                round_cases=1,
+                            )
+                            row_line += f" {label } |"
+                            row_line += build_row_line(
+                                current_value=current_value,
+                                previous_value=previous_value,
+                                higher_is_better=False,
+                                unit=unit,
+                                tolerance=RESOURCE_TOLERANCE,
+                            )
+                            comment_body += f"{row_line}\n"
+                        elif key == "max_drawdown":
                             label = "Max Drawdown"
                             row_line += f" {label } |"
                             current_value = get_value_for_report(
@@ -1,94 +1,343 @@
-# pylint: disable=invalid-name,protected-access
+# pylint: disable=invalid-name
+"""
+Download the CI artifacts of the previous runs, of the current one, and of the latest releases.
+
+The workflow runs are listed page by page, looking up the artifacts of the candidate runs of each page
+concurrently. The artifacts are then downloaded concurrently, each zip archive being extracted while
+it downloads, member by member, without holding the archive in memory or on disk.
+
+Everything goes through one pooled HTTP session against ``--api-url``, the GitHub API by default, or
+any server answering the same few endpoints, for testing.
+"""
 import argparse
+import concurrent.futures
 import json
 import os
 import pathlib
 import pprint
+import shutil
+import struct
 import sys
+import tempfile
 import zipfile
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_API_URL = "https://api.github.com"
+# Concurrent requests, artifact lookups or downloads
+WORKERS = 8
+RUNS_PER_PAGE = 100
+CHUNK_SIZE = 512 * 1024
+# Seconds to wait for the connection, or for the next bytes of a response
+TIMEOUT = 60
+
+LOCAL_FILE_HEADER = struct.Struct("<IHHHHHIIIHH")
+LOCAL_FILE_HEADER_SIGNATURE = 0x04034B50
+DATA_DESCRIPTOR_SIGNATURE = 0x08074B50
+# Once past the members, the central directory, or the end of the archive
+CENTRAL_DIRECTORY_SIGNATURES = (0x02014B50, 0x06054B50, 0x06064B50)
+ZIP64_EXTRA_ID = 0x0001
+FLAG_ENCRYPTED = 0x1
+FLAG_DATA_DESCRIPTOR = 0x8
+FLAG_UTF8 = 0x800
+
+
+def github_session(token, workers=WORKERS):
+    """
+    An HTTP session authenticated against the GitHub API, pooling up to ``workers`` connections per host.
+    """
+    session = requests.Session()
+    session.headers.update({"Accept": "application/vnd.github+json", "Authorization": f"Bearer {token}"})
+    # Besides the pool size, retry the transient errors of a busy API
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=(500, 502, 503, 504), allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-import github
-from github.GithubException import GithubException
 
+def get_json(session, url, **params):
+    response = session.get(url, params=params, timeout=TIMEOUT)
+    response.raise_for_status()
+    return response.json()
 
-def get_artifact_url(workflow_run, name):
-    _, data = workflow_run._requester.requestJsonAndCheck("GET", workflow_run.artifacts_url)
+
+def get_previous_releases(session, options):
+    """
+    The ``options.releases`` latest tags, as ``(name, sha)`` tuples.
+    """
+    if not options.releases:
+        return []
+    tags = get_json(session, f"{options.api_url}/repos/{options.repo}/tags", per_page=options.releases)
+    return [(tag["name"], tag["commit"]["sha"]) for tag in tags[: options.releases]]
+
+
+def iter_workflow_runs(session, options):
+    """
+    Yield the pages of the workflow runs, the latest first.
+    """
+    url = f"{options.api_url}/repos/{options.repo}/actions/workflows/{options.workflow}/runs"
+    page = 1
+    while True:
+        workflow_runs = get_json(session, url, per_page=RUNS_PER_PAGE, page=page).get("workflow_runs", [])
+        if not workflow_runs:
+            return
+        yield workflow_runs
+        page += 1
+
+
+def get_artifact_url(session, workflow_run, name):
+    data = get_json(session, workflow_run["artifacts_url"], per_page=100)
     for artifact in data.get("artifacts", ()):
         if artifact["name"] == name:
             return artifact["archive_download_url"]
+    return None
+
 
+def find_runs(session, executor, options, releases):
+    """
+    Find the ``Current`` and ``Previous`` runs, and those of the ``releases``.
 
-def download_previous_artifacts(repo, options):
-    releases = get_previous_releases(repo, options.releases)
-    workflow = repo.get_workflow(options.workflow)
+    :return: A dictionary mapping each name to a ``(sha, artifact download url)`` tuple
+    """
     runs = {}
-    release_names = {release.name: release for release in releases}
-    for workflow_run in workflow.get_runs():
+    release_names = dict(releases)
+    current_run_id = os.environ.get("GITHUB_RUN_ID")
+
+    def is_candidate(workflow_run):
+        return (
+            ("Previous" not in runs and workflow_run["head_branch"] == options.branch)
+            or ("Current" not in runs and str(workflow_run["id"]) == current_run_id)
+            or workflow_run["head_branch"] in release_names
+        )
+
+    for workflow_runs in iter_workflow_runs(session, options):
+        # The artifacts of the page candidate runs are looked up at once, then the runs walked in order
+        candidates = [workflow_run for workflow_run in workflow_runs if is_candidate(workflow_run)]
+        lookups = {
+            workflow_run["id"]: executor.submit(get_artifact_url, session, workflow_run, options.name)
+            for workflow_run in candidates
+        }
+        for workflow_run in workflow_runs:
+            if "Current" in runs and "Previous" in runs and not release_names:
+                return runs
+            if workflow_run["id"] not in lookups:
+                continue
+            artifact_url = lookups[workflow_run["id"]].result()
+            if "Previous" not in runs and workflow_run["head_branch"] == options.branch and artifact_url:
+                runs["Previous"] = (workflow_run["head_sha"], artifact_url)
+                continue
+            if "Current" not in runs and str(workflow_run["id"]) == current_run_id:
+                runs["Current"] = (os.environ["GITHUB_SHA"], artifact_url)
+                continue
+            if workflow_run["head_branch"] in release_names:
+                name = workflow_run["head_branch"]
+                runs[name] = (release_names.pop(name), artifact_url)
         if "Current" in runs and "Previous" in runs and not release_names:
             break
-        if "Previous" not in runs and workflow_run.head_branch == options.branch:
-            artifact_url = get_artifact_url(workflow_run, options.name)
-            if artifact_url:
-                runs["Previous"] = (workflow_run.head_sha, artifact_url)
-                continue
-        if "Current" not in runs and str(workflow_run.id) == os.environ.get("GITHUB_RUN_ID"):
-            runs["Current"] = (
-                os.environ["GITHUB_SHA"],
-                get_artifact_url(workflow_run, options.name),
-            )
-            continue
-        release = release_names.pop(workflow_run.head_branch, None)
-        if release:
-            runs[release.name] = (release.commit.sha, get_artifact_url(workflow_run, options.name))
-
-    print(f"Collected Runs:\n{pprint.pformat(runs)}", file=sys.stderr, flush=True)
-    reports_info_path = options.path / "reports-info.json"
-    if reports_info_path.exists():
-        reports_info = json.loads(reports_info_path.read_text())
-    else:
-        reports_info = {}
-    if options.exchange not in reports_info:
-        reports_info[options.exchange] = {}
-    for name, (sha, url) in runs.items():
-        if not url:
-            print(f"Did not find a download url for {name}", file=sys.stderr, flush=True)
-            reports_info[options.exchange][name] = {
-                "sha": sha,
-                "path": str(options.path / "current"),
-            }
-            continue
-        print(f"Downloading {name} {url}....", file=sys.stderr, flush=True)
-        # While pygithub doesn't support GH actions and their Artifacts interactions
-        # We doit the hacky way
-        req_headers = {}
-        repo._requester._Requester__authenticate(url, req_headers, None)
-        response = repo._requester._Requester__connection.session.get(url, headers=req_headers, allow_redirects=True)
-        if response.status_code == 200:
-            outfile = options.path / f"{name}-{options.name}.zip"
-            with open(outfile, "wb") as wfh:
-                for data in response.iter_content(chunk_size=512 * 1024):
-                    if data:
-                        wfh.write(data)
-            print(f"Wrote {outfile}", file=sys.stderr, flush=True)
-            outdir = options.path / name.lower()
-            if not outdir.is_dir():
-                outdir.mkdir()
-            zipfile.ZipFile(outfile).extractall(path=outdir)
-            outfile.unlink()
-            reports_info[options.exchange][name] = {"sha": sha, "path": str(outdir.resolve())}
-    reports_info_path.write_text(json.dumps(reports_info))
+    return runs
+
+
+class UnsupportedZipStream(Exception):
+    """
+    The archive can't be extracted while streaming it.
+    """
+
+
+class _StreamReader:
+    """
+    Read exact amounts from a stream, with the data read too far pushed back.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffer = b""
+
+    def read(self, size):
+        """
+        Read up to ``size`` bytes, less only at the end of the stream.
+        """
+        while len(self.buffer) < size:
+            chunk = self.stream.read(max(size - len(self.buffer), CHUNK_SIZE))
+            if not chunk:
+                break
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+    def read_exact(self, size):
+        data = self.read(size)
+        if len(data) != size:
+            raise zipfile.BadZipFile("Truncated zip archive")
+        return data
 
+    def unread(self, data):
+        self.buffer = data + self.buffer
 
-def get_previous_releases(repo, latest_n_releases):
-    releases = []
-    for tag in repo.get_tags():
-        if len(releases) == latest_n_releases:
+
+def _member_path(outdir, name):
+    # Like zipfile, drop the absolute path and the parent directory parts of the member names
+    parts = [part for part in name.replace("\\", "/").split("/") if part not in ("", ".", "..")]
+    return outdir.joinpath(*parts) if parts else None
+
+
+def _zip64_sizes(extra, compressed_size, file_size):
+    """
+    The member sizes, from its zip64 extra field when it has one, and whether it has one.
+    """
+    offset = 0
+    while offset + 4 <= len(extra):
+        header_id, size = struct.unpack_from("<HH", extra, offset)
+        if header_id == ZIP64_EXTRA_ID:
+            values = list(struct.unpack_from(f"<{size // 8}Q", extra, offset + 4))
+            if file_size == 0xFFFFFFFF and values:
+                file_size = values.pop(0)
+            if compressed_size == 0xFFFFFFFF and values:
+                compressed_size = values.pop(0)
+            return compressed_size, file_size, True
+        offset += 4 + size
+    return compressed_size, file_size, False
+
+
+def _copy_member(reader, output, method, compressed_size, descriptor):
+    """
+    Write the member data to ``output``, returning its CRC and size.
+    """
+    crc, size = 0, 0
+    decompressor = zlib.decompressobj(-zlib.MAX_WBITS) if method == zipfile.ZIP_DEFLATED else None
+    remaining = None if descriptor else compressed_size
+    while remaining is None or remaining > 0:
+        chunk = reader.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+        if not chunk:
+            raise zipfile.BadZipFile("Truncated zip archive")
+        if remaining is not None:
+            remaining -= len(chunk)
+        data = decompressor.decompress(chunk) if decompressor else chunk
+        crc, size = zlib.crc32(data, crc), size + len(data)
+        output.write(data)
+        if decompressor is not None and decompressor.eof:
+            # Past the compressed data, the data descriptor
+            reader.unread(decompressor.unused_data)
             break
-        releases.append(tag)
-    return releases
+    return crc, size
+
+
+def extract_zip_stream(stream, outdir):
+    """
+    Extract the zip archive read from ``stream`` into ``outdir``, one member at a time, as it is read.
+
+    Only the local headers preceding each member are read, the central directory at the end of the
+    archive is skipped. The members must be stored, or deflated, and not encrypted, and the stored ones
+    must have their sizes in their local header.
+
+    :return: The extracted member names
+    :raises UnsupportedZipStream: On a member which can't be extracted from the stream
+    """
+    reader = _StreamReader(stream)
+    names = []
+    while True:
+        signature = reader.read(4)
+        if len(signature) < 4 or struct.unpack("<I", signature)[0] in CENTRAL_DIRECTORY_SIGNATURES:
+            return names
+        if struct.unpack("<I", signature)[0] != LOCAL_FILE_HEADER_SIGNATURE:
+            raise zipfile.BadZipFile("Bad zip member signature")
+        header = LOCAL_FILE_HEADER.unpack(signature + reader.read_exact(LOCAL_FILE_HEADER.size - 4))
+        _, _, flags, method, _, _, crc, compressed_size, file_size, name_length, extra_length = header
+        raw_name = reader.read_exact(name_length)
+        name = raw_name.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+        compressed_size, file_size, zip64 = _zip64_sizes(reader.read_exact(extra_length), compressed_size, file_size)
+        descriptor = bool(flags & FLAG_DATA_DESCRIPTOR)
+        if flags & FLAG_ENCRYPTED or method not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+            raise UnsupportedZipStream(f"{name}: encrypted, or compressed with method {method}")
+        if descriptor and method == zipfile.ZIP_STORED:
+            raise UnsupportedZipStream(f"{name}: stored without its size")
+
+        path = _member_path(outdir, name)
+        if path is not None and name.endswith("/"):
+            path.mkdir(parents=True, exist_ok=True)
+            path = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        with (open(path, "wb") if path is not None else open(os.devnull, "wb")) as output:
+            actual_crc, actual_size = _copy_member(reader, output, method, compressed_size, descriptor)
+        if descriptor:
+            signature = reader.read_exact(4)
+            if struct.unpack("<I", signature)[0] != DATA_DESCRIPTOR_SIGNATURE:
+                # The signature is optional
+                reader.unread(signature)
+            crc, _, file_size = struct.unpack("<IQQ" if zip64 else "<III", reader.read_exact(20 if zip64 else 12))
+        if (actual_crc, actual_size) != (crc, file_size):
+            raise zipfile.BadZipFile(f"Bad CRC or size for {name}")
+        names.append(name)
+
+
+def download_artifact(session, url, outdir):
+    """
+    Download the zip archive at ``url``, extracting it into ``outdir`` while it downloads.
+
+    An archive which can't be extracted while streaming it is downloaded again to a temporary file.
 
+    :return: Whether the artifact was downloaded
+    """
+    outdir.mkdir(parents=True, exist_ok=True)
+    with session.get(url, stream=True, timeout=TIMEOUT) as response:
+        if response.status_code != 200:
+            print(f"Failed to download {url}: {response.status_code}", file=sys.stderr, flush=True)
+            return False
+        response.raw.decode_content = True
+        try:
+            names = extract_zip_stream(response.raw, outdir)
+            print(f"Extracted {len(names)} files to {outdir}", file=sys.stderr, flush=True)
+            return True
+        except UnsupportedZipStream as exc:
+            print(f"Can't extract {url} while downloading it, {exc}", file=sys.stderr, flush=True)
 
-def main():
+    with tempfile.TemporaryFile() as archive, session.get(url, stream=True, timeout=TIMEOUT) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, archive, CHUNK_SIZE)
+        zipfile.ZipFile(archive).extractall(path=outdir)
+    print(f"Extracted {url} to {outdir}", file=sys.stderr, flush=True)
+    return True
+
+
+def download_previous_artifacts(session, options):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=options.workers) as executor:
+        runs = find_runs(session, executor, options, get_previous_releases(session, options))
+        print(f"Collected Runs:\n{pprint.pformat(runs)}", file=sys.stderr, flush=True)
+        downloads = {
+            name: executor.submit(download_artifact, session, url, options.path / name.lower())
+            for name, (_, url) in runs.items()
+            if url
+        }
+
+        reports_info_path = options.path / "reports-info.json"
+        if reports_info_path.exists():
+            reports_info = json.loads(reports_info_path.read_text())
+        else:
+            reports_info = {}
+        if options.exchange not in reports_info:
+            reports_info[options.exchange] = {}
+        for name, (sha, url) in runs.items():
+            if not url:
+                print(f"Did not find a download url for {name}", file=sys.stderr, flush=True)
+                reports_info[options.exchange][name] = {
+                    "sha": sha,
+                    "path": str(options.path / "current"),
+                }
+                continue
+            if downloads[name].result():
+                reports_info[options.exchange][name] = {
+                    "sha": sha,
+                    "path": str((options.path / name.lower()).resolve()),
+                }
+    reports_info_path.write_text(json.dumps(reports_info))
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--repo", required=True, help="The Organization Repository")
     parser.add_argument("--exchange", required=True, help="The exchange name")
@@ -109,6 +358,17 @@ def main():
         default=3,
         help="Besides previous artifacts, how many previous release(tags) artifacts to get",
     )
+    parser.add_argument(
+        "--api-url",
+        default=os.environ.get("GITHUB_API_URL", DEFAULT_API_URL),
+        help="The GitHub API URL, defaults to $GITHUB_API_URL, or to %(default)s",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=WORKERS,
+        help="How many artifact lookups, or downloads, to run concurrently",
+    )
     parser.add_argument(
         "path",
         metavar="PATH",
@@ -119,21 +379,19 @@ def main():
     if not os.environ.get("GITHUB_TOKEN"):
         parser.exit(status=1, message="GITHUB_TOKEN environment variable not set")
 
-    options = parser.parse_args()
-
-    results_dir = pathlib.Path(options.path).resolve()
-    if not results_dir.is_dir():
-        results_dir.mkdir()
+    options = parser.parse_args(argv)
+    options.api_url = options.api_url.rstrip("/")
 
-    gh = github.Github(os.environ["GITHUB_TOKEN"])
-    repo = gh.get_repo(options.repo)
-    print(f"Loaded Repository: {repo.full_name}", file=sys.stderr, flush=True)
+    options.path = pathlib.Path(options.path).resolve()
+    if not options.path.is_dir():
+        options.path.mkdir()
 
-    try:
-        download_previous_artifacts(repo, options)
-        parser.exit(0)
-    except GithubException as exc:
-        parser.exit(1, message=str(exc))
+    with github_session(os.environ["GITHUB_TOKEN"], workers=options.workers) as session:
+        try:
+            download_previous_artifacts(session, options)
+            parser.exit(0)
+        except requests.RequestException as exc:
+            parser.exit(1, message=str(exc))
 
 
 if __name__ == "__main__":
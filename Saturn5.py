@@ -1,11 +1,19 @@
+import sys
+from datetime import datetime
 from datetime import timedelta
-from functools import reduce
+from pathlib import Path
 
-import freqtrade.vendor.qtpylib.indicators as qtpylib
-import talib.abstract as ta
+from freqtrade.strategy import DecimalParameter
+from freqtrade.strategy import IntParameter
 from freqtrade.strategy import IStrategy
 from pandas import DataFrame
 
+# The shared strategy code lives next to the strategy files
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from goddard import engine  # noqa: E402 pylint: disable=wrong-import-position
+from goddard import latency  # noqa: E402 pylint: disable=wrong-import-position
+
 
 def to_minutes(**timdelta_kwargs):
     return int(timedelta(**timdelta_kwargs).total_seconds() / 60)
@@ -31,37 +39,51 @@ class Saturn5(IStrategy):
     buy_signal_2 = True
     buy_signal_3 = True
 
+    # When running live or dry-run, only compute the indicators of the new candles. The EMA's then carry on
+    # from every candle seen since the bot started, like when backtesting, instead of starting over from the
+    # first candle of the window freqtrade keeps.
+    incremental_indicators = True
+
+    # Compute every indicator, not only the ones the enabled buy signals need, useful for charting
+    debug_indicators = False
+
+    # Store the indicators as float32, where precision allows, and the signals as int8 and categoricals
+    compact_dtypes = False
+
     # ROI table:
     minimal_roi = {
         "0": 0.05,
     }
 
     # Indicator values:
+    #
+    # The parameters can be hyperopted in the buy space. The indicators of every period in the ranges
+    # get computed once per pair, so keep the ranges tight, each period costs a column per candle.
 
     # Signal 1
-    s1_ema_xs = 3
-    s1_ema_sm = 5
-    s1_ema_md = 10
-    s1_ema_xl = 50
-    s1_ema_xxl = 240
+    s1_ema_xs = IntParameter(2, 5, default=3, space="buy")
+    s1_ema_sm = IntParameter(4, 8, default=5, space="buy")
+    s1_ema_md = IntParameter(8, 15, default=10, space="buy")
+    s1_ema_xl = IntParameter(40, 60, default=50, space="buy")
+    s1_ema_xxl = IntParameter(200, 280, default=240, space="buy")
 
     # Signal 2
     s2_ema_input = 50
     s2_ema_offset_input = -1
 
-    s2_bb_sma_length = 49
-    s2_bb_std_dev_length = 64
+    s2_bb_sma_length = IntParameter(40, 60, default=49, space="buy")
+    s2_bb_std_dev_length = IntParameter(50, 80, default=64, space="buy")
     s2_bb_lower_offset = 3
 
     s2_fib_sma_len = 50
     s2_fib_atr_len = 14
 
-    s2_fib_lower_value = 4.236
+    s2_fib_lower_value = DecimalParameter(3.0, 5.5, default=4.236, decimals=3, space="buy")
 
     s3_ema_long = 50
     s3_ema_short = 20
-    s3_ma_fast = 10
-    s3_ma_slow = 20
+    s3_ma_fast = IntParameter(6, 14, default=10, space="buy")
+    s3_ma_slow = IntParameter(15, 30, default=20, space="buy")
 
     @property
     def protections(self):
@@ -105,89 +127,16 @@ class Saturn5(IStrategy):
             },
         ]
 
-    def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+    def bot_loop_start(self, current_time: datetime, **kwargs) -> None:
+        # Starts the signal latency loop, see goddard/latency.py
+        latency.bot_loop_start(self)
 
-        # Adding EMA's into the dataframe
-        dataframe["s1_ema_xs"] = ta.EMA(dataframe, timeperiod=self.s1_ema_xs)
-        dataframe["s1_ema_sm"] = ta.EMA(dataframe, timeperiod=self.s1_ema_sm)
-        dataframe["s1_ema_md"] = ta.EMA(dataframe, timeperiod=self.s1_ema_md)
-        dataframe["s1_ema_xl"] = ta.EMA(dataframe, timeperiod=self.s1_ema_xl)
-        dataframe["s1_ema_xxl"] = ta.EMA(dataframe, timeperiod=self.s1_ema_xxl)
-
-        s2_ema_value = ta.EMA(dataframe, timeperiod=self.s2_ema_input)
-        s2_ema_xxl_value = ta.EMA(dataframe, timeperiod=200)
-        dataframe["s2_ema"] = s2_ema_value - s2_ema_value * self.s2_ema_offset_input
-        dataframe["s2_ema_xxl_off"] = s2_ema_xxl_value - s2_ema_xxl_value * self.s2_fib_lower_value
-        dataframe["s2_ema_xxl"] = ta.EMA(dataframe, timeperiod=200)
-
-        s2_bb_sma_value = ta.SMA(dataframe, timeperiod=self.s2_bb_sma_length)
-        s2_bb_std_dev_value = ta.STDDEV(dataframe, self.s2_bb_std_dev_length)
-        dataframe["s2_bb_std_dev_value"] = s2_bb_std_dev_value
-        dataframe["s2_bb_lower_band"] = s2_bb_sma_value - (s2_bb_std_dev_value * self.s2_bb_lower_offset)
-
-        s2_fib_atr_value = ta.ATR(dataframe, timeframe=self.s2_fib_atr_len)
-        s2_fib_sma_value = ta.SMA(dataframe, timeperiod=self.s2_fib_sma_len)
-
-        dataframe["s2_fib_lower_band"] = s2_fib_sma_value - s2_fib_atr_value * self.s2_fib_lower_value
-
-        s3_bollinger = qtpylib.bollinger_bands(qtpylib.typical_price(dataframe), window=20, stds=3)
-        dataframe["s3_bb_lowerband"] = s3_bollinger["lower"]
-
-        dataframe["s3_ema_long"] = ta.EMA(dataframe, timeperiod=self.s3_ema_long)
-        dataframe["s3_ema_short"] = ta.EMA(dataframe, timeperiod=self.s3_ema_short)
-        dataframe["s3_fast_ma"] = ta.EMA(dataframe["volume"] * dataframe["close"], self.s3_ma_fast) / ta.EMA(
-            dataframe["volume"], self.s3_ma_fast
-        )
-        dataframe["s3_slow_ma"] = ta.EMA(dataframe["volume"] * dataframe["close"], self.s3_ma_slow) / ta.EMA(
-            dataframe["volume"], self.s3_ma_slow
-        )
-
-        # Volume weighted MACD
-        dataframe["fastMA"] = ta.EMA(dataframe["volume"] * dataframe["close"], 12) / ta.EMA(dataframe["volume"], 12)
-        dataframe["slowMA"] = ta.EMA(dataframe["volume"] * dataframe["close"], 26) / ta.EMA(dataframe["volume"], 26)
-        dataframe["vwmacd"] = dataframe["fastMA"] - dataframe["slowMA"]
-        dataframe["signal"] = ta.EMA(dataframe["vwmacd"], 9)
-        dataframe["hist"] = dataframe["vwmacd"] - dataframe["signal"]
-
-        return dataframe
+    def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
+        return engine.populate_indicators(self, dataframe, metadata)
 
     def populate_buy_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        # basic buy methods to keep the strategy simple
-
-        if self.buy_signal_1:
-            conditions = [
-                dataframe["vwmacd"] < dataframe["signal"],
-                dataframe["low"] < dataframe["s1_ema_xxl"],
-                dataframe["close"] > dataframe["s1_ema_xxl"],
-                qtpylib.crossed_above(dataframe["s1_ema_sm"], dataframe["s1_ema_md"]),
-                dataframe["s1_ema_xs"] < dataframe["s1_ema_xl"],
-                dataframe["volume"] > 0,
-            ]
-            dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_1")
-
-        if self.buy_signal_2:
-            conditions = [
-                qtpylib.crossed_above(dataframe["s2_fib_lower_band"], dataframe["s2_bb_lower_band"]),
-                dataframe["close"] < dataframe["s2_ema"],
-                dataframe["volume"] > 0,
-            ]
-            dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_2")
-
-        if self.buy_signal_3:
-            conditions = [
-                dataframe["low"] < dataframe["s3_bb_lowerband"],
-                dataframe["high"] > dataframe["s3_slow_ma"],
-                dataframe["high"] < dataframe["s3_ema_long"],
-                dataframe["volume"] > 0,
-            ]
-            dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_3")
-
-        if not all([self.buy_signal_1, self.buy_signal_2, self.buy_signal_3]):
-            dataframe.loc[(), "buy"] = 0
-
-        return dataframe
+        return engine.populate_buy_trend(self, dataframe, metadata)
 
     def populate_sell_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         # This is essentailly ignored as we're using strict ROI / Stoploss / TTP sale scenarios
-        dataframe.loc[(), "sell"] = 0
-        return dataframe
+        return engine.populate_sell_trend(self, dataframe, metadata)
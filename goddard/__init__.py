@@ -0,0 +1,3 @@
+"""
+Shared code used by the Goddard strategies.
+"""
@@ -0,0 +1,660 @@
+"""
+Indicator and buy signal logic shared by the Goddard strategies.
+
+The buy signals of ``Apollo11`` and ``Saturn5`` are the same, the strategies only differ in the way
+they sell. When several strategies are loaded in the same process, for example when backtesting with
+``--strategy-list Saturn5 Apollo11``, the indicators computed for a pair by the first strategy are
+reused by the next one instead of being computed again.
+
+When running live or dry-run, and the strategy sets ``incremental_indicators``, the indicators of the
+candles appended to the candles window are streamed, see :py:mod:`goddard.streaming`, instead of
+recomputing every indicator over the whole window. Streaming goes on as the window slides forward, as
+freqtrade's does once it holds the exchange candle limit, see :py:func:`stream_indicators`. The streamed
+indicators are held in a fixed capacity :py:class:`~goddard.ringbuffer.CandleRing` per pair, sized to
+the window.
+"""
+import contextlib
+import logging
+from collections import OrderedDict
+from typing import Any
+from typing import Dict
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+import numpy as np
+import talib.abstract as ta
+from freqtrade.enums import RunMode
+from freqtrade.exceptions import OperationalException
+from freqtrade.strategy import IntParameter
+from pandas import Categorical
+from pandas import concat
+from pandas import DataFrame
+
+from goddard import latency
+from goddard import profiling
+from goddard.indicators import bollinger_bands
+from goddard.indicators import crossed_above
+from goddard.indicators import typical_price
+from goddard.memo import IndicatorMemo
+from goddard.ringbuffer import CandleRing
+from goddard.streaming import IncrementalIndicators
+
+log = logging.getLogger(__name__)
+
+# The run modes where indicators are streamed when the strategy sets ``incremental_indicators``
+INCREMENTAL_RUNMODES = (RunMode.LIVE, RunMode.DRY_RUN)
+# Streaming only kicks in for a handful of new candles, more than that and it's a new candles window
+INCREMENTAL_MAX_NEW_CANDLES = 3
+# Seed the rolling windows again once in a while so that the rounding errors of their running sums, the
+# only difference with a recompute of the candles seen since seeding, do not accumulate
+INCREMENTAL_RESYNC_CANDLES = 96
+# The candles the window may grow by while streaming, on top of the candles it held when its indicators
+# were computed, each pair ring holds that many more candles. A window growing past it is recomputed.
+INCREMENTAL_RING_HEADROOM = 96
+# The run modes where the indicators of every hyperopt candidate are computed once, see IndicatorBank
+BANK_RUNMODES = (RunMode.HYPEROPT,)
+# The fewest pairs the indicator caches hold, when the strategy pairlist is not known
+CACHE_MIN_PAIRS = 1
+
+
+# Every indicator column, in the order they're added to the dataframe
+INDICATOR_COLUMNS = (
+    "s1_ema_xs",
+    "s1_ema_sm",
+    "s1_ema_md",
+    "s1_ema_xl",
+    "s1_ema_xxl",
+    "s2_ema",
+    "s2_ema_xxl_off",
+    "s2_ema_xxl",
+    "s2_bb_std_dev_value",
+    "s2_bb_lower_band",
+    "s2_fib_lower_band",
+    "s3_bb_lowerband",
+    "s3_ema_long",
+    "s3_ema_short",
+    "s3_fast_ma",
+    "s3_slow_ma",
+    "fastMA",
+    "slowMA",
+    "vwmacd",
+    "signal",
+    "hist",
+)
+
+# The indicator columns read by each buy signal. The columns not listed here are only computed, for
+# charting, when the strategy sets ``debug_indicators``.
+SIGNAL_INDICATORS = {
+    "buy_signal_1": ("vwmacd", "signal", "s1_ema_xxl", "s1_ema_sm", "s1_ema_md", "s1_ema_xs", "s1_ema_xl"),
+    "buy_signal_2": ("s2_fib_lower_band", "s2_bb_lower_band", "s2_ema"),
+    "buy_signal_3": ("s3_bb_lowerband", "s3_slow_ma", "s3_ema_long"),
+}
+
+
+# The indicators compared against each other by the buy signals. They are kept as float64 when the
+# strategy sets ``compact_dtypes``, near their crossings the float32 rounding would flip signals.
+FLOAT64_INDICATORS = (
+    "s1_ema_xs",
+    "s1_ema_sm",
+    "s1_ema_md",
+    "s1_ema_xl",
+    "s2_bb_lower_band",
+    "s2_fib_lower_band",
+    "vwmacd",
+    "signal",
+)
+
+BUY_SIGNALS = tuple(SIGNAL_INDICATORS)
+
+# The fast, slow and signal periods of the volume weighted MACD
+VWMACD_PERIODS = (12, 26, 9)
+
+
+class IndicatorParameters(NamedTuple):
+    """
+    The strategy attributes which have an influence on the computed indicators.
+    """
+
+    s1_ema_xs: int
+    s1_ema_sm: int
+    s1_ema_md: int
+    s1_ema_xl: int
+    s1_ema_xxl: int
+    s2_ema_input: int
+    s2_ema_offset_input: float
+    s2_bb_sma_length: int
+    s2_bb_std_dev_length: int
+    s2_bb_lower_offset: float
+    s2_fib_sma_len: int
+    s2_fib_atr_len: int
+    s2_fib_lower_value: float
+    s3_ema_long: int
+    s3_ema_short: int
+    s3_ma_fast: int
+    s3_ma_slow: int
+
+    @classmethod
+    def from_strategy(cls, strategy) -> "IndicatorParameters":
+        # Either plain values or hyperoptable parameters
+        values = {name: getattr(strategy, name) for name in cls._fields}
+        return cls(**{name: getattr(value, "value", value) for name, value in values.items()})
+
+
+class _CachedIndicators(NamedTuple):
+    fingerprint: tuple
+    params: IndicatorParameters
+    #: The indicator columns, one array per column, attached as is to the dataframes
+    indicators: Dict[str, np.ndarray]
+    last_date: object
+    last_close: float
+    state: Optional[IncrementalIndicators] = None
+    ring: Optional[CandleRing] = None
+
+
+class _PairCache(OrderedDict):
+    """
+    Entries keyed by ``(pair, timeframe)``, forgetting the least recently used ones beyond a size.
+    """
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def put(self, key, value, size: int):
+        """
+        Store ``value``, then evict the least recently used entries until at most ``size`` are left.
+        """
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > size:
+            self.popitem(last=False)
+
+
+def cache_size(strategy) -> int:
+    """
+    The number of pairs the indicator caches hold, the pairs of the strategy pairlist, or of its
+    configured whitelist when the pairlists are not loaded.
+    """
+    try:
+        pairs = strategy.dp.current_whitelist()
+    except (AttributeError, OperationalException):
+        pairs = strategy.config.get("exchange", {}).get("pair_whitelist", ())
+    return max(len(pairs), CACHE_MIN_PAIRS)
+
+
+# Computed indicators, one entry per (pair, timeframe), replaced whenever a new candle comes in. The
+# cache holds the pairs of the pairlist, so, the strategies of a ``--strategy-list`` backtest share them,
+# but a pairlist which changes over time does not keep the indicators of the pairs it dropped.
+_INDICATORS_CACHE: "_PairCache[Tuple[str, str], _CachedIndicators]" = _PairCache()
+
+
+def clear_cache():
+    """
+    Forget every cached indicator frame and indicator bank.
+    """
+    _INDICATORS_CACHE.clear()
+    _INDICATOR_BANKS.clear()
+
+
+def _fingerprint(dataframe: DataFrame) -> tuple:
+    """
+    Identify the candles of ``dataframe`` without hashing the whole frame.
+    """
+    if dataframe.empty:
+        return (0,)
+    return (
+        len(dataframe),
+        dataframe["date"].iloc[0],
+        dataframe["date"].iloc[-1],
+        dataframe["close"].iloc[-1],
+    )
+
+
+def required_indicators(strategy) -> Tuple[str, ...]:
+    """
+    The indicator columns needed by the strategy enabled buy signals, or every indicator column when
+    the strategy sets ``debug_indicators``.
+    """
+    if strategy.debug_indicators:
+        return INDICATOR_COLUMNS
+    required = set()
+    for signal, columns in SIGNAL_INDICATORS.items():
+        if getattr(strategy, signal):
+            required.update(columns)
+    return tuple(column for column in INDICATOR_COLUMNS if column in required)
+
+
+def hyperopt_candidates(strategy) -> Dict[str, Sequence[int]]:
+    """
+    The values each indicator period can take during the current hyperopt, for the optimized
+    ``IntParameter`` strategy attributes.
+
+    The decimal parameters are only multipliers applied to the banked indicators, they need no
+    candidates of their own.
+    """
+    if strategy.config.get("runmode") not in BANK_RUNMODES:
+        return {}
+    candidates = {}
+    for name in IndicatorParameters._fields:
+        parameter = getattr(strategy, name)
+        if isinstance(parameter, IntParameter) and parameter.in_space and parameter.optimize:
+            # Not the parameter range, which only holds the current value while the epochs run
+            candidates[name] = list(range(parameter.low, parameter.high + 1))
+    return candidates
+
+
+class IndicatorBank:
+    """
+    The indicators of a pair for every candidate value of the hyperopted periods.
+
+    Hyperopt only calls ``populate_indicators`` once per pair, while each epoch may ask for other
+    periods. The bank computes every candidate EMA, SMA, STDDEV, ATR and VWMA once, through an
+    :py:class:`~goddard.memo.IndicatorMemo`, so an epoch only derives the indicator columns of its
+    parameters from memoized arrays. It holds one array per candidate, that's ``candidates * candles * 8``
+    bytes per pair.
+
+    :param dataframe: The pair candles
+    :param params: The strategy current indicator parameters
+    :param candidates: The values of each hyperopted period, see :py:func:`hyperopt_candidates`
+    :param columns: The indicator columns the epochs need
+    """
+
+    def __init__(
+        self,
+        dataframe: DataFrame,
+        params: IndicatorParameters,
+        candidates: Dict[str, Sequence[int]],
+        columns: Sequence[str],
+        profiler: Optional[profiling.Profiler] = None,
+        pair: Optional[str] = None,
+    ):
+        self.fingerprint = _fingerprint(dataframe)
+        self.candidates = candidates
+        self.memo = IndicatorMemo(dataframe, profiler=profiler, pair=pair)
+        variants = [params._replace(**{name: value}) for name, values in candidates.items() for value in values]
+        # A single VWMA bank holding every candidate period
+        vwma_periods = {period for variant in [params] + variants for period in _vwma_periods(variant).values()}
+        self.memo.vwmas(sorted(vwma_periods), macd=VWMACD_PERIODS)
+        for variant in variants:
+            compute_indicators(dataframe, variant, columns, memo=self.memo)
+
+    def indicators(self, params: IndicatorParameters, columns: Sequence[str]) -> DataFrame:
+        """
+        The indicator columns for ``params``, computed from the banked indicators.
+        """
+        return compute_indicators(self.memo.dataframe, params, columns, memo=self.memo)
+
+
+# Indicator banks, one entry per (pair, timeframe), only used when hyperopting indicator periods. Bounded
+# like the indicators cache.
+_INDICATOR_BANKS: "_PairCache[Tuple[str, str], IndicatorBank]" = _PairCache()
+
+
+def indicator_bank(
+    strategy, dataframe: DataFrame, metadata: dict, profiler: Optional[profiling.Profiler] = None
+) -> Optional[IndicatorBank]:
+    """
+    Return the :py:class:`IndicatorBank` of the pair candles, ``None`` when not hyperopting any period.
+
+    Banks are kept per process. Hyperopt epochs running in worker processes build their own bank on the
+    first epoch of a pair, and reuse it afterwards.
+    """
+    candidates = hyperopt_candidates(strategy)
+    if not candidates:
+        return None
+    key = (metadata["pair"], strategy.timeframe)
+    bank = _INDICATOR_BANKS.get(key)
+    if bank is None or bank.fingerprint != _fingerprint(dataframe) or bank.candidates != candidates:
+        log.debug("Computing the %s(%s) indicator bank: %s", *key, candidates)
+        bank = IndicatorBank(
+            dataframe,
+            IndicatorParameters.from_strategy(strategy),
+            candidates,
+            required_indicators(strategy),
+            profiler=profiler,
+            pair=metadata["pair"],
+        )
+        _INDICATOR_BANKS.put(key, bank, cache_size(strategy))
+    return bank
+
+
+def compute_indicators(
+    dataframe: DataFrame,
+    params: IndicatorParameters,
+    columns: Sequence[str] = INDICATOR_COLUMNS,
+    memo: Optional[IndicatorMemo] = None,
+) -> DataFrame:
+    """
+    Compute the indicators used by the buy signals.
+
+    :param dataframe: The pair candles
+    :param params: The indicator parameters to use
+    :param columns: The indicator columns to compute, see :py:func:`required_indicators`
+    :param memo: The :py:class:`~goddard.memo.IndicatorMemo` of ``dataframe`` to compute the indicators through
+    :return: A new dataframe, sharing the index of ``dataframe``, holding only the indicator columns
+    """
+    if memo is None:
+        memo = IndicatorMemo(dataframe)
+    wanted = set(columns)
+    values: Dict[str, Any] = {}
+
+    # Adding EMA's into the dataframe
+    for column in ("s1_ema_xs", "s1_ema_sm", "s1_ema_md", "s1_ema_xl", "s1_ema_xxl", "s3_ema_long", "s3_ema_short"):
+        if column in wanted:
+            values[column] = memo(ta.EMA, timeperiod=getattr(params, column))
+    _add_signal_2_indicators(memo, params, wanted, values)
+    if "s3_bb_lowerband" in wanted:
+        memo.source("typical_price", typical_price)
+        s3_bollinger = memo(bollinger_bands, "typical_price", window=20, stds=3)
+        values["s3_bb_lowerband"] = s3_bollinger.lower
+    _add_volume_weighted_indicators(memo, params, wanted, values)
+
+    return DataFrame(
+        {column: values[column] for column in INDICATOR_COLUMNS if column in values},
+        index=dataframe.index,
+    )
+
+
+def _add_signal_2_indicators(memo: IndicatorMemo, params: IndicatorParameters, wanted: Set[str], values: dict):
+    if "s2_ema" in wanted:
+        s2_ema_value = memo(ta.EMA, timeperiod=params.s2_ema_input)
+        values["s2_ema"] = s2_ema_value - s2_ema_value * params.s2_ema_offset_input
+    if "s2_ema_xxl_off" in wanted:
+        s2_ema_xxl_value = memo(ta.EMA, timeperiod=200)
+        values["s2_ema_xxl_off"] = s2_ema_xxl_value - s2_ema_xxl_value * params.s2_fib_lower_value
+    if "s2_ema_xxl" in wanted:
+        values["s2_ema_xxl"] = memo(ta.EMA, timeperiod=200)
+
+    if "s2_bb_std_dev_value" in wanted or "s2_bb_lower_band" in wanted:
+        s2_bb_std_dev_value = memo(ta.STDDEV, timeperiod=params.s2_bb_std_dev_length)
+        if "s2_bb_std_dev_value" in wanted:
+            values["s2_bb_std_dev_value"] = s2_bb_std_dev_value
+        if "s2_bb_lower_band" in wanted:
+            s2_bb_sma_value = memo(ta.SMA, timeperiod=params.s2_bb_sma_length)
+            values["s2_bb_lower_band"] = s2_bb_sma_value - (s2_bb_std_dev_value * params.s2_bb_lower_offset)
+
+    if "s2_fib_lower_band" in wanted:
+        s2_fib_atr_value = memo(ta.ATR, timeperiod=params.s2_fib_atr_len)
+        s2_fib_sma_value = memo(ta.SMA, timeperiod=params.s2_fib_sma_len)
+        values["s2_fib_lower_band"] = s2_fib_sma_value - s2_fib_atr_value * params.s2_fib_lower_value
+
+
+def _vwma_periods(params: IndicatorParameters) -> Dict[str, int]:
+    """
+    The period of each VWMA indicator column.
+    """
+    return {"s3_fast_ma": params.s3_ma_fast, "s3_slow_ma": params.s3_ma_slow, "fastMA": 12, "slowMA": 26}
+
+
+def _add_volume_weighted_indicators(memo: IndicatorMemo, params: IndicatorParameters, wanted: Set[str], values: dict):
+    vwma_periods = _vwma_periods(params)
+    vwma_columns = [column for column in vwma_periods if column in wanted]
+    macd_columns = [column for column in ("vwmacd", "signal", "hist") if column in wanted]
+    if not vwma_columns and not macd_columns:
+        return
+    vwmas = memo.vwmas([vwma_periods[column] for column in vwma_columns], macd=VWMACD_PERIODS if macd_columns else None)
+    for column in vwma_columns:
+        values[column] = vwmas.period(vwma_periods[column])
+    for column in macd_columns:
+        values[column] = getattr(vwmas, column)
+
+
+def stream_indicators(cached: _CachedIndicators, dataframe: DataFrame) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Compute the indicators of the candles appended to ``dataframe`` since ``cached`` was computed.
+
+    The new candles indicators are appended to the cached ring, in place. The window may have grown, or
+    slid forward, dropping its first candles. Either way, the indicators of its candles are the streamed
+    ones, carrying on from every candle seen since the last recompute, see :py:mod:`goddard.streaming`.
+
+    :return: The indicators for the whole ``dataframe``, copied out of the ring, or ``None`` if they can't
+        be streamed
+    """
+    if cached.state is None or cached.ring is None or dataframe.empty:
+        return None
+    dates = dataframe["date"]
+    position = dates.searchsorted(cached.last_date)
+    if position >= len(dataframe) or dates.iloc[position] != cached.last_date:
+        return None
+    # The candles already known
+    known = position + 1
+    if dataframe["close"].iloc[position] != cached.last_close or not cached.ring.holds(
+        dates.iloc[0], cached.last_date, known
+    ):
+        # Not the same candles, some are missing, or the window grew backwards
+        return None
+    new_candles = len(dataframe) - known
+    if not 0 < new_candles <= INCREMENTAL_MAX_NEW_CANDLES or len(dataframe) > cached.ring.capacity:
+        return None
+    for candle in dataframe.iloc[known:].itertuples(index=False):
+        cached.ring.append(candle.date, cached.state.update(candle))
+    if cached.state.updates >= INCREMENTAL_RESYNC_CANDLES:
+        cached.state.resync(dataframe)
+    # The dataframe gets its own copy, the ring is overwritten as candles come in
+    return {column: cached.ring.window(column, len(dataframe)).copy() for column in cached.ring.columns}
+
+
+def _candle_ring(
+    cached: Optional[_CachedIndicators], dataframe: DataFrame, indicators: Dict[str, np.ndarray]
+) -> CandleRing:
+    """
+    Hold the ``indicators`` of the ``dataframe`` candles, with room for the window to grow.
+
+    The cached ring is loaded again when it holds the same columns and candles, so rings are only
+    allocated once per pair.
+    """
+    columns = tuple(indicators)
+    capacity = len(dataframe) + INCREMENTAL_RING_HEADROOM
+    ring = getattr(cached, "ring", None)
+    if ring is None or ring.columns != columns or ring.capacity != capacity:
+        ring = CandleRing(columns, capacity)
+    ring.load(dataframe["date"], indicators)
+    return ring
+
+
+def _cached_indicators(
+    key: Tuple[str, str], params: IndicatorParameters, columns: Sequence[str]
+) -> Optional[_CachedIndicators]:
+    """
+    The cached indicators of ``key`` when computed with ``params`` and holding ``columns``.
+    """
+    cached = _INDICATORS_CACHE.get(key)
+    if cached is None or cached.params != params or not set(columns).issubset(cached.indicators):
+        return None
+    return cached
+
+
+def populate_indicators(strategy, dataframe: DataFrame, metadata: dict) -> DataFrame:
+    """
+    Return ``dataframe`` with the buy signal indicator columns.
+
+    The computed indicators are cached by pair, timeframe and candles, so, any other strategy in
+    this process asking for the same pair candles, using the same indicator parameters, gets the
+    cached columns.
+
+    Only the indicator columns needed by the enabled buy signals are computed, unless the strategy
+    sets ``debug_indicators``. When the strategy sets ``compact_dtypes``, the indicators which allow
+    it are stored as float32.
+
+    When a :py:mod:`~goddard.profiling` profiler is enabled, each indicator computation is recorded.
+    When a :py:mod:`~goddard.latency` recorder is enabled, the call is timed as the pair indicators time.
+    """
+    profiler = profiling.active()
+    recorder = latency.active()
+    if profiler is None and recorder is None:
+        return _populate_indicators(strategy, dataframe, metadata)
+    with contextlib.ExitStack() as steps:
+        if recorder is not None:
+            steps.enter_context(recorder.indicators(metadata["pair"], dataframe))
+        if profiler is not None:
+            steps.enter_context(profiler.step("populate_indicators", metadata["pair"]))
+        return _populate_indicators(strategy, dataframe, metadata, profiler)
+
+
+def _populate_indicators(
+    strategy, dataframe: DataFrame, metadata: dict, profiler: Optional[profiling.Profiler] = None
+) -> DataFrame:
+    params = IndicatorParameters.from_strategy(strategy)
+    columns = required_indicators(strategy)
+    key = (metadata["pair"], strategy.timeframe)
+    fingerprint = _fingerprint(dataframe)
+    cached = _cached_indicators(key, params, columns)
+    if cached is not None and cached.fingerprint == fingerprint:
+        log.debug("Reusing the cached indicators for %s(%s)", *key)
+        indicators = cached.indicators
+    else:
+        incremental = strategy.incremental_indicators and strategy.config.get("runmode") in INCREMENTAL_RUNMODES
+        indicators = None
+        if incremental and cached is not None:
+            indicators = stream_indicators(cached, dataframe)
+        if indicators is not None:
+            log.debug("Streamed the indicators of the new %s(%s) candles", *key)
+            state, ring = cached.state, cached.ring
+        else:
+            bank = indicator_bank(strategy, dataframe, metadata, profiler)
+            if bank is not None:
+                memo = bank.memo
+            else:
+                memo = IndicatorMemo(dataframe, profiler=profiler, pair=metadata["pair"])
+            computed = compute_indicators(dataframe, params, columns, memo=memo)
+            indicators = {column: computed[column].to_numpy() for column in computed.columns}
+            log.debug("Computed the %s(%s) indicators: %s", *key, memo)
+            state = IncrementalIndicators.seed(params, dataframe) if incremental else None
+            ring = _candle_ring(cached, dataframe, indicators) if state is not None else None
+        if not dataframe.empty:
+            entry = _CachedIndicators(
+                fingerprint,
+                params,
+                indicators,
+                last_date=dataframe["date"].iloc[-1],
+                last_close=dataframe["close"].iloc[-1],
+                state=state,
+                ring=ring,
+            )
+            _INDICATORS_CACHE.put(key, entry, cache_size(strategy))
+
+    values = {}
+    for column in columns:
+        if strategy.compact_dtypes and column not in FLOAT64_INDICATORS:
+            values[column] = indicators[column].astype(np.float32)
+        else:
+            values[column] = indicators[column]
+    return _attach_columns(dataframe, values)
+
+
+def _attach_columns(dataframe: DataFrame, values: Dict[str, np.ndarray]) -> DataFrame:
+    """
+    Return ``dataframe`` with the ``values`` columns, replacing those already there.
+
+    The columns are attached at once, inserting them one at a time costs about ten times as much.
+    """
+    existing = [column for column in values if column in dataframe.columns]
+    if existing:
+        dataframe = dataframe.drop(columns=existing)
+    return concat([dataframe, DataFrame(values, index=dataframe.index, copy=False)], axis=1)
+
+
+def populate_buy_trend(strategy, dataframe: DataFrame, metadata: dict) -> DataFrame:
+    profiler = profiling.active()
+    recorder = latency.active()
+    if profiler is None and recorder is None:
+        return _populate_buy_trend(strategy, dataframe, metadata)
+    with contextlib.ExitStack() as steps:
+        if recorder is not None:
+            steps.enter_context(recorder.signals(metadata["pair"]))
+        if profiler is not None:
+            steps.enter_context(profiler.step("populate_buy_trend", metadata["pair"]))
+        return _populate_buy_trend(strategy, dataframe, metadata, profiler)
+
+
+def _buy_signal_1(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return (
+        (columns["vwmacd"] < columns["signal"])
+        & (columns["low"] < columns["s1_ema_xxl"])
+        & (columns["close"] > columns["s1_ema_xxl"])
+        & crossed_above(columns["s1_ema_sm"], columns["s1_ema_md"])
+        & (columns["s1_ema_xs"] < columns["s1_ema_xl"])
+        & (columns["volume"] > 0)
+    )
+
+
+def _buy_signal_2(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return (
+        crossed_above(columns["s2_fib_lower_band"], columns["s2_bb_lower_band"])
+        & (columns["close"] < columns["s2_ema"])
+        & (columns["volume"] > 0)
+    )
+
+
+def _buy_signal_3(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    return (
+        (columns["low"] < columns["s3_bb_lowerband"])
+        & (columns["high"] > columns["s3_slow_ma"])
+        & (columns["high"] < columns["s3_ema_long"])
+        & (columns["volume"] > 0)
+    )
+
+
+# basic buy methods to keep the strategy simple
+_BUY_SIGNAL_MASKS = {
+    "buy_signal_1": _buy_signal_1,
+    "buy_signal_2": _buy_signal_2,
+    "buy_signal_3": _buy_signal_3,
+}
+
+
+def _populate_buy_trend(
+    strategy, dataframe: DataFrame, metadata: dict, profiler: Optional[profiling.Profiler] = None
+) -> DataFrame:
+    # The signal masks are evaluated on the underlying arrays and the buy columns written once, the
+    # later signal taking precedence when several fire on the same candle
+    columns = {column: dataframe[column].to_numpy() for column in ("high", "low", "close", "volume")}
+    # When hyperopting periods, the indicators of this epoch parameters come from the bank
+    indicators = dataframe
+    bank = indicator_bank(strategy, dataframe, metadata, profiler)
+    if bank is not None:
+        indicators = bank.indicators(IndicatorParameters.from_strategy(strategy), required_indicators(strategy))
+    masks = []
+    for number, signal in enumerate(BUY_SIGNALS, start=1):
+        if not getattr(strategy, signal):
+            continue
+        columns.update(_signal_arrays(indicators, signal))
+        if profiler is None:
+            masks.append((_BUY_SIGNAL_MASKS[signal](columns), number))
+        else:
+            masks.append((profiler.call(signal, metadata["pair"], _BUY_SIGNAL_MASKS[signal], columns), number))
+
+    # 0 when no signal fired, else the number of the last signal which did
+    fired = np.zeros(len(dataframe), dtype=np.int8)
+    if masks:
+        fired[:] = np.select([mask for mask, _ in reversed(masks)], [number for _, number in reversed(masks)])
+
+    if strategy.compact_dtypes:
+        dataframe["buy"] = (fired > 0).astype(np.int8)
+        dataframe["buy_tag"] = Categorical.from_codes(fired - 1, categories=BUY_SIGNALS)
+    else:
+        dataframe["buy"] = np.where(fired > 0, 1.0, np.nan)
+        dataframe["buy_tag"] = _BUY_TAGS[fired]
+
+    return dataframe
+
+
+# The buy tags indexed by the number of the signal which fired, NaN when none did
+_BUY_TAGS = np.array((np.nan,) + BUY_SIGNALS, dtype=object)
+
+
+def _signal_arrays(dataframe: DataFrame, signal: str) -> Dict[str, np.ndarray]:
+    return {column: dataframe[column].to_numpy() for column in SIGNAL_INDICATORS[signal]}
+
+
+def populate_sell_trend(strategy, dataframe: DataFrame, metadata: dict) -> DataFrame:
+    if strategy.compact_dtypes:
+        dataframe["sell"] = np.zeros(len(dataframe), dtype=np.int8)
+    else:
+        dataframe.loc[(), "sell"] = 0
+    return dataframe
@@ -0,0 +1,102 @@
+"""
+NumPy versions of the ``qtpylib`` indicators used by the buy signals.
+
+``qtpylib`` builds them from pandas rolling windows and shifts, allocating intermediate series at every
+step. These take and return arrays and run in ``O(n)``. They match ``qtpylib`` to floating point rounding.
+"""
+from typing import NamedTuple
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# The rolling sums are accumulated over blocks of this many rows, relative to a value of the block, so
+# that their rounding errors do not grow with the length of the candles history
+BLOCK_ROWS = 1024
+
+
+class BollingerBands(NamedTuple):
+    upper: np.ndarray
+    mid: np.ndarray
+    lower: np.ndarray
+
+
+def typical_price(candles) -> np.ndarray:
+    """
+    Same as ``qtpylib.typical_price``.
+
+    :param candles: A dataframe, or a dictionary of arrays, holding the ``high``, ``low`` and ``close`` prices
+    """
+    return (np.asarray(candles["high"]) + np.asarray(candles["low"]) + np.asarray(candles["close"])) / 3.0
+
+
+def _rolling_sums(values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The sums of the values, and of their squares, over the last ``window`` rows, or fewer on the first
+    rows, relative to the returned reference values.
+    """
+    rows = len(values)
+    blocks = -(-rows // BLOCK_ROWS)
+    # Repeating the first value before the first row adds nothing to the sums relative to it, the rows
+    # after the last one only complete the last block
+    padded = np.concatenate(
+        (
+            np.repeat(values[:1], window - 1, axis=0),
+            values,
+            np.full((blocks * BLOCK_ROWS - rows,) + values.shape[1:], np.nan),
+        )
+    )
+    # Each block of rows, preceded by the window - 1 rows before it, relative to its first row
+    segments = sliding_window_view(padded, BLOCK_ROWS + window - 1, axis=0)[::BLOCK_ROWS]
+    reference = segments[..., window - 1]
+    centered = segments - reference[..., np.newaxis]
+    totals = np.zeros(centered.shape[:-1] + (centered.shape[-1] + 1,))
+    squares = np.zeros_like(totals)
+    np.cumsum(centered, axis=-1, out=totals[..., 1:])
+    np.cumsum(centered * centered, axis=-1, out=squares[..., 1:])
+
+    def per_row(sums):
+        # (blocks, ..., BLOCK_ROWS) back to (rows, ...)
+        return np.moveaxis(sums, -1, 1).reshape((blocks * BLOCK_ROWS,) + values.shape[1:])[:rows]
+
+    return (
+        per_row(totals[..., window:] - totals[..., :-window]),
+        per_row(squares[..., window:] - squares[..., :-window]),
+        np.repeat(reference, BLOCK_ROWS, axis=0)[:rows],
+    )
+
+
+def bollinger_bands(values: np.ndarray, window: int = 20, stds: float = 2) -> BollingerBands:
+    """
+    Same as ``qtpylib.bollinger_bands``, the rolling mean plus and minus ``stds`` rolling sample
+    standard deviations.
+
+    Like ``qtpylib``, the first ``window - 1`` rows use the values available so far, the first row has
+    no standard deviation. Unlike pandas, NaN values are not skipped, the candles have none.
+
+    :param values: The input series
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return BollingerBands(values.copy(), values.copy(), values.copy())
+    totals, squares, reference = _rolling_sums(values, window)
+    count = np.minimum(np.arange(1, len(values) + 1), window).reshape((-1,) + (1,) * (values.ndim - 1))
+    mid = reference + totals / count
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = (squares - totals * totals / count) / (count - 1)
+    std = np.sqrt(np.maximum(variance, 0.0))
+    std[:1] = np.nan
+    return BollingerBands(upper=mid + std * stds, mid=mid, lower=mid - std * stds)
+
+
+def crossed_above(series1: np.ndarray, series2: Union[np.ndarray, float]) -> np.ndarray:
+    """
+    Same as ``qtpylib.crossed_above``, whether ``series1`` went from below or at ``series2`` to above it.
+    """
+    series1 = np.asarray(series1)
+    series2 = np.broadcast_to(series2, series1.shape)
+    crossed = np.zeros(series1.shape, dtype=bool)
+    current, previous = slice(1, None), slice(None, -1)
+    np.logical_and(series1[current] > series2[current], series1[previous] <= series2[previous], out=crossed[current])
+    return crossed
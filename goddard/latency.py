@@ -0,0 +1,347 @@
+"""
+Signal latency of a live bot, from the candle close to the buy decision.
+
+Every bot loop analyzes the pairs which got a new candle, the candle closing having started the clock.
+While a :py:class:`LatencyRecorder` is enabled, each analyzed pair records:
+
+* ``start_delay_seconds``, from its candle close until ``populate_indicators`` started on it,
+* ``indicators_seconds``, spent in ``populate_indicators``,
+* ``signals_seconds``, spent in ``populate_buy_trend``,
+* ``decision_delay_seconds``, from its candle close until its buy signal was known.
+
+Each loop which analyzed some pairs records ``loop_seconds``, from the loop start until the last buy
+signal, along with the slowest of its pairs and whether it fit within ``process_throttle_secs``.
+
+Every record is appended as a JSON line to a rotating file, and the latest values served as
+Prometheus text on ``http://127.0.0.1:<port>/metrics``.
+
+To record the latency of a live or dry-run bot, set the :py:data:`LOG_ENV_VAR` environment variable to
+the JSON-lines file path, the :py:data:`PORT_ENV_VAR` one to the metrics port, or both. The recorder is
+enabled on the first bot loop, which other run modes ignore. When no recorder is enabled, the engine
+only pays for a ``None`` check per ``populate_*`` call.
+"""
+import atexit
+import contextlib
+import http.server
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from freqtrade.constants import PROCESS_THROTTLE_SECS
+from freqtrade.enums import RunMode
+from freqtrade.exchange import timeframe_to_seconds
+from pandas import DataFrame
+
+log = logging.getLogger(__name__)
+
+#: The path of the JSON-lines file to append the latency records to
+LOG_ENV_VAR = "GODDARD_SIGNAL_LATENCY_LOG"
+#: The local port to serve the Prometheus metrics on
+PORT_ENV_VAR = "GODDARD_SIGNAL_LATENCY_PORT"
+# Only the bots trading now have candles closing now
+LATENCY_RUNMODES = (RunMode.LIVE, RunMode.DRY_RUN)
+
+# The JSON-lines file rotates past this size, keeping that many previous files
+LOG_MAX_BYTES = 16 * 2**20
+LOG_BACKUP_COUNT = 5
+
+PAIR_METRICS = ("start_delay_seconds", "indicators_seconds", "signals_seconds", "decision_delay_seconds")
+LOOP_METRICS = ("loop_seconds", "pairs", "max_start_delay_seconds", "max_decision_delay_seconds")
+
+
+class LatencyRecorder:
+    """
+    Record the signal latency of the pairs analyzed by each bot loop.
+
+    :param strategy: The strategy name, labelling the metrics
+    :param timeframe: The strategy timeframe, the candles close one timeframe after their date
+    :param throttle_secs: The bot ``process_throttle_secs``, the loops should fit within
+    :param log_path: The JSON-lines file to append the records to, ``None`` not to write any
+    :param clock: Returns the current UTC time as a timestamp, ``time.time`` unless testing
+    """
+
+    def __init__(
+        self,
+        strategy: str,
+        timeframe: str,
+        throttle_secs: float = PROCESS_THROTTLE_SECS,
+        log_path: Optional[Path] = None,
+        max_bytes: int = LOG_MAX_BYTES,
+        backup_count: int = LOG_BACKUP_COUNT,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.strategy = strategy
+        self.timeframe_seconds = timeframe_to_seconds(timeframe)
+        self.throttle_secs = throttle_secs
+        self.clock = clock
+        self.loops = 0
+        self.loops_over_throttle = 0
+        # The latest records, read by the metrics server thread
+        self.last_pairs: Dict[str, Dict[str, Any]] = {}
+        self.last_loop: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._loop_start: Optional[float] = None
+        self._loop_end = 0.0
+        self._loop_pairs: List[Dict[str, Any]] = []
+        # {pair: (the record being filled, its candle close)}, from populate_indicators to populate_buy_trend
+        self._pending: Dict[str, Tuple[Dict[str, Any], Optional[float]]] = {}
+        self._server: Optional[http.server.ThreadingHTTPServer] = None
+        self._writer: Optional[logging.Logger] = None
+        self._handler: Optional[logging.Handler] = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+            )
+            self._handler.setFormatter(logging.Formatter("%(message)s"))
+            # A logger of its own, so the records go to the file only, whatever the logging setup
+            self._writer = logging.getLogger(f"{__name__}.records.{id(self)}")
+            self._writer.propagate = False
+            self._writer.setLevel(logging.INFO)
+            self._writer.addHandler(self._handler)
+
+    def loop_start(self):
+        """
+        Start a bot loop, closing the previous one.
+        """
+        self._close_loop()
+        self._loop_start = self.clock()
+
+    @contextlib.contextmanager
+    def indicators(self, pair: str, dataframe: DataFrame) -> Iterator[None]:
+        """
+        Time the body of the ``with`` statement as the ``populate_indicators`` call of ``pair``.
+        """
+        record: Dict[str, Any] = {"pair": pair}
+        candle_close = None
+        if not dataframe.empty:
+            candle_close = dataframe["date"].iloc[-1].timestamp() + self.timeframe_seconds
+            record["candle_close"] = _isoformat(candle_close)
+            record["start_delay_seconds"] = self.clock() - candle_close
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record["indicators_seconds"] = time.perf_counter() - start
+            self._pending[pair] = (record, candle_close)
+
+    @contextlib.contextmanager
+    def signals(self, pair: str) -> Iterator[None]:
+        """
+        Time the body of the ``with`` statement as the ``populate_buy_trend`` call of ``pair``, recording
+        the pair latency afterwards.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            # Without a populate_indicators call, the indicators came from elsewhere
+            record, candle_close = self._pending.pop(pair, ({"pair": pair}, None))
+            record["signals_seconds"] = seconds
+            end = self.clock()
+            if candle_close is not None:
+                record["decision_delay_seconds"] = end - candle_close
+            self._record_pair(record, end)
+
+    def _record_pair(self, record: Dict[str, Any], end: float):
+        record = {"type": "pair", "loop": self.loops, **record, "time": _isoformat(end)}
+        self._loop_pairs.append(record)
+        self._loop_end = max(self._loop_end, end)
+        with self._lock:
+            self.last_pairs[record["pair"]] = record
+        self._write(record)
+
+    def _close_loop(self):
+        if self._loop_start is None or not self._loop_pairs:
+            self._loop_pairs, self._loop_end = [], 0.0
+            return
+        pairs = self._loop_pairs
+        loop_seconds = self._loop_end - self._loop_start
+        record = {
+            "type": "loop",
+            "loop": self.loops,
+            "start": _isoformat(self._loop_start),
+            "loop_seconds": loop_seconds,
+            "pairs": len(pairs),
+            "max_start_delay_seconds": max((record.get("start_delay_seconds", 0.0) for record in pairs)),
+            "max_decision_delay_seconds": max((record.get("decision_delay_seconds", 0.0) for record in pairs)),
+            "indicators_seconds": sum(
+                record["indicators_seconds"] for record in pairs if "indicators_seconds" in record
+            ),
+            "signals_seconds": sum(record["signals_seconds"] for record in pairs),
+            "slowest_pair": max(pairs, key=lambda record: record.get("decision_delay_seconds", 0.0))["pair"],
+            "throttle_secs": self.throttle_secs,
+            "within_throttle": loop_seconds <= self.throttle_secs,
+        }
+        self._loop_pairs, self._loop_end = [], 0.0
+        with self._lock:
+            self.loops += 1
+            self.loops_over_throttle += not record["within_throttle"]
+            self.last_loop = record
+        if not record["within_throttle"]:
+            log.warning(
+                "Analyzing %d pairs took %.2fs, over the %.2fs process_throttle_secs, %s was the slowest",
+                len(pairs),
+                loop_seconds,
+                self.throttle_secs,
+                record["slowest_pair"],
+            )
+        self._write(record)
+
+    def _write(self, record: Dict[str, Any]):
+        if self._writer is not None:
+            self._writer.info(json.dumps(record))
+
+    def metrics(self) -> str:
+        """
+        The latest records, in the Prometheus text exposition format.
+        """
+        with self._lock:
+            last_pairs = list(self.last_pairs.values())
+            last_loop = self.last_loop
+            counters = {"loops_total": self.loops, "loops_over_throttle_total": self.loops_over_throttle}
+        strategy = _label(self.strategy)
+        lines = []
+        for metric in PAIR_METRICS:
+            name = f"goddard_signal_{metric}"
+            lines.append(f"# TYPE {name} gauge")
+            lines.extend(
+                f'{name}{{strategy="{strategy}",pair="{_label(record["pair"])}"}} {record[metric]!r}'
+                for record in last_pairs
+                if metric in record
+            )
+        if last_loop is not None:
+            for metric in LOOP_METRICS:
+                name = f"goddard_signal_{metric}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f'{name}{{strategy="{strategy}"}} {last_loop[metric]!r}')
+        lines.append("# TYPE goddard_signal_throttle_seconds gauge")
+        lines.append(f'goddard_signal_throttle_seconds{{strategy="{strategy}"}} {float(self.throttle_secs)!r}')
+        for metric, value in counters.items():
+            lines.append(f"# TYPE goddard_signal_{metric} counter")
+            lines.append(f'goddard_signal_{metric}{{strategy="{strategy}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """
+        Serve the :py:meth:`metrics` on ``http://<host>:<port>/metrics``, from a daemon thread.
+
+        :return: The port served on, picked by the system when ``port`` is 0
+        """
+        recorder = self
+
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.metrics().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+                # Scrapes are no news
+                pass
+
+        self._server = http.server.ThreadingHTTPServer((host, port), MetricsHandler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="signal-latency-metrics", daemon=True).start()
+        served_port = self._server.server_address[1]
+        log.info("Serving the signal latency metrics on http://%s:%d/metrics", host, served_port)
+        return served_port
+
+    def close(self):
+        """
+        Record the current loop, stop serving the metrics and close the JSON-lines file.
+        """
+        self._close_loop()
+        self._loop_start = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._handler is not None:
+            self._writer.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = self._writer = None
+
+
+def _isoformat(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_ACTIVE: Optional[LatencyRecorder] = None
+
+
+def active() -> Optional[LatencyRecorder]:
+    """
+    The enabled recorder, ``None`` when the latency isn't recorded.
+    """
+    return _ACTIVE
+
+
+def enable(recorder: LatencyRecorder) -> LatencyRecorder:
+    """
+    Enable ``recorder``, closing the enabled one, if any.
+    """
+    global _ACTIVE  # pylint: disable=global-statement
+    previous, _ACTIVE = _ACTIVE, recorder
+    if previous is not None:
+        previous.close()
+    return recorder
+
+
+def disable() -> Optional[LatencyRecorder]:
+    """
+    Stop recording, closing and returning the recorder which was enabled.
+    """
+    global _ACTIVE  # pylint: disable=global-statement
+    recorder, _ACTIVE = _ACTIVE, None
+    if recorder is not None:
+        recorder.close()
+    return recorder
+
+
+def bot_loop_start(strategy):
+    """
+    Start a bot loop of ``strategy``, enabling the recorder on the first live or dry-run loop when the
+    environment asks for it.
+    """
+    if _ACTIVE is None:
+        log_path = os.environ.get(LOG_ENV_VAR)
+        port = os.environ.get(PORT_ENV_VAR)
+        if not (log_path or port) or strategy.config.get("runmode") not in LATENCY_RUNMODES:
+            return
+        recorder = enable(
+            LatencyRecorder(
+                strategy.__class__.__name__,
+                strategy.timeframe,
+                throttle_secs=strategy.config.get("internals", {}).get("process_throttle_secs", PROCESS_THROTTLE_SECS),
+                log_path=Path(log_path) if log_path else None,
+            )
+        )
+        if port:
+            recorder.serve(int(port))
+        atexit.register(disable)
+    _ACTIVE.loop_start()
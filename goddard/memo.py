@@ -0,0 +1,142 @@
+"""
+Per dataframe memoization of indicator computations.
+"""
+import functools
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from pandas import DataFrame
+from pandas import Series
+
+from goddard import talib_direct
+from goddard.profiling import Profiler
+from goddard.profiling import step_name
+from goddard.vwma import vwma_bank
+from goddard.vwma import VWMABank
+
+
+class IndicatorMemo:
+    """
+    Compute each indicator only once per dataframe.
+
+    Results are keyed by the function, the input series and the function parameters, so asking twice
+    for, say, the 200 period EMA of the close prices, only computes it once.
+
+    .. code-block:: python
+
+        memo = IndicatorMemo(dataframe)
+        memo.source("volume_close", lambda df: df["volume"] * df["close"])
+        ema = memo(ta.EMA, "volume_close", timeperiod=12)
+
+    The ``talib.abstract`` functions are not called through ``talib.abstract``, but straight on the
+    OHLCV arrays, extracted once per dataframe, see :py:mod:`goddard.talib_direct`, and return arrays.
+
+    When given a :py:class:`~goddard.profiling.Profiler`, every computation, not the hits, is recorded
+    as a step of ``pair``.
+    """
+
+    def __init__(self, dataframe: DataFrame, profiler: Optional[Profiler] = None, pair: Optional[str] = None):
+        self.dataframe = dataframe
+        self.profiler = profiler
+        self.pair = pair
+        self.hits = 0
+        self.misses = 0
+        self._sources: Dict[str, Series] = {}
+        self._results: Dict[tuple, Any] = {}
+        self._vwmas: List[Tuple[Optional[Tuple[int, int, int]], VWMABank]] = []
+        self._arrays: Optional[Dict[str, np.ndarray]] = None
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__} hits={self.hits} misses={self.misses}>"
+
+    @property
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        The OHLCV arrays the TA-Lib functions are called on, extracted on first use.
+        """
+        if self._arrays is None:
+            self._arrays = talib_direct.candle_arrays(self.dataframe)
+        return self._arrays
+
+    def source(self, name: str, compute: Callable[[DataFrame], Series]) -> Series:
+        """
+        Register a derived input series, computed, only once, by calling ``compute(dataframe)``.
+        """
+        try:
+            series = self._sources[name]
+            self.hits += 1
+        except KeyError:
+            series = self._sources[name] = self.call(name, compute, self.dataframe)
+            self.misses += 1
+        return series
+
+    def __call__(self, func: Callable, source: Optional[str] = None, **params):
+        """
+        Return ``func(<input>, **params)``, computing it only on the first call.
+
+        :param func: The indicator function, for example ``talib.abstract.EMA``
+        :param source: The input series, either a name registered with :py:meth:`source` or a dataframe
+            column. When ``None``, the whole dataframe is passed to ``func``.
+        :param params: The keyword arguments to pass to ``func``
+        """
+        key = (func, source, tuple(sorted(params.items())))
+        try:
+            result = self._results[key]
+            self.hits += 1
+        except KeyError:
+            compute = func
+            if source is None:
+                data = self.dataframe
+            elif source in self._sources:
+                data = self._sources[source]
+            else:
+                data = self.dataframe[source]
+            if isinstance(func, talib_direct.AbstractFunction):
+                compute = functools.partial(talib_direct.call, func)
+                if source is None:
+                    data = self.arrays
+            if self.profiler is None:
+                result = compute(data, **params)
+            else:
+                result = self.profiler.call(step_name(func, source, **params), self.pair, compute, data, **params)
+            self._results[key] = result
+            self.misses += 1
+        return result
+
+    def vwmas(self, periods: Sequence[int], macd: Optional[Tuple[int, int, int]] = None) -> VWMABank:
+        """
+        Return a :py:class:`~goddard.vwma.VWMABank` holding at least the VWMA of every period in
+        ``periods``, and the volume weighted MACD when ``macd`` is passed.
+
+        A bank already computed for more periods is reused, so computing one bank of every period needed
+        upfront makes any later request a hit.
+        """
+        for bank_macd, bank in self._vwmas:
+            if set(periods).issubset(bank.periods) and macd in (None, bank_macd):
+                self.hits += 1
+                return bank
+        bank = self.call(
+            "vwma_bank",
+            vwma_bank,
+            self.arrays["close"],
+            self.arrays["volume"],
+            periods,
+            macd=macd,
+        )
+        self._vwmas.append((macd, bank))
+        self.misses += 1
+        return bank
+
+    def call(self, name: str, func: Callable, *args, **kwargs):
+        """
+        Return ``func(*args, **kwargs)``, without memoizing it, but profiled as the ``name`` step.
+        """
+        if self.profiler is None:
+            return func(*args, **kwargs)
+        return self.profiler.call(name, self.pair, func, *args, **kwargs)
@@ -0,0 +1,181 @@
+"""
+Opt-in profiling of the indicator steps and buy signal masks.
+
+While a :py:class:`Profiler` is enabled, every indicator computed through the
+:py:class:`~goddard.memo.IndicatorMemo`, the VWMA bank, and every buy signal mask, gets timed per pair,
+along with the size of what it allocated. The numbers are aggregated across pairs into a JSON report.
+
+.. code-block:: python
+
+    profiler = profiling.enable()
+    ...  # Backtest
+    profiling.disable()
+    profiler.write(artifacts_path / "indicator-profile.json")
+
+To profile a ``freqtrade`` process, set the :py:data:`ENV_VAR` environment variable to the report path,
+which gets written when the process exits. When no profiler is enabled, the engine only pays for a
+``None`` check per indicator step.
+"""
+import atexit
+import contextlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+import numpy as np
+from pandas import DataFrame
+from pandas import Series
+
+log = logging.getLogger(__name__)
+
+#: When set, a profiler is enabled on import and its report written to this path on exit
+ENV_VAR = "GODDARD_PROFILE_INDICATORS"
+
+
+def step_name(func: Callable, source: Optional[str] = None, **params) -> str:
+    """
+    Name an indicator step after its function, input series and parameters, ``EMA(timeperiod=200)``.
+    """
+    # The talib.abstract functions have no __name__
+    name = getattr(func, "__name__", None) or getattr(func, "info", {}).get("name") or repr(func)
+    arguments = ([source] if source is not None else []) + [f"{key}={value}" for key, value in sorted(params.items())]
+    return f"{name}({', '.join(arguments)})"
+
+
+def allocated_bytes(result: Any) -> int:
+    """
+    The size of an indicator result, the sum of its arrays sizes when it holds several.
+    """
+    if isinstance(result, DataFrame):
+        return int(result.memory_usage(index=False).sum())
+    if isinstance(result, Series):
+        return int(result.memory_usage(index=False))
+    if isinstance(result, np.ndarray):
+        return int(result.nbytes)
+    if isinstance(result, tuple):
+        return sum(allocated_bytes(item) for item in result)
+    return 0
+
+
+class Profiler:
+    """
+    Collect the duration and allocation size of each named step, per pair.
+    """
+
+    def __init__(self):
+        # {step: {pair: [calls, seconds, bytes, max seconds]}}
+        self.steps: Dict[str, Dict[str, list]] = {}
+
+    def record(self, name: str, pair: str, seconds: float, nbytes: int = 0):
+        entry = self.steps.setdefault(name, {}).setdefault(pair, [0, 0.0, 0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+        entry[2] += nbytes
+        entry[3] = max(entry[3], seconds)
+
+    @contextlib.contextmanager
+    def step(self, name: str, pair: str) -> Iterator[None]:
+        """
+        Time the body of the ``with`` statement as one call of the ``name`` step.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, pair, time.perf_counter() - start)
+
+    def call(self, name: str, pair: str, func: Callable, *args, **kwargs) -> Any:
+        """
+        Return ``func(*args, **kwargs)``, recording its duration and the size of its result.
+        """
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        self.record(name, pair, time.perf_counter() - start, allocated_bytes(result))
+        return result
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Aggregate the steps across pairs, the slowest steps first.
+
+        The ``populate_indicators`` and ``populate_buy_trend`` steps include the steps they ran.
+        """
+        steps = {}
+        pairs = set()
+        for name, per_pair in self.steps.items():
+            calls, seconds, nbytes, max_seconds = (list(values) for values in zip(*per_pair.values()))
+            pairs.update(per_pair)
+            steps[name] = {
+                "pairs": len(per_pair),
+                "calls": sum(calls),
+                "total_seconds": sum(seconds),
+                "mean_seconds": sum(seconds) / sum(calls),
+                "max_seconds": max(max_seconds),
+                "total_bytes": sum(nbytes),
+                "max_pair_bytes": max(nbytes),
+                "slowest_pair": max(per_pair, key=lambda pair: per_pair[pair][1]),
+            }
+        return {
+            "pairs": len(pairs),
+            "steps": dict(sorted(steps.items(), key=lambda item: item[1]["total_seconds"], reverse=True)),
+            "per_pair": {
+                name: {
+                    pair: {"calls": entry[0], "seconds": entry[1], "bytes": entry[2]}
+                    for pair, entry in per_pair.items()
+                }
+                for name, per_pair in self.steps.items()
+            },
+        }
+
+    def write(self, path: Path):
+        """
+        Write the :py:meth:`report` to ``path`` as JSON.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2))
+        log.info("Wrote the indicators profile of %d steps to %s", len(self.steps), path)
+
+
+_ACTIVE: Optional[Profiler] = None
+
+
+def active() -> Optional[Profiler]:
+    """
+    The enabled profiler, ``None`` when profiling is disabled.
+    """
+    return _ACTIVE
+
+
+def enable() -> Profiler:
+    """
+    Enable a new profiler, replacing the enabled one, if any.
+    """
+    global _ACTIVE  # pylint: disable=global-statement
+    _ACTIVE = Profiler()
+    return _ACTIVE
+
+
+def disable() -> Optional[Profiler]:
+    """
+    Disable profiling, returning the profiler which was enabled.
+    """
+    global _ACTIVE  # pylint: disable=global-statement
+    profiler, _ACTIVE = _ACTIVE, None
+    return profiler
+
+
+def _enable_from_environment():
+    report_path = os.environ.get(ENV_VAR)
+    if not report_path:
+        return
+    profiler = enable()
+    atexit.register(profiler.write, Path(report_path))
+
+
+_enable_from_environment()
@@ -0,0 +1,115 @@
+"""
+Fixed capacity storage of the indicators of a pair's last candles, for long running bots.
+
+A :py:class:`CandleRing` holds at most ``capacity`` candles. Appending a candle overwrites the oldest one
+in place, so a bot running for weeks keeps the same memory, and appending never reallocates. Every
+candle is written twice, at its slot and at its slot plus ``capacity``, so that the last candles of
+any column are always a contiguous slice of the storage, read without copying.
+"""
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+from pandas import Series
+from pandas import Timestamp
+
+
+def _nanoseconds(date) -> int:
+    return Timestamp(date).as_unit("ns").value
+
+
+class CandleRing:
+    """
+    The last ``capacity`` candles of a pair, one float64 value per column and candle.
+
+    :param columns: The columns to hold
+    :param capacity: The most candles to hold
+    """
+
+    __slots__ = ("columns", "capacity", "_rows", "_dates", "_values", "_next", "_size")
+
+    def __init__(self, columns: Sequence[str], capacity: int):
+        if capacity < 1:
+            raise ValueError(f"A candle ring needs room for at least one candle, not {capacity}")
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self._rows = {column: row for row, column in enumerate(self.columns)}
+        # Nanoseconds since the epoch, in UTC like the freqtrade candles
+        self._dates = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.full((len(self.columns), 2 * capacity), np.nan)
+        # The slot the next candle is written to
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, column: str) -> bool:
+        return column in self._rows
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self._size}/{self.capacity} candles, {len(self.columns)} columns>"
+
+    @property
+    def _end(self) -> int:
+        # The last candles are always the ones right before the mirror of the next slot
+        return self._next + self.capacity
+
+    def _last(self, count: Optional[int]) -> slice:
+        """
+        The storage slots of the last ``count`` candles, every held candle by default.
+        """
+        count = self._size if count is None else min(count, self._size)
+        return slice(self._end - count, self._end)
+
+    def load(self, dates: Series, values: Mapping[str, np.ndarray]):
+        """
+        Replace the held candles by the last ``capacity`` candles.
+
+        :param dates: The candle dates
+        :param values: The values of the candles by column, sharing the ``dates`` length, the columns not in
+            there are held as NaN
+        """
+        size = min(len(dates), self.capacity)
+        slots = slice(0, size)
+        mirrors = slice(self.capacity, self.capacity + size)
+        self._dates[slots] = self._dates[mirrors] = dates.iloc[-size:].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        for column, row in self._rows.items():
+            column_values = values[column][-size:] if column in values else np.nan
+            self._values[row, slots] = self._values[row, mirrors] = column_values
+        self._next = size % self.capacity
+        self._size = size
+
+    def append(self, date, values: Mapping[str, float]):
+        """
+        Append a candle, overwriting the oldest one when full.
+
+        :param date: The candle date
+        :param values: The candle values by column, the columns not in there are held as NaN
+        """
+        slots = (self._next, self._next + self.capacity)
+        self._dates[slots[0]] = self._dates[slots[1]] = _nanoseconds(date)
+        for column, row in self._rows.items():
+            self._values[row, slots[0]] = self._values[row, slots[1]] = values.get(column, np.nan)
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def holds(self, first_date, last_date, count: int) -> bool:
+        """
+        Whether the last ``count`` held candles go from ``first_date`` to ``last_date``.
+        """
+        if not 0 < count <= self._size:
+            return False
+        dates = self._dates[self._last(count)]
+        return bool(dates[0] == _nanoseconds(first_date) and dates[-1] == _nanoseconds(last_date))
+
+    def window(self, column: str, count: Optional[int] = None) -> np.ndarray:
+        """
+        The values of the last ``count`` candles, every held candle by default.
+
+        :return: A read-only view of the storage, overwritten as candles are appended, copy it to keep it
+        """
+        view = self._values[self._rows[column], self._last(count)]
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,65 @@
+"""
+The tiered custom stoploss used by ``Apollo11``.
+
+The tiers are plain tables so that the same schedule can be evaluated one trade at a time, by the
+strategy ``custom_stoploss``, or for whole arrays of trades at once, with :py:func:`tiered_stoploss_batch`.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+# (current profit above which the tier applies, stoploss relative to the current rate)
+PROFIT_TIERS = (
+    (0.2, 0.04),
+    (0.1, 0.03),
+    (0.06, 0.02),
+    (0.03, 0.01),
+)
+
+# Let's try to minimize the loss
+# (current profit at or below which the tier applies, trade age after which it applies, profit divisor)
+LOSS_TIERS = (
+    (-0.10, timedelta(hours=60), 1.75),
+    (-0.08, timedelta(hours=120), 1.70),
+)
+
+# Returning -1 keeps the strategy stoploss
+NO_STOPLOSS = -1
+
+
+def tiered_stoploss(current_profit: float, trade_age: timedelta) -> float:
+    """
+    Return the stoploss for a single trade.
+
+    :param current_profit: The trade current profit ratio
+    :param trade_age: How long the trade has been open
+    """
+    for threshold, stoploss in PROFIT_TIERS:
+        if current_profit > threshold:
+            return stoploss
+    for threshold, min_age, divisor in LOSS_TIERS:
+        if current_profit <= threshold and trade_age > min_age:
+            return current_profit / divisor
+    return NO_STOPLOSS
+
+
+def tiered_stoploss_batch(current_profit, trade_age) -> np.ndarray:
+    """
+    Return the stoploss for many trades at once.
+
+    :param current_profit: The trades current profit ratios
+    :param trade_age: How long the trades have been open, either as ``timedelta64`` values or as seconds
+    :return: An array, with the same shape as ``current_profit``, of what :py:func:`tiered_stoploss`
+        would return for each trade
+    """
+    current_profit = np.asarray(current_profit, dtype=np.float64)
+    trade_age = np.asarray(trade_age)
+    if trade_age.dtype.kind == "m":
+        trade_age = trade_age / np.timedelta64(1, "s")
+
+    conditions = [current_profit > threshold for threshold, _ in PROFIT_TIERS]
+    choices = [np.full_like(current_profit, stoploss) for _, stoploss in PROFIT_TIERS]
+    for threshold, min_age, divisor in LOSS_TIERS:
+        conditions.append((current_profit <= threshold) & (trade_age > min_age.total_seconds()))
+        choices.append(current_profit / divisor)
+    return np.select(conditions, choices, default=NO_STOPLOSS)
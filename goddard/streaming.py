@@ -0,0 +1,259 @@
+"""
+Incremental, one candle at a time, versions of the indicators used by the buy signals.
+
+Each indicator keeps the running state it needs so that appending a candle costs ``O(1)``. The states
+are seeded from the candles seen so far and follow the same recurrences as TA-Lib, respectively the
+same running sums as the :py:mod:`goddard.indicators` Bollinger bands, so the streamed values only
+differ from a full recompute of every candle seen since seeding by floating point rounding.
+
+The state keeps going when the candles window slides forward. The EMA and ATR values then carry on from
+the whole history, like the backtested ones, instead of being seeded again from the first candles of
+the window, as a recompute of the window alone does.
+"""
+import math
+from collections import deque
+from typing import Dict
+from typing import Optional
+
+import numpy as np
+import talib
+from pandas import DataFrame
+
+from goddard.vwma import vwma_bank
+
+# The maximum difference allowed between streamed values and a full recompute, relative to the candle prices
+TOLERANCE = 1e-6
+
+
+class EMA:
+    """
+    TA-Lib compatible exponential moving average.
+    """
+
+    __slots__ = ("k", "value")
+
+    def __init__(self, period: int, value: float):
+        self.k = 2.0 / (period + 1)
+        self.value = value
+
+    def update(self, value: float) -> float:
+        # Same operation order as TA-Lib so that the results are bit for bit the same
+        self.value = ((value - self.value) * self.k) + self.value
+        return self.value
+
+
+class RollingWindow:
+    """
+    Running sum and sum of squares over the last ``period`` values.
+
+    The sums are kept relative to a reference value, the last value seen when seeding, to limit the
+    precision lost when computing variances of values far away from zero.
+    """
+
+    __slots__ = ("period", "ref", "values", "total", "total_sq")
+
+    def __init__(self, period: int, values: np.ndarray):
+        values = values[-period:]
+        self.period = period
+        self.ref = float(values[-1])
+        self.values = deque((float(value) - self.ref for value in values), maxlen=period)
+        self.total = math.fsum(self.values)
+        self.total_sq = math.fsum(value * value for value in self.values)
+
+    def update(self, value: float):
+        value -= self.ref
+        if len(self.values) == self.period:
+            oldest = self.values[0]
+            self.total -= oldest
+            self.total_sq -= oldest * oldest
+        self.values.append(value)
+        self.total += value
+        self.total_sq += value * value
+
+    def mean(self) -> float:
+        return self.ref + self.total / len(self.values)
+
+    def variance(self, ddof: int = 0) -> float:
+        count = len(self.values)
+        if count <= ddof:
+            return math.nan
+        variance = (self.total_sq - self.total * self.total / count) / (count - ddof)
+        # Just like TA-Lib, do not let rounding errors produce a negative variance
+        return max(variance, 0.0)
+
+    def stddev(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variance(ddof))
+
+
+class ATR:
+    """
+    TA-Lib compatible average true range, using Wilder's smoothing.
+    """
+
+    __slots__ = ("period", "value", "prev_close")
+
+    def __init__(self, period: int, value: float, prev_close: float):
+        self.period = period
+        self.value = value
+        self.prev_close = prev_close
+
+    def update(self, high: float, low: float, close: float) -> float:
+        true_range = max(high, self.prev_close) - min(low, self.prev_close)
+        self.prev_close = close
+        self.value = (self.value * (self.period - 1) + true_range) / self.period
+        return self.value
+
+
+class IncrementalIndicators:
+    """
+    The running state of every indicator computed by :py:func:`goddard.engine.compute_indicators`.
+    """
+
+    def __init__(self, params, ohlcv: DataFrame):
+        """
+        Seed the running state from the candles seen so far.
+
+        :param params: The :py:class:`~goddard.engine.IndicatorParameters` to use
+        :param ohlcv: The candles seen so far
+        """
+        self.params = params
+        # The number of candles appended since seeding
+        self.updates = 0
+        high = ohlcv["high"].to_numpy(dtype=np.float64)
+        low = ohlcv["low"].to_numpy(dtype=np.float64)
+        close = ohlcv["close"].to_numpy(dtype=np.float64)
+        volume = ohlcv["volume"].to_numpy(dtype=np.float64)
+        price_volume = close * volume
+
+        def ema(values, period):
+            return EMA(period, float(talib.EMA(values, timeperiod=period)[-1]))
+
+        close_periods = {
+            params.s1_ema_xs,
+            params.s1_ema_sm,
+            params.s1_ema_md,
+            params.s1_ema_xl,
+            params.s1_ema_xxl,
+            params.s2_ema_input,
+            200,
+            params.s3_ema_long,
+            params.s3_ema_short,
+        }
+        self.close_emas = {period: ema(close, period) for period in close_periods}
+        vwma_periods = {params.s3_ma_fast, params.s3_ma_slow, 12, 26}
+        self.price_volume_emas = {period: ema(price_volume, period) for period in vwma_periods}
+        self.volume_emas = {period: ema(volume, period) for period in vwma_periods}
+        self.signal_ema = EMA(9, float(vwma_bank(close, volume, (), macd=(12, 26, 9)).signal[-1]))
+        self.atr = ATR(
+            params.s2_fib_atr_len,
+            float(talib.ATR(high, low, close, timeperiod=params.s2_fib_atr_len)[-1]),
+            float(close[-1]),
+        )
+        self._seed_windows(high, low, close)
+
+    def _seed_windows(self, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        params = self.params
+        self.bb_window = RollingWindow(params.s2_bb_std_dev_length, close)
+        self.bb_sma_window = RollingWindow(params.s2_bb_sma_length, close)
+        self.fib_sma_window = RollingWindow(params.s2_fib_sma_len, close)
+        self.s3_bb_window = RollingWindow(20, (high + low + close) / 3.0)
+
+    def resync(self, ohlcv: DataFrame):
+        """
+        Seed the rolling windows again from the last candles, dropping the rounding errors accumulated by
+        their running sums.
+
+        The EMA and ATR states carry on, their recurrences are the TA-Lib ones, without any running sum.
+
+        :param ohlcv: The candles seen so far, the last one included
+        """
+        self.updates = 0
+        self._seed_windows(
+            ohlcv["high"].to_numpy(dtype=np.float64),
+            ohlcv["low"].to_numpy(dtype=np.float64),
+            ohlcv["close"].to_numpy(dtype=np.float64),
+        )
+
+    @classmethod
+    def seed(cls, params, ohlcv: DataFrame) -> Optional["IncrementalIndicators"]:
+        """
+        Same as instantiating the class, but returns ``None`` when there aren't enough candles to
+        seed every indicator.
+        """
+        windows = (params.s2_bb_std_dev_length, params.s2_bb_sma_length, params.s2_fib_sma_len, 20)
+        if len(ohlcv) < max(windows):
+            return None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            state = cls(params, ohlcv)
+        seeds = [ema.value for ema in state.close_emas.values()]
+        seeds += [ema.value for ema in state.price_volume_emas.values()]
+        seeds += [ema.value for ema in state.volume_emas.values()]
+        seeds += [state.signal_ema.value, state.atr.value]
+        if not np.isfinite(seeds).all():
+            return None
+        return state
+
+    def update(self, candle) -> Dict[str, float]:
+        """
+        Append a candle.
+
+        :param candle: Anything with ``high``, ``low``, ``close`` and ``volume`` attributes
+        :return: The indicator values for the appended candle
+        """
+        params = self.params
+        self.updates += 1
+        high, low, close, volume = candle.high, candle.low, candle.close, candle.volume
+
+        emas = {period: ema.update(close) for period, ema in self.close_emas.items()}
+        vwmas = {
+            period: _divide(
+                self.price_volume_emas[period].update(close * volume), self.volume_emas[period].update(volume)
+            )
+            for period in self.volume_emas
+        }
+        self.bb_window.update(close)
+        self.bb_sma_window.update(close)
+        self.fib_sma_window.update(close)
+        self.s3_bb_window.update((high + low + close) / 3.0)
+        atr = self.atr.update(high, low, close)
+
+        row = {
+            "s1_ema_xs": emas[params.s1_ema_xs],
+            "s1_ema_sm": emas[params.s1_ema_sm],
+            "s1_ema_md": emas[params.s1_ema_md],
+            "s1_ema_xl": emas[params.s1_ema_xl],
+            "s1_ema_xxl": emas[params.s1_ema_xxl],
+        }
+        s2_ema_value = emas[params.s2_ema_input]
+        s2_ema_xxl_value = emas[200]
+        row["s2_ema"] = s2_ema_value - s2_ema_value * params.s2_ema_offset_input
+        row["s2_ema_xxl_off"] = s2_ema_xxl_value - s2_ema_xxl_value * params.s2_fib_lower_value
+        row["s2_ema_xxl"] = s2_ema_xxl_value
+
+        s2_bb_std_dev_value = self.bb_window.stddev()
+        row["s2_bb_std_dev_value"] = s2_bb_std_dev_value
+        row["s2_bb_lower_band"] = self.bb_sma_window.mean() - (s2_bb_std_dev_value * params.s2_bb_lower_offset)
+        row["s2_fib_lower_band"] = self.fib_sma_window.mean() - atr * params.s2_fib_lower_value
+
+        row["s3_bb_lowerband"] = self.s3_bb_window.mean() - self.s3_bb_window.stddev(ddof=1) * 3
+
+        row["s3_ema_long"] = emas[params.s3_ema_long]
+        row["s3_ema_short"] = emas[params.s3_ema_short]
+        row["s3_fast_ma"] = vwmas[params.s3_ma_fast]
+        row["s3_slow_ma"] = vwmas[params.s3_ma_slow]
+
+        row["fastMA"] = vwmas[12]
+        row["slowMA"] = vwmas[26]
+        row["vwmacd"] = row["fastMA"] - row["slowMA"]
+        row["signal"] = self.signal_ema.update(row["vwmacd"])
+        row["hist"] = row["vwmacd"] - row["signal"]
+        return row
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """
+    Divide like numpy does, without raising on a zero denominator.
+    """
+    if denominator == 0:
+        return math.nan
+    return numerator / denominator
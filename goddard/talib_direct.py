@@ -0,0 +1,92 @@
+"""
+TA-Lib functions called straight on contiguous float64 arrays.
+
+Every ``talib.abstract`` call resolves the function inputs by name, converts each input column of the
+dataframe to an array, checks it, calls the TA-Lib routine, and wraps the result back into a series.
+On a single pair of a few thousand candles that overhead costs as much as the indicator itself, and
+the engine makes a dozen of those calls per pair.
+
+The engine keeps asking for the ``talib.abstract`` functions, the memos resolve them once, with
+:py:func:`resolve`, to the underlying routine and the names of its input columns, extract the pair
+candles once, with :py:func:`candle_arrays`, and :py:func:`call` the routine on those arrays:
+
+.. code-block:: python
+
+    arrays = talib_direct.candle_arrays(dataframe)
+    ema = talib_direct.call(ta.EMA, arrays, timeperiod=200)
+    atr = talib_direct.call(ta.ATR, arrays, timeperiod=14)
+
+The results are the arrays TA-Lib returns, bit for bit the values of the ``talib.abstract`` series.
+"""
+import functools
+from typing import Callable
+from typing import Dict
+from typing import Mapping
+from typing import NamedTuple
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import talib
+import talib.abstract as ta
+from pandas import DataFrame
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+#: The class of the ``talib.abstract`` functions, which ``talib`` doesn't export under a public name
+AbstractFunction = type(ta.EMA)
+
+
+class DirectFunction(NamedTuple):
+    """
+    The TA-Lib routine behind a ``talib.abstract`` function.
+    """
+
+    name: str
+    #: The ``talib`` function, taking arrays
+    func: Callable[..., Union[np.ndarray, Tuple[np.ndarray, ...]]]
+    #: The candle columns passed to ``func``, in order
+    inputs: Tuple[str, ...]
+    #: The names of the arrays ``func`` returns
+    outputs: Tuple[str, ...]
+
+
+@functools.lru_cache(maxsize=None)
+def resolve(function) -> DirectFunction:
+    """
+    Resolve a ``talib.abstract`` function, ``talib.abstract.EMA`` for example, to its TA-Lib routine.
+    """
+    inputs = []
+    for columns in function.input_names.values():
+        inputs.extend([columns] if isinstance(columns, str) else columns)
+    return DirectFunction(
+        name=function.info["name"],
+        func=getattr(talib, function.info["name"]),
+        inputs=tuple(inputs),
+        outputs=tuple(function.output_names),
+    )
+
+
+def candle_arrays(dataframe: DataFrame) -> Dict[str, np.ndarray]:
+    """
+    The OHLCV columns of ``dataframe``, as the contiguous float64 arrays TA-Lib takes.
+
+    The columns already stored as float64 are not copied.
+    """
+    return {column: np.ascontiguousarray(dataframe[column].to_numpy(dtype=np.float64)) for column in OHLCV_COLUMNS}
+
+
+def call(function, data: Union[Mapping[str, np.ndarray], np.ndarray], **params):
+    """
+    Same as ``function(data, **params)``, for a ``talib.abstract`` function, returning arrays.
+
+    :param function: The ``talib.abstract`` function
+    :param data: The candle arrays, see :py:func:`candle_arrays`, or the single input series, for
+        functions of a single input
+    :param params: The function parameters
+    :return: The result array, or a tuple of arrays for the functions returning several
+    """
+    direct = resolve(function)
+    if isinstance(data, Mapping):
+        return direct.func(*(data[column] for column in direct.inputs), **params)
+    return direct.func(np.ascontiguousarray(data, dtype=np.float64), **params)
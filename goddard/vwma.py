@@ -0,0 +1,79 @@
+"""
+Volume weighted moving averages, computed for several periods at once.
+
+A VWMA is the EMA of ``volume * close`` divided by the EMA of ``volume``. Computing each one through
+``talib.abstract`` converts the candles, rebuilds ``volume * close`` and wraps the results in a new
+series every single time. :py:func:`vwma_bank` extracts the candles once, as contiguous arrays, and
+runs TA-Lib's EMA straight on them for every requested period, so the results are bit for bit the same
+as the ``talib.abstract`` ones.
+"""
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+import talib
+
+
+class VWMABank(NamedTuple):
+    """
+    The output of :py:func:`vwma_bank`.
+    """
+
+    periods: Tuple[int, ...]
+    #: One column per period, in the order of ``periods``
+    values: np.ndarray
+    #: The volume weighted MACD, ``None`` when not asked for
+    vwmacd: Optional[np.ndarray]
+    signal: Optional[np.ndarray]
+    hist: Optional[np.ndarray]
+
+    def period(self, period: int) -> np.ndarray:
+        """
+        The VWMA column for ``period``.
+        """
+        return self.values[:, self.periods.index(period)]
+
+
+def vwma_bank(
+    close: np.ndarray,
+    volume: np.ndarray,
+    periods: Sequence[int],
+    macd: Optional[Tuple[int, int, int]] = (12, 26, 9),
+) -> VWMABank:
+    """
+    Compute the VWMA of every period in ``periods``, plus the volume weighted MACD.
+
+    :param close: The close prices
+    :param volume: The volumes
+    :param periods: The VWMA periods to compute. Repeated periods are only computed once.
+    :param macd: The fast, slow and signal periods of the volume weighted MACD, ``None`` to skip it
+    :return: A :py:class:`VWMABank`
+    """
+    periods = tuple(periods)
+    unique_periods = tuple(dict.fromkeys(periods + (macd[:2] if macd else ())))
+
+    # Row 0 holds volume * close, row 1 the volume
+    inputs = np.empty((2, len(close)), dtype=np.float64)
+    np.multiply(volume, close, out=inputs[0])
+    inputs[1] = volume
+
+    values = np.empty((len(close), len(unique_periods)), dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for column, period in enumerate(unique_periods):
+            np.divide(
+                talib.EMA(inputs[0], timeperiod=period),
+                talib.EMA(inputs[1], timeperiod=period),
+                out=values[:, column],
+            )
+
+    columns = [unique_periods.index(period) for period in periods]
+    bank = VWMABank(periods=periods, values=values[:, columns], vwmacd=None, signal=None, hist=None)
+    if not macd:
+        return bank
+
+    fast, slow, signal_period = macd
+    vwmacd = values[:, unique_periods.index(fast)] - values[:, unique_periods.index(slow)]
+    signal = talib.EMA(vwmacd, timeperiod=signal_period)
+    return bank._replace(vwmacd=vwmacd, signal=signal, hist=vwmacd - signal)
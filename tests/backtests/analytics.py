@@ -0,0 +1,120 @@
+"""
+Columnar trade analytics.
+
+:py:class:`TradeAnalytics` loads the trade list of a backtest into columns once, and then breaks the
+trades down, per buy tag, pair, month or exit reason, with group-by operations instead of looping over
+the trades in Python. That keeps it usable on the six figure trade counts of parameter sweeps.
+"""
+import numpy as np
+import pandas as pd
+
+# Newer freqtrade versions renamed the trade columns, the first one found is used
+BUY_TAG_COLUMNS = ("buy_tag", "enter_tag")
+EXIT_REASON_COLUMNS = ("sell_reason", "exit_reason")
+FORCE_SELL_REASONS = ("force_sell", "force_exit")
+
+
+def _column(trades, names):
+    for name in names:
+        if name in trades:
+            return trades[name]
+    return pd.Series(None, index=trades.index, dtype=object)
+
+
+class TradeAnalytics:
+    """
+    Per group statistics of a backtest trades.
+
+    Every breakdown has one row per group, in order of first appearance, with these columns:
+
+    * ``trades``: The number of trades
+    * ``wins``, ``losses``: The trades closed, not force-sold, with a profit, respectively without one
+    * ``force_sells``: The trades force-sold at the end of the backtest
+    * ``winrate``: The percentage of the trades which are wins
+    * ``profit_abs``: The sum of the trades profit, in stake currency
+    * ``profit_ratio``: The sum of the trades profit ratios
+    * ``profit_ratio_mean``: The mean trade profit ratio
+    * ``duration_mean``, ``duration_max``: The trades duration, in minutes
+    * ``drawdown_contribution``: How much of the max drawdown, as a profit ratio, the group trades
+      account for. The contributions of every group add up to the max drawdown.
+
+    :param pandas.DataFrame trades: The trades, as returned by
+        :py:attr:`~tests.backtests.helpers.BacktestResults.trades`
+    """
+
+    def __init__(self, trades):
+        open_date = pd.to_datetime(_column(trades, ("open_date",)), utc=True)
+        close_date = pd.to_datetime(_column(trades, ("close_date",)), utc=True)
+        profit_abs = _column(trades, ("profit_abs",)).to_numpy(dtype=np.float64)
+        force_sell = _column(trades, EXIT_REASON_COLUMNS).isin(FORCE_SELL_REASONS).to_numpy()
+
+        self.columns = pd.DataFrame(
+            {
+                "profit_abs": profit_abs,
+                "profit_ratio": _column(trades, ("profit_ratio",)).to_numpy(dtype=np.float64),
+                "wins": ~force_sell & (profit_abs > 0),
+                "losses": ~force_sell & (profit_abs <= 0),
+                "force_sells": force_sell,
+                "duration": ((close_date - open_date).dt.total_seconds() / 60).to_numpy(),
+            },
+            index=trades.index,
+        )
+        # Naive UTC dates, tz-aware ones only convert to arrays of objects
+        close_date = close_date.dt.tz_localize(None)
+        self.columns["drawdown_contribution"] = self._drawdown_contribution(close_date.to_numpy())
+        self.keys = {
+            "buy_tag": _column(trades, BUY_TAG_COLUMNS).astype(object).fillna("None"),
+            "pair": _column(trades, ("pair",)),
+            "month": close_date.dt.to_period("M"),
+            "exit_reason": _column(trades, EXIT_REASON_COLUMNS),
+        }
+
+    def _drawdown_contribution(self, close_date):
+        """
+        The profit ratio lost by each trade closed between the max drawdown peak and trough.
+        """
+        contribution = np.zeros(len(self.columns))
+        if not len(contribution):
+            return contribution
+        order = np.argsort(close_date, kind="stable")
+        cumulative = np.cumsum(self.columns["profit_ratio"].to_numpy()[order])
+        drawdown = np.maximum.accumulate(cumulative) - cumulative
+        trough = int(np.argmax(drawdown))
+        peak = int(np.argmax(cumulative[: trough + 1]))
+        in_drawdown = order[slice(peak + 1, trough + 1)]
+        contribution[in_drawdown] = -self.columns["profit_ratio"].to_numpy()[in_drawdown]
+        return contribution
+
+    def breakdown(self, by):
+        """
+        Return the statistics per group.
+
+        :param str by: One of ``buy_tag``, ``pair``, ``month`` or ``exit_reason``
+        """
+        stats = self.columns.groupby(self.keys[by], sort=False, dropna=False).agg(
+            trades=("profit_abs", "size"),
+            wins=("wins", "sum"),
+            losses=("losses", "sum"),
+            force_sells=("force_sells", "sum"),
+            profit_abs=("profit_abs", "sum"),
+            profit_ratio=("profit_ratio", "sum"),
+            profit_ratio_mean=("profit_ratio", "mean"),
+            duration_mean=("duration", "mean"),
+            duration_max=("duration", "max"),
+            drawdown_contribution=("drawdown_contribution", "sum"),
+        )
+        stats.insert(4, "winrate", (stats["wins"] * 100.0 / stats["trades"]).round(2))
+        stats.index.name = by
+        return stats
+
+    def by_buy_tag(self):
+        return self.breakdown("buy_tag")
+
+    def by_pair(self):
+        return self.breakdown("pair")
+
+    def by_month(self):
+        return self.breakdown("month")
+
+    def by_exit_reason(self):
+        return self.breakdown("exit_reason")
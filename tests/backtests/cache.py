@@ -0,0 +1,145 @@
+"""
+Content addressed cache of backtest results.
+
+A backtest result only depends on the strategy code, the configuration files, the candles, the
+``freqtrade backtesting`` arguments and the versions of freqtrade and of the libraries computing the
+indicators. :py:class:`BacktestCache` hashes all of them into a key, so that re-running the tests after,
+for example, only changing an assertion, reuses the previous results instead of backtesting again.
+
+The cache is not used on CI unless asked for, see :py:func:`on_ci`, the CI results are always backtested.
+"""
+import hashlib
+import importlib.metadata
+import json
+import logging
+import os
+import platform
+import shutil
+
+import freqtrade
+
+from tests.conftest import REPO_ROOT
+
+log = logging.getLogger(__name__)
+
+# The timeframes passed to ``freqtrade backtesting`` by the tests
+TIMEFRAMES = ("15m", "5m")
+# The distributions, next to freqtrade and Python, whose versions change the backtest results
+DEPENDENCIES = ("TA-Lib", "numpy", "pandas")
+
+
+def dependency_versions():
+    """
+    The versions of Python, freqtrade and the :py:data:`DEPENDENCIES`.
+
+    The freqtrade version is the one it reports, which includes the commit of development installs.
+    """
+    versions = {"python": platform.python_version(), "freqtrade": freqtrade.__version__}
+    for name in DEPENDENCIES:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def on_ci():
+    """
+    Whether running on a CI service, which set the ``CI`` environment variable, like GitHub Actions does.
+    """
+    return os.environ.get("CI", "").lower() in ("1", "true")
+
+
+class BacktestCache:
+    """
+    Store ``backtest-results-*.json`` files, and the backtest output, keyed on what produced them.
+
+    :param pathlib.Path path: The cache directory
+    :param pathlib.Path root: The directory the backtests run from
+    :param dict versions: The dependency versions, :py:func:`dependency_versions` by default
+    """
+
+    def __init__(self, path, root=REPO_ROOT, versions=None):
+        self.path = path
+        self.root = root
+        self.versions = dependency_versions() if versions is None else versions
+        # Digests of the files already hashed, keyed by path, size and modification time
+        self._digests = {}
+
+    def key(self, cmdline, strategy, exchange):
+        """
+        Return the cache key of a backtest.
+
+        :param list cmdline: The ``freqtrade backtesting`` command line
+        :param str strategy: The backtested strategy
+        :param str exchange: The exchange whose candles are used
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps(self.versions, sort_keys=True).encode())
+        data_dir = self.root / "user_data" / "data" / exchange
+        # The strategy source, including the shared code
+        strategy_files = [self.root / f"{strategy}.py"] + sorted((self.root / "goddard").rglob("*.py"))
+        for path in strategy_files:
+            self._update(digest, path)
+        for arg in cmdline:
+            if arg.startswith("--export-filename="):
+                # Where the results get written doesn't change them
+                continue
+            if arg.startswith("--datadir="):
+                data_dir = self.root / arg.split("=", 1)[1]
+            if arg.startswith("--config="):
+                # The configuration files contents, in the order they get merged
+                self._update(digest, self.root / arg.split("=", 1)[1])
+                continue
+            digest.update(arg.encode())
+            digest.update(b"\0")
+        # The candle files are not split by timerange, so every file of the backtested timeframes counts
+        for timeframe in TIMEFRAMES:
+            for path in sorted(data_dir.rglob(f"*-{timeframe}.json.gz")):
+                self._update(digest, path)
+        return digest.hexdigest()
+
+    def load(self, key):
+        """
+        Return the cached ``(results file, backtest output)`` of ``key``, ``None`` on a cache miss.
+        """
+        entry = self.path / key
+        results_files = list(entry.glob("backtest-results-*.json"))
+        if not results_files:
+            log.info("Backtest cache miss: %s", key)
+            return None
+        log.info("Backtest cache hit: %s", key)
+        return results_files[0], (entry / "backtest-output.txt").read_text()
+
+    def store(self, key, results_file, stdout):
+        """
+        Store the results of a backtest.
+
+        :param str key: The key returned by :py:meth:`key`
+        :param pathlib.Path results_file: The ``backtest-results-*.json`` file
+        :param str stdout: The backtest output
+        """
+        entry = self.path / key
+        entry.mkdir(parents=True, exist_ok=True)
+        (entry / "backtest-output.txt").write_text(stdout)
+        # Copied last, the results file is what marks the entry as complete
+        shutil.copyfile(results_file, entry / results_file.name)
+
+    def clear(self):
+        """
+        Invalidate every cached result.
+        """
+        log.info("Clearing the backtest cache at %s", self.path)
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def _update(self, digest, path):
+        path = path.resolve()
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            digest.update(b"missing\0")
+            return
+        stat_key = (path, stat.st_size, stat.st_mtime_ns)
+        if stat_key not in self._digests:
+            self._digests[stat_key] = hashlib.sha256(path.read_bytes()).digest()
+        digest.update(self._digests[stat_key])
@@ -1,13 +1,22 @@
+import functools
 import json
 import logging
+import os
 import pprint
 import shutil
-import subprocess
+import sys
 from types import SimpleNamespace
 
 import attr
+import pandas as pd
 
+from goddard import profiling
+from tests.backtests.analytics import TradeAnalytics
 from tests.backtests.data import EXPECTED_RESULTS_DATA
+from tests.backtests.ohlcv_store import OHLCVStore
+from tests.backtests.ohlcv_store import STORE_ROOT
+from tests.backtests.resources import ResourceUsage
+from tests.backtests.resources import run_process
 from tests.conftest import REPO_ROOT
 
 log = logging.getLogger(__name__)
@@ -26,6 +35,8 @@ class ProcessResult:
         The ``stderr`` returned by the process
     :keyword list,tuple cmdline:
         The command line used to start the process
+    :keyword ResourceUsage usage:
+        The resources the process used
     .. admonition:: Note
         Cast :py:class:`~saltfactories.utils.processes.ProcessResult` to a string to pretty-print it.
     """
@@ -34,6 +45,7 @@ class ProcessResult:
     stdout = attr.ib()
     stderr = attr.ib()
     cmdline = attr.ib(default=None, kw_only=True)
+    usage = attr.ib(default=None, kw_only=True)
 
     @exitcode.validator
     def _validate_exitcode(self, _, value):
@@ -56,12 +68,14 @@ class ProcessResult:
 
 
 class Backtest:
-    def __init__(self, request, stake_currency, strategy, exchange=None, timerange=None):
+    def __init__(self, request, stake_currency, strategy, exchange=None, timerange=None, data_root=None):
         self.request = request
         self.stake_currency = stake_currency
         self.strategy = strategy
         self.exchange = exchange
         self.timerange = timerange
+        # The candles and configuration files directory, when not the data submodule
+        self.data_root = data_root
 
     def __call__(
         self,
@@ -91,118 +105,210 @@ class Backtest:
                 f"No 'stake_currency' was passed when instantiating {self.__class__.__name__} or when calling it"
             )
         tmp_path = self.request.getfixturevalue("tmp_path")
-        exchange_config = f"user_data/data/{exchange}-{stake_currency}-static.json"
         json_results_file = tmp_path / "backtest-results.json"
-        cmdline = [
-            "freqtrade",
-            "backtesting",
-            "--timeframe=15m",
-            "--timeframe-detail=5m",
-            "--enable-protections",
-            "--user-data=user_data",
-            f"--strategy-list={strategy}",
-            f"--timerange={self.timerange}",
-            f"--max-open-trades={max_open_trades}",
-            f"--stake-amount={stake_amount}",
-            "--config=user_data/data/pairlists.json",
-            f"--config=user_data/data/pairlists-{stake_currency}.json",
-        ]
-        if pairlist is None:
-            cmdline.append(f"--config={exchange_config}")
-        else:
+        pairlist_config_file = None
+        if pairlist is not None:
             pairlist_config = {"exchange": {"name": exchange, "pair_whitelist": pairlist}}
             pairlist_config_file = tmp_path / "test-pairlist.json"
             pairlist_config_file.write(json.dumps(pairlist_config))
-            cmdline.append(f"--config={pairlist_config_file}")
-        cmdline.append(f"--export-filename={json_results_file}")
-        log.info("Running cmdline '%s' on '%s'", " ".join(cmdline), REPO_ROOT)
-        proc = subprocess.run(cmdline, check=False, shell=False, cwd=REPO_ROOT, text=True, capture_output=True)
-        ret = ProcessResult(
-            exitcode=proc.returncode,
-            stdout=proc.stdout.strip(),
-            stderr=proc.stderr.strip(),
-            cmdline=cmdline,
+        cmdline = backtest_cmdline(
+            exchange=exchange,
+            stake_currency=stake_currency,
+            strategies=[strategy],
+            timerange=self.timerange,
+            results_file=json_results_file,
+            max_open_trades=max_open_trades,
+            stake_amount=stake_amount,
+            pairlist_config_file=pairlist_config_file,
+            data_root=self.data_root,
         )
-        if ret.exitcode != 0:
-            log.info("Command Result:\n%s", ret)
+        cache = self.request.config.backtest_cache
+        profile = self.request.config.getoption("--profile-indicators")
+        cached = None
+        if cache is not None:
+            cache_key = cache.key(cmdline, strategy, exchange)
+            # A cached result has no profile to report
+            cached = None if profile else cache.load(cache_key)
+        if cached is None:
+            generated_results_file, ret = self._run(cmdline, exchange, tmp_path)
+            if cache is not None:
+                cache.store(cache_key, generated_results_file, ret.stdout)
         else:
-            log.debug("Command Result:\n%s", ret)
-        assert ret.exitcode == 0
-        generated_results_file = list(tmp_path.rglob("backtest-results-*.json"))[0]
-        generated_json_ci_results_artifact_path = None
-        artifacts_path = self.request.config.option.artifacts_path
-        if artifacts_path:
-            artifacts_path = artifacts_path / exchange / stake_currency / strategy
-            artifacts_path.mkdir(parents=True, exist_ok=True)
-        if self.request.config.option.artifacts_path:
-            generated_json_results_artifact_path = artifacts_path / generated_results_file.name
-            shutil.copyfile(generated_results_file, generated_json_results_artifact_path)
-
-            generated_json_ci_results_artifact_path = artifacts_path / f"ci-results-{self.timerange}.json"
-
-            generated_txt_results_artifact_path = artifacts_path / f"backtest-output-{self.timerange}.txt"
-            generated_txt_results_artifact_path.write_text(ret.stdout.strip())
-
+            generated_results_file, stdout = cached
+            ret = ProcessResult(exitcode=0, stdout=stdout, stderr="", cmdline=cmdline)
         results_data = json.loads(generated_results_file.read_text())
         ret = BacktestResults(
             strategy=strategy,
             stdout=ret.stdout.strip(),
             stderr=ret.stderr.strip(),
             raw_data=results_data,
+            usage=ret.usage,
         )
-        if generated_json_ci_results_artifact_path:
-            generated_json_ci_results_artifact_path.write_text(json.dumps({self.timerange: ret._stats_pct}))
+        artifacts_path = self.request.config.option.artifacts_path
+        if artifacts_path:
+            store_artifacts(
+                artifacts_path / exchange / stake_currency / strategy,
+                self.timerange,
+                generated_results_file,
+                ret,
+                profile_file=tmp_path / "indicator-profile.json",
+            )
         ret.log_info()
         return ret
 
+    def _run(self, cmdline, exchange, tmp_path):
+        """
+        Run the backtest, returning the generated results file and the :py:class:`ProcessResult`.
+        """
+        if OHLCVStore(STORE_ROOT / exchange).exists():
+            # Let freqtrade load the candles from the memory-mapped store
+            cmdline = [sys.executable, "-m", "tests.backtests.ohlcv_store"] + cmdline
+        env = None
+        if self.request.config.getoption("--profile-indicators"):
+            env = dict(os.environ, **{profiling.ENV_VAR: str(tmp_path / "indicator-profile.json")})
+        log.info("Running cmdline '%s' on '%s'", " ".join(cmdline), REPO_ROOT)
+        exitcode, stdout, stderr, usage = run_process(cmdline, cwd=REPO_ROOT, env=env)
+        ret = ProcessResult(exitcode=exitcode, stdout=stdout, stderr=stderr, cmdline=cmdline, usage=usage)
+        if ret.exitcode != 0:
+            log.info("Command Result:\n%s", ret)
+        else:
+            log.debug("Command Result:\n%s", ret)
+        assert ret.exitcode == 0
+        return list(tmp_path.rglob("backtest-results-*.json"))[0], ret
+
 
-@attr.s(frozen=True)
+def backtest_cmdline(
+    exchange,
+    stake_currency,
+    strategies,
+    timerange,
+    results_file,
+    max_open_trades=6,
+    stake_amount="150",
+    pairlist_config_file=None,
+    data_root=None,
+):
+    """
+    Return the ``freqtrade backtesting`` command line used to test the strategies.
+
+    :param list strategies: The strategies to backtest, in order
+    :param pathlib.Path results_file: Where to export the backtest results
+    :param pathlib.Path pairlist_config_file: A config file defining the pairs to use instead of the
+        exchange static pairlist
+    :param pathlib.Path data_root: A directory laid out like the data submodule, for example written by
+        :py:func:`tests.backtests.synthetic.write_exchange_data`, to use instead of it
+    """
+    config_dir = "user_data/data" if data_root is None else str(data_root)
+    cmdline = [
+        "freqtrade",
+        "backtesting",
+        "--timeframe=15m",
+        "--timeframe-detail=5m",
+        "--enable-protections",
+        "--user-data=user_data",
+        "--strategy-list",
+        *strategies,
+        f"--timerange={timerange}",
+        f"--max-open-trades={max_open_trades}",
+        f"--stake-amount={stake_amount}",
+        f"--config={config_dir}/pairlists.json",
+        f"--config={config_dir}/pairlists-{stake_currency}.json",
+    ]
+    if data_root is not None:
+        cmdline.append(f"--datadir={data_root / exchange}")
+    if pairlist_config_file is None:
+        cmdline.append(f"--config={config_dir}/{exchange}-{stake_currency}-static.json")
+    else:
+        cmdline.append(f"--config={pairlist_config_file}")
+    cmdline.append(f"--export-filename={results_file}")
+    return cmdline
+
+
+def store_artifacts(artifacts_path, timerange, results_file, results, profile_file=None):
+    """
+    Copy the backtest results, and what CI reports about them, to the artifacts directory.
+
+    :param pathlib.Path artifacts_path: The exchange/stake currency/strategy artifacts directory
+    :param str timerange: The backtested timerange
+    :param pathlib.Path results_file: The ``backtest-results-*.json`` file
+    :param BacktestResults results: The parsed results
+    :param pathlib.Path profile_file: The :py:mod:`goddard.profiling` report of the backtest, copied
+        when it exists
+    """
+    artifacts_path.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(results_file, artifacts_path / results_file.name)
+    if profile_file is not None and profile_file.is_file():
+        shutil.copyfile(profile_file, artifacts_path / f"indicator-profile-{timerange}.json")
+    ci_results = dict(results._stats_pct)
+    if results.usage is not None:
+        ci_results.update(results.usage.ci_results())
+    (artifacts_path / f"ci-results-{timerange}.json").write_text(json.dumps({timerange: ci_results}))
+    (artifacts_path / f"backtest-output-{timerange}.txt").write_text(results.stdout)
+
+
+@attr.s(frozen=True, repr=False)
 class BacktestResults:
+    """
+    The results of a backtest.
+
+    Everything is computed on first access. The aggregates are exposed as namespaces, without the trade
+    list, which is only turned into a columnar :py:class:`~pandas.DataFrame`, by :py:attr:`trades`,
+    when asked for.
+    """
+
     strategy: str = attr.ib()
-    stdout: str = attr.ib(repr=False)
-    stderr: str = attr.ib(repr=False)
-    raw_data: dict = attr.ib(repr=False)
-    _results: dict = attr.ib(init=False, repr=False)
-    _stats: dict = attr.ib(init=False, repr=False)
-    results: SimpleNamespace = attr.ib(init=False, repr=False)
-    full_stats: SimpleNamespace = attr.ib(init=False, repr=False)
-    _stats_pct: dict = attr.ib(init=False, repr=False)
-    stats_pct: SimpleNamespace = attr.ib(init=False, repr=True)
-
-    @_results.default
-    def _set__results(self):
+    stdout: str = attr.ib()
+    stderr: str = attr.ib()
+    raw_data: dict = attr.ib()
+    #: The :py:class:`ResourceUsage` of the backtest, ``None`` when it was not run, but cached
+    usage: ResourceUsage = attr.ib(default=None)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(strategy={self.strategy!r}, stats_pct={self.stats_pct!r})"
+
+    @functools.cached_property
+    def _results(self):
         return self.raw_data["strategy"][self.strategy]
 
-    @_stats.default
-    def _set_stats(self):
+    @functools.cached_property
+    def _stats(self):
         return self.raw_data["strategy_comparison"][0]
 
-    @results.default
-    def _set_results(self):
-        return json.loads(json.dumps(self._results), object_hook=lambda d: SimpleNamespace(**d))
+    @functools.cached_property
+    def results(self):
+        return _namespace({key: value for key, value in self._results.items() if key != "trades"})
 
-    @full_stats.default
-    def _set_full_stats(self):
-        return json.loads(json.dumps(self._stats), object_hook=lambda d: SimpleNamespace(**d))
+    @functools.cached_property
+    def full_stats(self):
+        return _namespace(self._stats)
 
-    @_stats_pct.default
-    def _set__stats_pct(self):
+    @functools.cached_property
+    def trades(self):
+        """
+        The trades, one row per trade, with the dates parsed.
+        """
+        trades = pd.DataFrame.from_records(self._results["trades"])
+        for column in ("open_date", "close_date"):
+            if column in trades:
+                trades[column] = pd.to_datetime(trades[column], utc=True)
+        return trades
+
+    @functools.cached_property
+    def analytics(self):
+        """
+        The :py:class:`~tests.backtests.analytics.TradeAnalytics` of the trades.
+        """
+        return TradeAnalytics(self.trades)
+
+    @functools.cached_property
+    def _stats_pct(self):
         tags = {}
-        for trade in self.results.trades:
-            tag = f"{trade.buy_tag} wins / losses / force-sell"
-            profit = trade.profit_abs
-            force_sell = trade.sell_reason == "force_sell"
-            if tag not in tags:
-                tags[tag] = {"wins": 0, "losses": 0, "force_sell": 0}
-            if force_sell:
-                tags[tag]["force_sell"] += 1
-            elif profit > 0:
-                tags[tag]["wins"] += 1
-            else:
-                tags[tag]["losses"] += 1
-
-        for tag, data in tags.items():
-            tags[tag] = f"{data['wins']} / {data['losses']} / {data['force_sell']}"
+        if not self.trades.empty:
+            by_buy_tag = self.analytics.by_buy_tag()
+            for tag, wins, losses, force_sells in zip(
+                by_buy_tag.index, by_buy_tag["wins"], by_buy_tag["losses"], by_buy_tag["force_sells"]
+            ):
+                tags[f"{tag} wins / losses / force-sell"] = f"{wins} / {losses} / {force_sells}"
 
         return {
             "duration_avg": self.full_stats.duration_avg,
@@ -215,23 +321,32 @@ class BacktestResults:
             **tags,
         }
 
-    @stats_pct.default
-    def _set_stats_pct(self):
-        return json.loads(json.dumps(self._stats_pct), object_hook=lambda d: SimpleNamespace(**d))
+    @functools.cached_property
+    def stats_pct(self):
+        return _namespace(self._stats_pct)
 
     def log_info(self):
-        data = {
-            "results": self._results,
-            "full_stats": self._stats,
-            "stats_pct": self._stats_pct,
-        }
-        log.debug("Backtest results:\n%s", pprint.pformat(data))
+        log.debug(
+            "Backtest results:\n%s",
+            pprint.pformat({"results": vars(self.results), "full_stats": self._stats, "stats_pct": self._stats_pct}),
+        )
         log.info(
             "Backtests Stats PCTs(More info at the DEBUG log level): %s",
             pprint.pformat(self._stats_pct),
         )
 
 
+def _namespace(data):
+    """
+    Recursively turn dictionaries into namespaces.
+    """
+    if isinstance(data, dict):
+        return SimpleNamespace(**{key: _namespace(value) for key, value in data.items()})
+    if isinstance(data, list):
+        return [_namespace(value) for value in data]
+    return data
+
+
 @attr.s(frozen=True)
 class ExpectedResult:
     exchange = attr.ib()
@@ -0,0 +1,193 @@
+"""
+Memory-mapped columnar OHLCV store.
+
+The candles under ``user_data/data/<exchange>`` are gzipped JSON files which every backtest has to
+decompress and parse again. :py:func:`convert` does that once, storing each pair and timeframe as one
+``.npy`` file per column. :py:class:`OHLCVStore` memory-maps them, so loading is near instant, worker
+processes share the same pages, and timeranges are sliced by binary search on the dates, without
+copying.
+
+Once converted, the backtests use the store automatically. :py:func:`install` makes freqtrade read the
+candles from it, falling back to the JSON files for anything not converted, or converted from an older
+file. To convert the candles::
+
+    python -m tests.backtests.ohlcv_store convert binance kucoin
+"""
+import argparse
+import gzip
+import json
+import logging
+import sys
+
+import numpy as np
+import pandas as pd
+
+from tests.conftest import REPO_ROOT
+
+log = logging.getLogger(__name__)
+
+DATA_ROOT = REPO_ROOT / "user_data" / "data"
+STORE_ROOT = REPO_ROOT / "user_data" / "columnar"
+COLUMNS = ("date", "open", "high", "low", "close", "volume")
+# The timeframes used by the backtests
+TIMEFRAMES = ("15m", "5m")
+
+
+def pair_to_filename(pair):
+    """
+    Same as ``freqtrade.misc.pair_to_filename``.
+    """
+    for char in ("/", " ", ".", "@", "$", "+", ":"):
+        pair = pair.replace(char, "_")
+    return pair
+
+
+def _source_stamp(path):
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def convert(exchange, data_root=DATA_ROOT, store_root=STORE_ROOT, timeframes=TIMEFRAMES):
+    """
+    Convert the ``<pair>-<timeframe>.json.gz`` candle files of an exchange.
+
+    Files already converted, and not changed since, are skipped.
+
+    :return: The number of converted files
+    """
+    converted = 0
+    for timeframe in timeframes:
+        for source in sorted((data_root / exchange).glob(f"*-{timeframe}.json.gz")):
+            entry = store_root / exchange / source.name[: -len(".json.gz")]
+            stamp_file = entry / "source.json"
+            stamp = _source_stamp(source)
+            if stamp_file.is_file() and json.loads(stamp_file.read_text()) == stamp:
+                continue
+            with gzip.open(source, "rt") as rfh:
+                # The timestamps, in milliseconds, are exactly representable as float64
+                candles = np.asarray(json.load(rfh), dtype=np.float64).reshape(-1, len(COLUMNS))
+            entry.mkdir(parents=True, exist_ok=True)
+            np.save(entry / "date.npy", candles[:, 0].astype(np.int64))
+            for index, column in enumerate(COLUMNS[1:], start=1):
+                np.save(entry / f"{column}.npy", np.ascontiguousarray(candles[:, index]))
+            # Written last, the stamp is what marks the entry as complete
+            stamp_file.write_text(json.dumps(stamp))
+            converted += 1
+    log.info("Converted %d %s candle files", converted, exchange)
+    return converted
+
+
+class OHLCVStore:
+    """
+    Read access to the converted candles of an exchange.
+
+    :param pathlib.Path path: The exchange store directory
+    :param pathlib.Path data_dir: The exchange JSON candles directory, used to check the converted files
+        are up to date
+    """
+
+    def __init__(self, path, data_dir=None):
+        self.path = path
+        self.data_dir = data_dir
+
+    def exists(self):
+        return self.path.is_dir()
+
+    def has(self, pair, timeframe):
+        """
+        Whether the candles of ``pair`` are converted, from the current JSON file when it is known.
+        """
+        name = f"{pair_to_filename(pair)}-{timeframe}"
+        stamp_file = self.path / name / "source.json"
+        if not stamp_file.is_file():
+            return False
+        if self.data_dir is None:
+            return True
+        source = self.data_dir / f"{name}.json.gz"
+        return not source.is_file() or json.loads(stamp_file.read_text()) == _source_stamp(source)
+
+    def columns(self, pair, timeframe, start=None, stop=None):
+        """
+        Return the memory-mapped columns of the candles between ``start`` and ``stop``, both included.
+
+        :param int start: The first candle date, in milliseconds
+        :param int stop: The last candle date, in milliseconds
+        :return: A dictionary of read-only arrays, views of the mapped files
+        """
+        entry = self.path / f"{pair_to_filename(pair)}-{timeframe}"
+        dates = np.load(entry / "date.npy", mmap_mode="r")
+        first = 0 if start is None else int(np.searchsorted(dates, start, side="left"))
+        last = len(dates) if stop is None else int(np.searchsorted(dates, stop, side="right"))
+        window = slice(first, max(first, last))
+        columns = {"date": dates[window]}
+        for column in COLUMNS[1:]:
+            columns[column] = np.load(entry / f"{column}.npy", mmap_mode="r")[window]
+        return columns
+
+    def load(self, pair, timeframe, start=None, stop=None):
+        """
+        Return the candles between ``start`` and ``stop`` as a freqtrade OHLCV dataframe.
+
+        Only the dates get converted, the price and volume columns are views of the mapped files.
+        """
+        columns = self.columns(pair, timeframe, start, stop)
+        columns["date"] = pd.to_datetime(columns["date"], unit="ms", utc=True)
+        return pd.DataFrame(columns, copy=False)
+
+
+def install(store_root=STORE_ROOT):
+    """
+    Make freqtrade load the candles from the store, when converted.
+    """
+    # pylint: disable=import-outside-toplevel
+    from freqtrade.data.history.datahandlers import idatahandler
+
+    get_datahandlerclass = idatahandler.get_datahandlerclass
+    if getattr(get_datahandlerclass, "ohlcv_store", None):
+        return
+
+    def get_columnar_datahandlerclass(datatype):
+        handler_class = get_datahandlerclass(datatype)
+
+        class ColumnarDataHandler(handler_class):
+            def _ohlcv_load(self, pair, timeframe, timerange, candle_type):
+                store = OHLCVStore(store_root / self._datadir.name, data_dir=self._datadir)
+                if not store.has(pair, timeframe):
+                    return super()._ohlcv_load(pair, timeframe, timerange, candle_type)
+                start = stop = None
+                if timerange is not None and timerange.starttype == "date":
+                    start = timerange.startts * 1000
+                if timerange is not None and timerange.stoptype == "date":
+                    stop = timerange.stopts * 1000
+                return store.load(pair, timeframe, start, stop)
+
+        ColumnarDataHandler.__name__ = f"Columnar{handler_class.__name__}"
+        return ColumnarDataHandler
+
+    get_columnar_datahandlerclass.ohlcv_store = store_root
+    idatahandler.get_datahandlerclass = get_columnar_datahandlerclass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.backtests.ohlcv_store", description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    convert_parser = subparsers.add_parser("convert", help="Convert the JSON candle files")
+    convert_parser.add_argument("exchanges", nargs="+")
+    freqtrade_parser = subparsers.add_parser("freqtrade", help="Run freqtrade, loading the candles from the store")
+    freqtrade_parser.add_argument("args", nargs=argparse.REMAINDER)
+    options = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if options.command == "convert":
+        for exchange in options.exchanges:
+            convert(exchange)
+        return 0
+
+    from freqtrade.main import main as freqtrade_main  # pylint: disable=import-outside-toplevel
+
+    install()
+    return freqtrade_main(options.args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
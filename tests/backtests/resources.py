@@ -0,0 +1,131 @@
+"""
+The wall-clock time, CPU time and peak memory used by the backtests.
+
+:py:func:`run_process` runs a command through this module, ``python -m tests.backtests.resources``,
+which waits for it and reports what it used. Linux copies the peak resident set size of a process into
+the processes it starts, so the commands are started from this small process, not from the much larger
+test process, which would otherwise hide any smaller peak.
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import attr
+
+
+@attr.s(frozen=True)
+class ResourceUsage:
+    """
+    The resources a backtest used.
+
+    :keyword float wall_seconds:
+        The wall-clock time it took
+    :keyword float cpu_seconds:
+        The user and system CPU time it used
+    :keyword int peak_rss:
+        Its peak resident set size, in bytes
+    """
+
+    wall_seconds = attr.ib()
+    cpu_seconds = attr.ib()
+    peak_rss = attr.ib()
+
+    def ci_results(self):
+        """
+        The usage as reported, next to the trading results, in the ``ci-results-*.json`` artifacts.
+        """
+        return {
+            "runtime_seconds": round(self.wall_seconds, 1),
+            "cpu_seconds": round(self.cpu_seconds, 1),
+            "peak_rss_mib": round(self.peak_rss / 2**20, 1),
+        }
+
+
+def peak_rss():
+    """
+    The peak resident set size of this process, in bytes, since it started or since the last
+    :py:func:`reset_peak_rss`.
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return _maxrss_bytes(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def reset_peak_rss():
+    """
+    Reset the peak resident set size to the current one, where the system allows it, Linux only.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as clear_refs:
+            clear_refs.write("5")
+    except OSError:
+        pass
+
+
+def _maxrss_bytes(maxrss):
+    # ``ru_maxrss`` is in kilobytes, but on macOS
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def run_process(cmdline, cwd=None, env=None):
+    """
+    Run ``cmdline``, returning its exit code, output, and :py:class:`ResourceUsage`.
+
+    :param pathlib.Path cwd: The directory to run from, it must have this ``tests`` package
+    :return: A ``(exitcode, stdout, stderr, usage)`` tuple, ``usage`` is ``None`` when the command
+        could not be started
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        usage_file = Path(tmp_dir) / "usage.json"
+        stdout_file = Path(tmp_dir) / "stdout"
+        stderr_file = Path(tmp_dir) / "stderr"
+        with stdout_file.open("w") as stdout, stderr_file.open("w") as stderr:
+            proc = subprocess.run(
+                [sys.executable, "-m", __name__, str(usage_file), *cmdline],
+                check=False,
+                shell=False,
+                cwd=cwd,
+                env=env,
+                text=True,
+                stdout=stdout,
+                stderr=stderr,
+            )
+        usage = None
+        if usage_file.is_file():
+            usage = ResourceUsage(**json.loads(usage_file.read_text()))
+        return proc.returncode, stdout_file.read_text().strip(), stderr_file.read_text().strip(), usage
+
+
+def main(argv=None):
+    """
+    Run the command in ``argv[1:]``, writing its resource usage to ``argv[0]`` as JSON.
+    """
+    usage_file, *cmdline = sys.argv[1:] if argv is None else argv
+    start = time.perf_counter()
+    # pylint: disable-next=consider-using-with
+    proc = subprocess.Popen(cmdline, shell=False)
+    # Unlike subprocess.run, wait4 returns the resources used by that process, and the ones it waited for
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall_seconds = time.perf_counter() - start
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    usage = ResourceUsage(
+        wall_seconds=wall_seconds,
+        cpu_seconds=rusage.ru_utime + rusage.ru_stime,
+        peak_rss=_maxrss_bytes(rusage.ru_maxrss),
+    )
+    Path(usage_file).write_text(json.dumps(attr.asdict(usage)))
+    return proc.returncode
+
+
+if __name__ == "__main__":
+    sys.exit(main())
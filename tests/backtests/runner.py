@@ -0,0 +1,206 @@
+"""
+In-process, parallel, backtest runner.
+
+Running ``freqtrade backtesting`` once per (exchange, stake currency, strategy, timerange) combination
+pays the Python startup, the configuration parsing and, above all, the OHLCV loading every single time.
+
+:py:func:`run_backtests` groups the combinations by exchange and stake currency, which is what defines
+the pairs and therefore the data to load, and runs each group on a process pool sized to the cores. A
+worker loads its group data once, for the widest timerange, and backtests every strategy and timerange
+of the group on slices of it.
+"""
+import contextlib
+import io
+import json
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from datetime import timezone
+
+import attr
+
+from goddard import profiling
+from tests.backtests import ohlcv_store
+from tests.backtests.helpers import backtest_cmdline
+from tests.backtests.helpers import BacktestResults
+from tests.backtests.helpers import store_artifacts
+from tests.backtests.ohlcv_store import OHLCVStore
+from tests.backtests.ohlcv_store import STORE_ROOT
+from tests.backtests.resources import peak_rss
+from tests.backtests.resources import reset_peak_rss
+from tests.backtests.resources import ResourceUsage
+from tests.conftest import REPO_ROOT
+
+log = logging.getLogger(__name__)
+
+
+@attr.s(frozen=True)
+class BacktestJob:
+    exchange = attr.ib()
+    stake_currency = attr.ib()
+    strategy = attr.ib()
+    timerange = attr.ib()
+    max_open_trades = attr.ib(default=6)
+    stake_amount = attr.ib(default="150")
+    #: The candles and configuration files directory, when not the data submodule
+    data_root = attr.ib(default=None)
+
+    @property
+    def group(self):
+        """
+        The jobs sharing the same group load the same data.
+        """
+        return (self.exchange, self.stake_currency, self.max_open_trades, self.stake_amount, self.data_root)
+
+    @property
+    def name(self):
+        return f"{self.exchange}-{self.stake_currency}-{self.strategy}-{self.timerange}"
+
+
+def run_backtests(jobs, results_dir, processes=None, artifacts_path=None, profile=False):
+    """
+    Run the backtests on a process pool.
+
+    :param list jobs: The :py:class:`BacktestJob` to run
+    :param pathlib.Path results_dir: Where to store the backtest results files
+    :param int processes: The process pool size, defaults to the number of cores
+    :param pathlib.Path artifacts_path: When passed, where to store the test artifacts
+    :param bool profile: Profile the indicators of each job, see :py:mod:`goddard.profiling`
+    :return: A dictionary mapping each job to its :py:class:`~tests.backtests.helpers.BacktestResults`
+    """
+    jobs = list(dict.fromkeys(jobs))
+    if processes is None:
+        processes = os.cpu_count() or 1
+    results_dir.mkdir(parents=True, exist_ok=True)
+
+    chunks = _chunk_jobs(jobs, processes)
+    log.info("Running %d backtests, in %d chunks, on %d processes", len(jobs), len(chunks), processes)
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(processes, len(chunks))) as executor:
+        futures = [executor.submit(_run_chunk, chunk, results_dir, profile) for chunk in chunks]
+        for future in futures:
+            for job, results_file, stdout, usage in future.result():
+                ret = BacktestResults(
+                    strategy=job.strategy,
+                    stdout=stdout,
+                    stderr="",
+                    raw_data=json.loads(results_file.read_text()),
+                    usage=usage,
+                )
+                if artifacts_path:
+                    store_artifacts(
+                        artifacts_path / job.exchange / job.stake_currency / job.strategy,
+                        job.timerange,
+                        results_file,
+                        ret,
+                        profile_file=results_dir / f"indicator-profile-{job.name}.json",
+                    )
+                ret.log_info()
+                results[job] = ret
+    return results
+
+
+def _chunk_jobs(jobs, processes):
+    """
+    Split the jobs groups so that every process gets work, while each chunk only needs one group data.
+    """
+    groups = {}
+    for job in jobs:
+        groups.setdefault(job.group, []).append(job)
+
+    chunks = []
+    for group_jobs in groups.values():
+        chunk_count = min(len(group_jobs), max(1, math.ceil(processes * len(group_jobs) / len(jobs))))
+        chunks.extend(group_jobs[index::chunk_count] for index in range(chunk_count))
+    return chunks
+
+
+def _run_chunk(jobs, results_dir, profile=False):
+    """
+    Backtest jobs which all belong to the same group, loading the data only once.
+
+    The :py:class:`~tests.backtests.resources.ResourceUsage` of a job is that of its backtest, on the
+    already loaded data, its peak memory includes that data.
+
+    :return: A list of ``(job, results file, backtest output, resource usage)`` tuples
+    """
+    # pylint: disable=import-outside-toplevel
+    from freqtrade.commands import Arguments
+    from freqtrade.commands.optimize_commands import setup_optimize_configuration
+    from freqtrade.configuration import TimeRange
+    from freqtrade.enums import RunMode
+    from freqtrade.misc import file_dump_json
+    from freqtrade.optimize.backtesting import Backtesting
+    from freqtrade.optimize.optimize_reports import generate_backtest_stats
+    from freqtrade.optimize.optimize_reports import show_backtest_results
+
+    # The paths in the configuration files are relative to the repository root
+    os.chdir(REPO_ROOT)
+    if OHLCVStore(STORE_ROOT / jobs[0].exchange).exists():
+        ohlcv_store.install()
+
+    timeranges = [TimeRange.parse_timerange(job.timerange) for job in jobs]
+    widest = TimeRange(
+        "date",
+        "date",
+        min(timerange.startts for timerange in timeranges),
+        max(timerange.stopts for timerange in timeranges),
+    )
+    first = jobs[0]
+    cmdline = backtest_cmdline(
+        exchange=first.exchange,
+        stake_currency=first.stake_currency,
+        strategies=list(dict.fromkeys(job.strategy for job in jobs)),
+        timerange=widest.timerange_str,
+        results_file=results_dir / "backtest-results.json",
+        max_open_trades=first.max_open_trades,
+        stake_amount=first.stake_amount,
+        data_root=first.data_root,
+    )
+    config = setup_optimize_configuration(Arguments(cmdline[1:]).get_parsed_arg(), RunMode.BACKTEST)
+    backtesting = Backtesting(config)
+    data, _ = backtesting.load_bt_data()
+    strategies = {strategy.get_strategy_name(): strategy for strategy in backtesting.strategylist}
+
+    ret = []
+    for job, timerange in zip(jobs, timeranges):
+        window = _slice_data(data, timerange, backtesting.required_startup)
+        backtesting.all_bt_content = {}
+        if profile:
+            profiling.enable()
+        reset_peak_rss()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        min_date, max_date = backtesting.backtest_one_strategy(strategies[job.strategy], window, timerange)
+        stats = generate_backtest_stats(window, backtesting.all_bt_content, min_date=min_date, max_date=max_date)
+        usage = ResourceUsage(
+            wall_seconds=time.perf_counter() - start,
+            cpu_seconds=time.process_time() - cpu_start,
+            peak_rss=peak_rss(),
+        )
+        if profile:
+            profiling.disable().write(results_dir / f"indicator-profile-{job.name}.json")
+        results_file = results_dir / f"backtest-results-{job.name}.json"
+        file_dump_json(results_file, stats)
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            show_backtest_results(config, stats)
+        ret.append((job, results_file, stdout.getvalue().strip(), usage))
+    return ret
+
+
+def _slice_data(data, timerange, startup_candles):
+    """
+    Return the candles of ``timerange``, plus the startup candles before it, just like freqtrade would
+    load them.
+    """
+    start = datetime.fromtimestamp(timerange.startts, tz=timezone.utc)
+    stop = datetime.fromtimestamp(timerange.stopts, tz=timezone.utc)
+    window = {}
+    for pair, dataframe in data.items():
+        first = max(0, dataframe["date"].searchsorted(start) - startup_candles)
+        last = dataframe["date"].searchsorted(stop, side="right")
+        if last > first:
+            window[pair] = dataframe.iloc[first:last].reset_index(drop=True)
+    return window
@@ -0,0 +1,352 @@
+"""
+Deterministic synthetic OHLCV data.
+
+The backtests need the exchange data submodule, which isn't always available, and which can't be used
+to check how the strategies scale past its pair count and history length. :py:func:`generate_candles`
+builds realistic looking candles instead. They have trending regimes, sharp dips followed by slow
+recoveries, volume spikes and candles without any volume, which is enough for the three buy signals
+to fire. The same seed always generates the same candles.
+
+:py:func:`write_exchange_data` writes them the way the data submodule is laid out, gzipped JSON candle
+files plus the configuration files :py:func:`~tests.backtests.helpers.backtest_cmdline` passes to
+freqtrade, so that both the freqtrade data loader and the :py:class:`~tests.backtests.helpers.Backtest`
+helper, given the ``data_root``, can consume them. To generate two years of 10 pairs::
+
+    python -m tests.backtests.synthetic user_data/synthetic --pairs 10 --days 730
+
+Freqtrade validates the pairs against the exchange markets when backtesting, so the candles are generated
+under real pair names. By default they are the checked in :py:data:`KNOWN_BASES` pairs, so the same
+options always generate the same pairs. More pairs can be read from a freqtrade configuration file
+``pair_whitelist``, for instance the one of the BUSD configuration::
+
+    python -m tests.backtests.synthetic user_data/synthetic --pairs-file alternative_configs/whitelist_busd.json
+
+or looked up in the exchange markets, which needs network access, see :py:func:`exchange_pairs`::
+
+    python -m tests.backtests.synthetic user_data/synthetic --pairs 500 --days 730 --markets
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+
+import ccxt
+import numpy as np
+import pandas as pd
+
+from freqtrade.configuration.load_config import load_config_file
+
+from tests.backtests.ohlcv_store import pair_to_filename
+
+log = logging.getLogger(__name__)
+
+# The candles are generated at the detail timeframe and the strategy timeframe ones are resampled from
+# them, so both timeframes always agree
+BASE_TIMEFRAME = "5m"
+TIMEFRAME_CANDLES = {"5m": 1, "15m": 3}
+CANDLES_PER_DAY = 24 * 12
+DEFAULT_START = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+
+# Base currencies traded for years against USDT and BUSD on the exchanges the strategies support, the
+# generated pairs by default, and the first ones when looking up the exchange markets
+KNOWN_BASES = (
+    "BTC",
+    "ETH",
+    "XRP",
+    "ADA",
+    "SOL",
+    "DOGE",
+    "DOT",
+    "LTC",
+    "LINK",
+    "BCH",
+    "TRX",
+    "AVAX",
+    "ATOM",
+    "XLM",
+    "ETC",
+    "FIL",
+    "NEAR",
+    "ALGO",
+    "UNI",
+    "AAVE",
+)
+
+
+def load_markets(exchange):
+    """
+    Load the ``exchange`` markets, through ccxt like freqtrade does.
+    """
+    return getattr(ccxt, exchange)().load_markets()
+
+
+def exchange_pairs(count, exchange="binance", stake_currency="usdt", markets=False):
+    """
+    Return ``count`` real pair names of ``exchange``, quoted in ``stake_currency``.
+
+    The names are the :py:data:`KNOWN_BASES` pairs. With ``markets``, the exchange markets are loaded
+    instead, which needs network access, and the names are the :py:data:`KNOWN_BASES` pairs the exchange
+    actively trades, followed by its other active spot pairs, sorted. The markets change over time, so the
+    names then do too.
+
+    :raises ValueError: When there are fewer than ``count`` pairs
+    """
+    quote = stake_currency.upper()
+    pairs = [f"{base}/{quote}" for base in KNOWN_BASES]
+    if markets:
+        traded = {
+            symbol
+            for symbol, market in load_markets(exchange).items()
+            if market.get("spot") and market.get("active") is not False and market.get("quote") == quote
+        }
+        pairs = [pair for pair in pairs if pair in traded] + sorted(traded.difference(pairs))
+    if len(pairs) < count:
+        if markets:
+            raise ValueError(f"{exchange} only trades {len(pairs)} {quote} pairs, pass the pair names instead")
+        raise ValueError(f"Only {len(pairs)} {quote} pairs are known, pass the pair names or look up the markets")
+    return pairs[:count]
+
+
+def read_pairs_file(path):
+    """
+    Read the pair names of a freqtrade configuration file ``pair_whitelist``.
+
+    :param pathlib.Path path: A configuration file, with the whitelist at the top level, like
+        ``alternative_configs/whitelist_busd.json``, or in its ``exchange`` section
+    """
+    config = load_config_file(str(path))
+    pairs = config.get("pair_whitelist", config.get("exchange", {}).get("pair_whitelist"))
+    if not pairs:
+        raise ValueError(f"{path} has no pair_whitelist")
+    return pairs
+
+
+def _regime_drift(rng, candles):
+    """
+    Per candle log-return drift and volatility multiplier, constant over regimes lasting days.
+    """
+    drift = np.empty(candles)
+    volatility = np.empty(candles)
+    start = 0
+    while start < candles:
+        stop = min(candles, start + int(rng.geometric(1 / (3 * CANDLES_PER_DAY))))
+        # Mostly ranging markets, with the occasional strong trend
+        drift[start:stop] = rng.normal(0, 0.00004) * (4 if rng.random() < 0.15 else 1)
+        volatility[start:stop] = rng.lognormal(0, 0.35)
+        start = stop
+    return drift, volatility
+
+
+def _dips(rng, candles):
+    """
+    Per candle log-return of the dips, a sharp fall over a few candles followed by a slow recovery, and
+    the mask of the falling candles.
+    """
+    returns = np.zeros(candles)
+    falling = np.zeros(candles, dtype=bool)
+    # About one dip every two days
+    for start in np.flatnonzero(rng.random(candles) < 1 / (2 * CANDLES_PER_DAY)):
+        depth = rng.uniform(0.03, 0.15)
+        fall = int(rng.integers(2, 12))
+        recovery = int(rng.integers(30, 300))
+        fall_stop = min(candles, start + fall)
+        returns[start:fall_stop] += np.log1p(-depth) / fall
+        falling[start:fall_stop] = True
+        recovery_stop = min(candles, fall_stop + recovery)
+        returns[fall_stop:recovery_stop] -= np.log1p(-depth) * rng.uniform(0.85, 1.15) / recovery
+    return returns, falling
+
+
+def generate_candles(seed=0, candles=30 * CANDLES_PER_DAY, start=DEFAULT_START, timeframe=BASE_TIMEFRAME):
+    """
+    Generate synthetic candles.
+
+    :param int seed: The candles of a seed are always the same
+    :param int candles: The number of base timeframe candles to generate, the history length
+    :param datetime.datetime start: The first candle date
+    :param str timeframe: ``5m``, or ``15m`` to resample the generated candles, which yields a third of
+        their count
+    :return: A freqtrade OHLCV dataframe
+    """
+    rng = np.random.default_rng(seed)
+    drift, regime_volatility = _regime_drift(rng, candles)
+    dip_returns, falling = _dips(rng, candles)
+    volatility = rng.uniform(0.0015, 0.005) * regime_volatility
+    returns = drift + dip_returns + rng.standard_normal(candles) * volatility
+
+    volume = rng.lognormal(np.log(rng.uniform(1e3, 1e6)), 0.6, candles)
+    # Busier on the large moves, and on the occasional burst of activity
+    volume *= 1 + 100 * np.abs(returns)
+    spikes = rng.random(candles) < 0.005
+    volume[spikes] *= rng.uniform(5, 20, int(spikes.sum()))
+    volume[falling] *= rng.uniform(3, 10, int(falling.sum()))
+    # Single candles without any trades, and the rare outage during which the price doesn't move
+    no_trades = rng.random(candles) < 0.01
+    for outage in np.flatnonzero(rng.random(candles) < 1 / (60 * CANDLES_PER_DAY)):
+        no_trades[slice(outage, outage + int(rng.integers(5, 30)))] = True
+    returns[no_trades] = 0
+    volume[no_trades] = 0
+
+    close = 10 ** rng.uniform(-3, 4) * np.exp(np.cumsum(returns))
+    open_ = np.concatenate((close[:1], close[:-1]))
+    wicks = np.abs(rng.standard_normal((2, candles))) * volatility / 2
+    # The dips go deeper during the candle than where they close
+    wicks[1, falling] *= 4
+    wicks[:, no_trades] = 0
+    frame = pd.DataFrame(
+        {
+            "date": pd.date_range(start, periods=candles, freq="5min"),
+            "open": open_,
+            "high": np.maximum(open_, close) * np.exp(wicks[0]),
+            "low": np.minimum(open_, close) * np.exp(-wicks[1]),
+            "close": close,
+            "volume": volume,
+        }
+    )
+    return resample(frame, timeframe)
+
+
+def resample(frame, timeframe):
+    """
+    Resample base timeframe candles to ``timeframe``, dropping the trailing incomplete candle.
+    """
+    size = TIMEFRAME_CANDLES[timeframe]
+    if size == 1:
+        return frame
+    count = len(frame) // size
+    grouped = {
+        column: frame[column].to_numpy()[slice(count * size)].reshape(count, size)
+        for column in ("open", "high", "low", "close", "volume")
+    }
+    return pd.DataFrame(
+        {
+            "date": frame["date"].iloc[slice(0, count * size, size)].reset_index(drop=True),
+            "open": grouped["open"][:, 0],
+            "high": grouped["high"].max(axis=1),
+            "low": grouped["low"].min(axis=1),
+            "close": grouped["close"][:, -1],
+            "volume": grouped["volume"].sum(axis=1),
+        }
+    )
+
+
+def _write_pair(path, pair, seed, candles, start):
+    """
+    Write the candle files of a pair, in every timeframe.
+    """
+    frame = generate_candles(seed=seed, candles=candles, start=start)
+    for timeframe in TIMEFRAME_CANDLES:
+        resampled = resample(frame, timeframe)
+        dates = resampled["date"].dt.tz_localize(None).to_numpy().astype("datetime64[ms]").astype(np.int64)
+        rows = np.column_stack((dates, resampled[["open", "high", "low", "close", "volume"]].to_numpy()))
+        rows = [[int(row[0]), *row[1:]] for row in rows.tolist()]
+        # Level 1, writing the files is what takes time, they're only meant to be read back locally
+        with gzip.open(path / f"{pair_to_filename(pair)}-{timeframe}.json.gz", "wt", compresslevel=1) as wfh:
+            json.dump(rows, wfh)
+    return pair
+
+
+def write_exchange_data(
+    data_root,
+    exchange="binance",
+    stake_currency="usdt",
+    pairs=10,
+    days=30,
+    start=DEFAULT_START,
+    seed=0,
+    processes=None,
+    markets=False,
+):
+    """
+    Write synthetic candles, and the configuration files using them, laid out like the data submodule.
+
+    :param pathlib.Path data_root: Where to write, the equivalent of ``user_data/data``
+    :param int,list pairs: The number of pairs to generate, named after real pairs of the exchange, see
+        :py:func:`exchange_pairs`, or the pair names
+    :param int days: The history length
+    :param int seed: The base seed, each pair gets its own seed derived from it
+    :param int processes: The process pool size, defaults to the number of cores
+    :param bool markets: Whether to look up the pair names in the exchange markets, see
+        :py:func:`exchange_pairs`
+    :return: The generated pair names
+    """
+    if isinstance(pairs, int):
+        pairs = exchange_pairs(pairs, exchange, stake_currency, markets)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    exchange_dir = data_root / exchange
+    exchange_dir.mkdir(parents=True, exist_ok=True)
+    candles = days * CANDLES_PER_DAY
+    log.info("Generating %d days of %d %s pairs in %s", days, len(pairs), exchange, exchange_dir)
+    # A pair candles only depend on the base seed and the pair position
+    seeds = np.random.SeedSequence(seed).generate_state(len(pairs)).tolist()
+    with ProcessPoolExecutor(max_workers=max(1, min(processes, len(pairs)))) as executor:
+        futures = [
+            executor.submit(_write_pair, exchange_dir, pair, pair_seed, candles, start)
+            for pair, pair_seed in zip(pairs, seeds)
+        ]
+        for future in futures:
+            log.debug("Generated %s", future.result())
+
+    (data_root / "pairlists.json").write_text(
+        json.dumps({"pairlists": [{"method": "StaticPairList"}], "dataformat_ohlcv": "jsongz"}, indent=2)
+    )
+    (data_root / f"pairlists-{stake_currency}.json").write_text(
+        json.dumps({"stake_currency": stake_currency.upper(), "dry_run_wallet": 1000}, indent=2)
+    )
+    (data_root / f"{exchange}-{stake_currency}-static.json").write_text(
+        json.dumps({"exchange": {"name": exchange, "pair_whitelist": pairs, "pair_blacklist": []}}, indent=2)
+    )
+    return pairs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.backtests.synthetic", description=__doc__.split("\n\n", maxsplit=1)[0]
+    )
+    parser.add_argument("data_root", type=Path, help="Where to write, the equivalent of user_data/data")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--stake-currency", default="usdt")
+    pairs = parser.add_mutually_exclusive_group()
+    pairs.add_argument("--pairs", type=int, default=10, help="The number of pairs to generate")
+    pairs.add_argument("--pair", action="append", dest="pair_names", help="A pair name to generate candles for")
+    pairs.add_argument(
+        "--pairs-file", type=Path, help="A freqtrade configuration file, the pair_whitelist of which to generate"
+    )
+    parser.add_argument(
+        "--markets",
+        action="store_true",
+        help="Look up the pair names in the exchange markets, which needs network access",
+    )
+    parser.add_argument("--days", type=int, default=30, help="The history length, in days")
+    parser.add_argument("--start", default=DEFAULT_START.strftime("%Y%m%d"), help="The first candle date, YYYYMMDD")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None)
+    options = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if options.pairs_file:
+        options.pair_names = read_pairs_file(options.pairs_file)
+    write_exchange_data(
+        options.data_root,
+        exchange=options.exchange,
+        stake_currency=options.stake_currency,
+        pairs=options.pair_names or options.pairs,
+        days=options.days,
+        start=datetime.strptime(options.start, "%Y%m%d").replace(tzinfo=timezone.utc),
+        seed=options.seed,
+        processes=options.processes,
+        markets=options.markets,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
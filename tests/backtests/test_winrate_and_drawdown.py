@@ -1,26 +1,103 @@
 # pylint: disable=redefined-outer-name
+import itertools
+import json
+
+import attr
 import pytest
 
 from tests.backtests.helpers import Backtest
 from tests.backtests.helpers import ExpectedResults
+from tests.backtests.runner import BacktestJob
+from tests.backtests.runner import run_backtests
+from tests.backtests.windows import compare_windows
+from tests.backtests.windows import evaluate_windows
+from tests.backtests.windows import widest_timerange
 from tests.conftest import REPO_ROOT
 
 RESULTS = ExpectedResults()
 
 
-@pytest.fixture(scope="session")
-def stake_currency(request):
-    return request.config.getoption("--stake-currency")
+def pytest_generate_tests(metafunc):
+    if "expected_result" not in metafunc.fixturenames:
+        return
+    combinations = list(
+        itertools.product(
+            metafunc.config.getoption("--exchange"),
+            metafunc.config.getoption("--stake-currency"),
+            metafunc.config.getoption("--strategy"),
+        )
+    )
+    if len(combinations) > 1:
+        # When asked for several, only keep the combinations we have expected results for
+        known = {(entry.exchange, entry.stake_currency, entry.strategy) for entry in RESULTS.results}
+        combinations = [combination for combination in combinations if combination in known]
+    metafunc.parametrize(
+        ("exchange", "stake_currency", "strategy"),
+        combinations,
+        ids=["-".join(combination) for combination in combinations],
+        scope="session",
+    )
+
+
+def selected_jobs(session):
+    """
+    Return a :py:class:`BacktestJob` for every selected test.
+    """
+    jobs = []
+    for item in session.items:
+        params = getattr(item, "callspec", None) and item.callspec.params
+        if not params or "timerange" not in params:
+            continue
+        jobs.append(
+            BacktestJob(
+                exchange=params["exchange"],
+                stake_currency=params["stake_currency"],
+                strategy=params["strategy"],
+                timerange=params["timerange"],
+            )
+        )
+    return jobs
+
+
+def single_pass_timerange(session, exchange, stake_currency, strategy):
+    """
+    Return the timerange to backtest once to evaluate every selected window of a combination.
+    """
+    return widest_timerange(
+        job.timerange
+        for job in selected_jobs(session)
+        if (job.exchange, job.stake_currency, job.strategy) == (exchange, stake_currency, strategy)
+    )
 
 
 @pytest.fixture(scope="session")
-def strategy(request):
-    return request.config.getoption("--strategy")
+def in_process_results(request, tmp_path_factory):
+    """
+    Run, on a process pool, every backtest the selected tests need.
+    """
+    windows = request.config.getoption("--backtest-windows")
+    jobs = []
+    for job in selected_jobs(request.session):
+        if windows != "independent":
+            timerange = single_pass_timerange(request.session, job.exchange, job.stake_currency, job.strategy)
+            jobs.append(attr.evolve(job, timerange=timerange))
+        if windows != "single-pass":
+            jobs.append(job)
+    return run_backtests(
+        jobs,
+        tmp_path_factory.mktemp("backtest-results"),
+        processes=request.config.getoption("--backtest-processes"),
+        artifacts_path=request.config.option.artifacts_path,
+        profile=request.config.getoption("--profile-indicators"),
+    )
 
 
 @pytest.fixture(scope="session")
-def exchange(request):
-    return request.config.getoption("--exchange")
+def single_pass_results():
+    """
+    The single pass backtests, run once per session.
+    """
+    return {}
 
 
 @pytest.fixture(params=RESULTS.timeranges())
@@ -56,14 +133,26 @@ def backtest(request, stake_currency, strategy, timerange, exchange, expected_re
             f"There's no exchange data for {expected_result.exchange}. Make sure the repository submodule "
             "is init/update. Check the repository README.md for more information."
         )
-    instance = Backtest(
-        request,
-        stake_currency=stake_currency,
-        strategy=strategy,
-        timerange=timerange,
-        exchange=exchange,
-    )
-    ret = instance()
+    windows = request.config.getoption("--backtest-windows")
+    if windows == "independent":
+        ret = run_backtest(request, exchange, stake_currency, strategy, timerange)
+    else:
+        widest = single_pass_timerange(request.session, exchange, stake_currency, strategy)
+        single_pass = request.getfixturevalue("single_pass_results")
+        key = (exchange, stake_currency, strategy, widest)
+        if key not in single_pass:
+            single_pass[key] = run_backtest(request, exchange, stake_currency, strategy, widest)
+        ret = evaluate_windows(single_pass[key], [timerange])[timerange]
+        if windows == "validate":
+            independent = run_backtest(request, exchange, stake_currency, strategy, timerange)
+            comparison = compare_windows(ret, independent)
+            artifacts_path = request.config.option.artifacts_path
+            if artifacts_path:
+                artifacts_path = artifacts_path / exchange / stake_currency / strategy
+                artifacts_path.mkdir(parents=True, exist_ok=True)
+                (artifacts_path / f"window-validation-{timerange}.json").write_text(json.dumps(comparison))
+            # The independent run is the reference
+            ret = independent
     try:
         yield ret
     finally:
@@ -90,6 +179,20 @@ def backtest(request, stake_currency, strategy, timerange, exchange, expected_re
             pytest.fail(errmsg)
 
 
+def run_backtest(request, exchange, stake_currency, strategy, timerange):
+    if request.config.getoption("--backtest-runner") == "in-process":
+        job = BacktestJob(exchange=exchange, stake_currency=stake_currency, strategy=strategy, timerange=timerange)
+        return request.getfixturevalue("in_process_results")[job]
+    instance = Backtest(
+        request,
+        stake_currency=stake_currency,
+        strategy=strategy,
+        timerange=timerange,
+        exchange=exchange,
+    )
+    return instance()
+
+
 def test_expected_values(backtest, expected_result, subtests, exchange, stake_currency, strategy, timerange):
     errmsg = (
         f"If expected, please update {exchange}({stake_currency}) expected "
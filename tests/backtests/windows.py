@@ -0,0 +1,163 @@
+"""
+Evaluate nested timeranges from a single backtest.
+
+Every timerange in :py:mod:`tests.backtests.data` falls inside the widest one, so instead of
+backtesting each of them, the widest one can be backtested once and each sub-window evaluated from its
+trades. A window checkpoint records the wallet and the open trades at the window boundaries. That state
+is what makes a window of the single run differ from an independent backtest of the same window. An
+independent run starts with a full wallet and no open trades, and force-sells whatever is still open
+at its end.
+"""
+import logging
+from datetime import datetime
+from datetime import timezone
+from types import SimpleNamespace
+
+import attr
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+
+def parse_timerange(timerange):
+    """
+    Return the ``(start, stop)`` datetimes of a ``YYYYMMDD-YYYYMMDD`` timerange.
+    """
+    start, stop = timerange.split("-")
+    return tuple(datetime.strptime(value, "%Y%m%d").replace(tzinfo=timezone.utc) for value in (start, stop))
+
+
+def widest_timerange(timeranges):
+    """
+    Return the smallest timerange containing all of ``timeranges``.
+    """
+    starts, stops = zip(*(timerange.split("-") for timerange in timeranges))
+    return f"{min(starts)}-{max(stops)}"
+
+
+def max_drawdown(profit_ratios):
+    """
+    The maximum drawdown, just like freqtrade computes it, of the cumulated trade profit ratios sorted
+    by close date.
+    """
+    if not len(profit_ratios):
+        return 0.0
+    cumulative = np.cumsum(profit_ratios)
+    return float(np.max(np.maximum.accumulate(cumulative) - cumulative))
+
+
+@attr.s(frozen=True)
+class WindowCheckpoint:
+    """
+    The state of the single run at a window boundary.
+    """
+
+    date = attr.ib()
+    #: The starting balance plus the profit of the trades closed so far
+    wallet = attr.ib()
+    #: The trades open at that date, which an independent run would not have, or would force-sell
+    open_trades = attr.ib()
+
+
+@attr.s(frozen=True)
+class WindowResults:
+    """
+    The results of a sub-window, evaluated from a single backtest of a wider timerange.
+
+    The ``stats_pct`` attribute mimics the :py:class:`~tests.backtests.helpers.BacktestResults` one.
+    """
+
+    timerange = attr.ib()
+    start = attr.ib(repr=False)
+    stop = attr.ib(repr=False)
+    _stats_pct = attr.ib(repr=False)
+    stats_pct = attr.ib(init=False, repr=True)
+
+    @stats_pct.default
+    def _set_stats_pct(self):
+        return SimpleNamespace(**self._stats_pct)
+
+
+def evaluate_windows(results, timeranges):
+    """
+    Evaluate sub-windows from a single backtest.
+
+    The trades opened and closed inside a window count towards its winrate and max drawdown. The
+    trades still open at the window end are only reported, in the end checkpoint, since their
+    outcome in an independent run depends on the force-sell price.
+
+    :param BacktestResults results: The results of a backtest covering every window
+    :param list timeranges: The ``YYYYMMDD-YYYYMMDD`` windows to evaluate
+    :return: A dictionary mapping each timerange to its :py:class:`WindowResults`
+    """
+    starting_balance = getattr(results.results, "starting_balance", 0)
+    trades = results.trades
+    if trades.empty:
+        trades = pd.DataFrame(
+            {
+                "open_date": pd.Series(dtype="datetime64[ns, UTC]"),
+                "close_date": pd.Series(dtype="datetime64[ns, UTC]"),
+                "profit_ratio": pd.Series(dtype=float),
+                "profit_abs": pd.Series(dtype=float),
+            }
+        )
+    trades = trades.sort_values("close_date", kind="stable").reset_index(drop=True)
+
+    def checkpoint(date):
+        closed = trades["close_date"] <= date
+        open_trades = (trades["open_date"] < date) & ~closed
+        return WindowCheckpoint(
+            date=date,
+            wallet=starting_balance + float(trades.loc[closed, "profit_abs"].sum()),
+            open_trades=int(open_trades.sum()),
+        )
+
+    windows = {}
+    for timerange in timeranges:
+        start, stop = parse_timerange(timerange)
+        window = trades[(trades["open_date"] >= start) & (trades["close_date"] <= stop)]
+        count = len(window)
+        wins = int((window["profit_abs"] > 0).sum())
+        start_checkpoint, stop_checkpoint = checkpoint(start), checkpoint(stop)
+        windows[timerange] = WindowResults(
+            timerange=timerange,
+            start=start_checkpoint,
+            stop=stop_checkpoint,
+            stats_pct={
+                "trades": count,
+                "profit_sum_pct": round(float(window["profit_ratio"].sum()) * 100, 2),
+                "max_drawdown": max_drawdown(window["profit_ratio"].to_numpy()) * 100,
+                "winrate": round(wins * 100.0 / count, 2) if count else 0.0,
+                "open_trades_at_start": start_checkpoint.open_trades,
+                "open_trades_at_stop": stop_checkpoint.open_trades,
+            },
+        )
+    return windows
+
+
+def compare_windows(windowed, independent):
+    """
+    Compare a window evaluated from a single run against an independent backtest of it.
+
+    :param WindowResults windowed: The single run window results
+    :param BacktestResults independent: The independent backtest results
+    :return: A dictionary of ``{stat: {"windowed": value, "independent": value, "difference": value}}``
+    """
+    comparison = {}
+    for stat in ("trades", "winrate", "max_drawdown", "profit_sum_pct"):
+        windowed_value = getattr(windowed.stats_pct, stat)
+        independent_value = independent._stats_pct[stat]  # pylint: disable=protected-access
+        comparison[stat] = {
+            "windowed": windowed_value,
+            "independent": independent_value,
+            "difference": round(windowed_value - independent_value, 4),
+        }
+    log.info(
+        "Window %s, single run vs independent run (%d open trades at start, %d at stop): %s",
+        windowed.timerange,
+        windowed.stats_pct.open_trades_at_start,
+        windowed.stats_pct.open_trades_at_stop,
+        comparison,
+    )
+    return comparison
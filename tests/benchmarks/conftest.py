@@ -0,0 +1,230 @@
+"""
+Micro-benchmarks of the strategies hot paths.
+
+They only run when passing ``--benchmarks`` and never need exchange data nor network access. Each
+benchmark median time and peak memory are compared against the baselines file, failing on a regression
+past ``--benchmark-time-threshold``, respectively ``--benchmark-memory-threshold``. Run with
+``--update-benchmark-baselines`` to record new baselines instead.
+
+Wall-clock times only compare on the same machine, under the same load, so the baselines store the
+median times relative to the one of a fixed calibration workload, see :py:func:`calibrate`, timed right
+before and after each benchmark. That still leaves tens of percents of noise on a busy machine, hence
+the generous default time threshold, tighten it on a quiet machine. The peak memory doesn't depend on
+the machine and is stored as is.
+"""
+# pylint: disable=redefined-outer-name
+import json
+import logging
+import platform
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import attr
+import numpy as np
+import pytest
+
+from goddard import engine
+
+log = logging.getLogger(__name__)
+
+# Absolute slack on top of the thresholds, so that the measurement noise of the tiny benchmarks
+# doesn't fail them
+TIME_SLACK = 0.0005
+MEMORY_SLACK = 64 * 1024
+
+
+def calibrate(rounds=5):
+    """
+    Time a fixed workload, a Python loop and a few numpy array operations, like the benchmarked code.
+
+    :return: The median time of a round, in seconds
+    """
+    values = np.random.default_rng(0).standard_normal(200_000)
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        total = 0.0
+        for value in values[:50_000].tolist():
+            total = 0.9 * total + value
+        np.sort(values)
+        np.cumsum(values)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+@attr.s(frozen=True)
+class BenchmarkResult:
+    name = attr.ib()
+    #: The median time of a round, in seconds
+    median = attr.ib()
+    #: The median time of the calibration workload, averaged over before and after the benchmark, in seconds
+    calibration = attr.ib()
+    #: The peak memory allocated during a round, in bytes
+    peak_memory = attr.ib()
+    rounds = attr.ib()
+
+    @property
+    def relative_median(self):
+        """
+        The median time, in calibration workload rounds.
+        """
+        return self.median / self.calibration
+
+
+class Benchmark:
+    """
+    Time a function and measure its peak memory.
+
+    :param str name: The benchmark name, the key of its baseline
+    :param dict baseline: The baseline, ``None`` when there's none
+    """
+
+    def __init__(self, name, baseline, time_threshold, memory_threshold):
+        self.name = name
+        self.baseline = baseline
+        self.time_threshold = time_threshold
+        self.memory_threshold = memory_threshold
+        self.result = None
+
+    def __call__(self, func, setup=None, rounds=5):
+        """
+        Run ``func(*setup())`` ``rounds`` times, plus once to measure the peak memory.
+
+        :param callable func: The function to benchmark
+        :param callable setup: Returns the ``func`` arguments, called before each round and not timed
+        :return: A :py:class:`BenchmarkResult`
+        """
+        before = calibrate()
+        times = []
+        for _ in range(rounds):
+            args = setup() if setup else ()
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+
+        # Tracing the allocations slows everything down, so the memory is measured on its own round
+        args = setup() if setup else ()
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        calibration = statistics.mean((before, calibrate()))
+
+        self.result = BenchmarkResult(
+            name=self.name,
+            median=statistics.median(times),
+            calibration=calibration,
+            peak_memory=peak_memory,
+            rounds=rounds,
+        )
+        log.info(
+            "%s: median %.6fs, %.3f calibration rounds, peak memory %.1f MiB",
+            self.name,
+            self.result.median,
+            self.result.relative_median,
+            self.result.peak_memory / 2**20,
+        )
+        self._check()
+        return self.result
+
+    def _check(self):
+        if self.baseline is None:
+            log.warning("There's no baseline for %s", self.name)
+            return
+        errors = []
+        log.info(
+            "%s: median time %.3f calibration rounds, %+.1f%% against the baseline",
+            self.name,
+            self.result.relative_median,
+            100 * (self.result.relative_median / self.baseline["relative_median"] - 1),
+        )
+        slack = TIME_SLACK / self.result.calibration
+        max_median = self.baseline["relative_median"] * (1 + self.time_threshold) + slack
+        if self.result.relative_median > max_median:
+            errors.append(f"median time {self.result.relative_median:.3f} > {max_median:.3f} calibration rounds")
+        max_peak_memory = self.baseline["peak_memory"] * (1 + self.memory_threshold) + MEMORY_SLACK
+        if self.result.peak_memory > max_peak_memory:
+            errors.append(f"peak memory {self.result.peak_memory} bytes > {max_peak_memory:.0f} bytes")
+        if errors:
+            pytest.fail(f"{self.name} regressed: {', '.join(errors)}")
+
+
+@pytest.fixture(autouse=True)
+def only_when_asked(request):
+    if not request.config.getoption("--benchmarks"):
+        pytest.skip("Pass --benchmarks to run the micro-benchmarks")
+
+
+@pytest.fixture(autouse=True)
+def clear_indicators_cache():
+    engine.clear_cache()
+    try:
+        yield
+    finally:
+        engine.clear_cache()
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    """
+    Collect the results of the session, storing them as the new baselines when asked to.
+    """
+    baselines_path = Path(request.config.getoption("--benchmark-baselines"))
+    baselines = {"machine": {}, "benchmarks": {}}
+    if baselines_path.is_file():
+        baselines = json.loads(baselines_path.read_text())
+    results = {}
+    try:
+        yield baselines, results
+    finally:
+        if results and request.config.getoption("--update-benchmark-baselines"):
+            baselines["machine"] = {
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+            }
+            baselines["benchmarks"].update(
+                {
+                    name: {"relative_median": result.relative_median, "peak_memory": result.peak_memory}
+                    for name, result in results.items()
+                }
+            )
+            baselines["benchmarks"] = dict(sorted(baselines["benchmarks"].items()))
+            baselines_path.write_text(json.dumps(baselines, indent=2) + "\n")
+            log.info("Stored %d benchmark baselines in %s", len(results), baselines_path)
+        artifacts_path = request.config.option.artifacts_path
+        if results and artifacts_path:
+            (artifacts_path / "benchmark-results.json").write_text(
+                json.dumps(
+                    {
+                        name: dict(attr.asdict(result), relative_median=result.relative_median)
+                        for name, result in results.items()
+                    },
+                    indent=2,
+                )
+            )
+
+
+@pytest.fixture
+def benchmark(request, benchmark_results):
+    baselines, results = benchmark_results
+    # The test id, without the test module, is the benchmark name
+    name = request.node.nodeid.split("::", 1)[1]
+    baseline = None
+    if not request.config.getoption("--update-benchmark-baselines"):
+        baseline = baselines["benchmarks"].get(name)
+    instance = Benchmark(
+        name,
+        baseline,
+        time_threshold=request.config.getoption("--benchmark-time-threshold"),
+        memory_threshold=request.config.getoption("--benchmark-memory-threshold"),
+    )
+    try:
+        yield instance
+    finally:
+        if instance.result is not None:
+            results[name] = instance.result
@@ -0,0 +1,141 @@
+# pylint: disable=redefined-outer-name
+import functools
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import talib.abstract as ta
+
+from goddard import engine
+from goddard import talib_direct
+from tests.candles import make_ohlcv
+
+CANDLES = (1_000, 10_000, 100_000, 1_000_000)
+PAIRS = (1, 25, 100)
+# The history length of each pair when benchmarking several pairs
+PAIR_CANDLES = 10_000
+# The TA-Lib functions of the indicators, and parameters to call them with
+TALIB_CALLS = {
+    "EMA": {"timeperiod": 50},
+    "SMA": {"timeperiod": 20},
+    "STDDEV": {"timeperiod": 20, "nbdev": 1.0},
+    "ATR": {"timeperiod": 14},
+}
+
+
+def rounds(candles):
+    """
+    More rounds for the quick benchmarks, to keep their median meaningful.
+    """
+    return max(5, min(20, 1_000_000 // candles))
+
+
+@functools.lru_cache(maxsize=None)
+def ohlcv_frames(pairs, candles):
+    return tuple(make_ohlcv(candles=candles, seed=seed) for seed in range(pairs))
+
+
+@functools.lru_cache(maxsize=None)
+def indicator_frames(strategy_name, pairs, candles):
+    strategy = load_strategy(strategy_name)
+    frames = tuple(
+        strategy.populate_indicators(frame.copy(), {"pair": f"PAIR{index}/BUSD"})
+        for index, frame in enumerate(ohlcv_frames(pairs, candles))
+    )
+    engine.clear_cache()
+    return frames
+
+
+def load_strategy(name):
+    if name == "Apollo11":
+        from Apollo11 import Apollo11 as strategy_class  # pylint: disable=import-outside-toplevel
+    else:
+        from Saturn5 import Saturn5 as strategy_class  # pylint: disable=import-outside-toplevel
+    return strategy_class({})
+
+
+@pytest.fixture(params=["Apollo11", "Saturn5"])
+def strategy_name(request):
+    return request.param
+
+
+@pytest.fixture
+def strategy(strategy_name):
+    return load_strategy(strategy_name)
+
+
+@pytest.fixture(
+    params=[(1, candles) for candles in CANDLES] + [(pairs, PAIR_CANDLES) for pairs in PAIRS if pairs > 1],
+    ids=lambda param: f"{param[0]}pairs-{param[1]}candles",
+)
+def size(request):
+    """
+    The ``(pairs, candles per pair)`` to benchmark.
+    """
+    return request.param
+
+
+def test_populate_indicators(benchmark, strategy, size):
+    pairs, candles = size
+
+    def setup():
+        engine.clear_cache()
+        return ([frame.copy() for frame in ohlcv_frames(pairs, candles)],)
+
+    def populate_indicators(frames):
+        for index, frame in enumerate(frames):
+            strategy.populate_indicators(frame, {"pair": f"PAIR{index}/BUSD"})
+
+    benchmark(populate_indicators, setup=setup, rounds=rounds(pairs * candles))
+
+
+@pytest.mark.parametrize("api", ["abstract", "direct"])
+@pytest.mark.parametrize("name", list(TALIB_CALLS))
+def test_talib_call(benchmark, name, api):
+    # The per call overhead of ``talib.abstract`` against calling TA-Lib on the candle arrays, on few
+    # candles so that the overhead weighs
+    function = getattr(ta, name)
+    frame = ohlcv_frames(1, CANDLES[0])[0]
+    if api == "abstract":
+        call = functools.partial(function, frame, **TALIB_CALLS[name])
+    else:
+        call = functools.partial(talib_direct.call, function, talib_direct.candle_arrays(frame), **TALIB_CALLS[name])
+
+    def talib_calls():
+        for _ in range(1000):
+            call()
+
+    benchmark(talib_calls, rounds=5)
+
+
+def test_populate_buy_trend(benchmark, strategy, strategy_name, size):
+    pairs, candles = size
+
+    def setup():
+        return ([frame.copy() for frame in indicator_frames(strategy_name, pairs, candles)],)
+
+    def populate_buy_trend(frames):
+        for index, frame in enumerate(frames):
+            strategy.populate_buy_trend(frame, {"pair": f"PAIR{index}/BUSD"})
+
+    benchmark(populate_buy_trend, setup=setup, rounds=rounds(pairs * candles))
+
+
+def test_custom_stoploss(benchmark, strategy, size):
+    if not strategy.use_custom_stoploss:
+        pytest.skip(f"{strategy.__class__.__name__} does not use a custom stoploss")
+    pairs, candles = size
+    calls = pairs * candles
+    rng = np.random.default_rng(42)
+    now = datetime(2021, 10, 1, tzinfo=timezone.utc)
+    trades = [SimpleNamespace(open_date_utc=now - timedelta(hours=hours)) for hours in rng.uniform(0, 240, 1000)]
+    profits = rng.uniform(-0.2, 0.3, calls).tolist()
+
+    def custom_stoploss():
+        for index, current_profit in enumerate(profits):
+            strategy.custom_stoploss("BTC/BUSD", trades[index % 1000], now, 1.0, current_profit)
+
+    benchmark(custom_stoploss, rounds=rounds(calls))
@@ -0,0 +1,28 @@
+"""
+Deterministic candles shared by the unit tests and the micro-benchmarks.
+"""
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(candles=2000, seed=42, timeframe="15min"):
+    """
+    Deterministic random walk candles, good enough to exercise the indicators.
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, candles)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, candles)) * close
+    volume = rng.lognormal(10, 1, candles)
+    # Some candles without any trades
+    volume[rng.random(candles) < 0.01] = 0
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2021-01-01", periods=candles, freq=timeframe, tz="UTC"),
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": volume,
+        }
+    )
@@ -8,12 +8,115 @@ sys.path.insert(0, str(REPO_ROOT))
 
 def pytest_addoption(parser):
     parser.addoption("--artifacts-path", default=None, help="Path to write generated test artifacts")
-    parser.addoption("--stake-currency", default="busd", help="Stake currency", choices=["usdt", "busd"])
-    parser.addoption("--strategy", default="Apollo11", help="Strategy to test", choices=["Apollo11", "Saturn5"])
-    parser.addoption("--exchange", default="binance", help="Exchange to test", choices=["binance", "kucoin"])
+    parser.addoption(
+        "--stake-currency",
+        action="append",
+        help="Stake currency, pass it several times to test several. Defaults to busd",
+        choices=["usdt", "busd"],
+    )
+    parser.addoption(
+        "--strategy",
+        action="append",
+        help="Strategy to test, pass it several times to test several. Defaults to Apollo11",
+        choices=["Apollo11", "Saturn5"],
+    )
+    parser.addoption(
+        "--exchange",
+        action="append",
+        help="Exchange to test, pass it several times to test several. Defaults to binance",
+        choices=["binance", "kucoin"],
+    )
+    parser.addoption(
+        "--backtest-cache-dir",
+        default=str(REPO_ROOT / ".backtest-cache"),
+        help="Where to cache the backtest results",
+    )
+    parser.addoption(
+        "--no-backtest-cache", action="store_true", default=False, help="Always backtest, ignoring cached results"
+    )
+    parser.addoption(
+        "--backtest-cache",
+        action="store_true",
+        default=False,
+        help="Cache the backtest results on CI too, where they are not cached by default",
+    )
+    parser.addoption(
+        "--clear-backtest-cache", action="store_true", default=False, help="Invalidate the cached backtest results"
+    )
+    parser.addoption(
+        "--backtest-runner",
+        default="subprocess",
+        choices=["subprocess", "in-process"],
+        help="Run each backtest in a freqtrade subprocess, or all of them in-process, on a process pool",
+    )
+    parser.addoption(
+        "--backtest-windows",
+        default="independent",
+        choices=["independent", "single-pass", "validate"],
+        help=(
+            "Backtest each timerange independently, or backtest the widest one once and evaluate the others "
+            "from it. 'validate' does both and logs the differences"
+        ),
+    )
+    parser.addoption(
+        "--backtest-processes",
+        type=int,
+        default=None,
+        help="The in-process runner process pool size. Defaults to the number of cores",
+    )
+    parser.addoption(
+        "--profile-indicators",
+        action="store_true",
+        default=False,
+        help=(
+            "Profile the indicator steps and buy signal masks of the backtests, storing the reports with "
+            "the artifacts. The backtest cache is not read from when profiling"
+        ),
+    )
+
+    parser.addoption(
+        "--benchmarks", action="store_true", default=False, help="Run the micro-benchmarks in tests/benchmarks"
+    )
+    parser.addoption(
+        "--benchmark-baselines",
+        default=str(REPO_ROOT / "tests" / "benchmarks" / "baselines.json"),
+        help="The micro-benchmarks baselines file",
+    )
+    parser.addoption(
+        "--update-benchmark-baselines",
+        action="store_true",
+        default=False,
+        help="Store the micro-benchmarks results as the new baselines instead of comparing against them",
+    )
+    parser.addoption(
+        "--benchmark-time-threshold",
+        type=float,
+        default=0.5,
+        help="Fail a micro-benchmark when its calibrated median time regresses by more than this ratio",
+    )
+    parser.addoption(
+        "--benchmark-memory-threshold",
+        type=float,
+        default=0.10,
+        help="Fail a micro-benchmark when its peak memory regresses by more than this ratio",
+    )
 
 
 def pytest_configure(config):
+    from tests.backtests.cache import BacktestCache  # pylint: disable=import-outside-toplevel
+    from tests.backtests.cache import on_ci  # pylint: disable=import-outside-toplevel
+
+    config.backtest_cache = None
+    if not config.option.no_backtest_cache and (config.option.backtest_cache or not on_ci()):
+        config.backtest_cache = BacktestCache(Path(config.option.backtest_cache_dir).resolve())
+        if config.option.clear_backtest_cache:
+            config.backtest_cache.clear()
+    if not config.option.stake_currency:
+        config.option.stake_currency = ["busd"]
+    if not config.option.strategy:
+        config.option.strategy = ["Apollo11"]
+    if not config.option.exchange:
+        config.option.exchange = ["binance"]
     if config.option.artifacts_path:
         config.option.artifacts_path = Path(config.option.artifacts_path).resolve()
         if not config.option.artifacts_path.is_dir():
@@ -0,0 +1,33 @@
+# pylint: disable=redefined-outer-name
+import pytest
+
+from goddard import engine
+from tests.candles import make_ohlcv
+
+
+@pytest.fixture
+def ohlcv():
+    return make_ohlcv()
+
+
+@pytest.fixture(autouse=True)
+def clear_indicators_cache():
+    engine.clear_cache()
+    try:
+        yield
+    finally:
+        engine.clear_cache()
+
+
+@pytest.fixture
+def apollo11():
+    from Apollo11 import Apollo11  # pylint: disable=import-outside-toplevel
+
+    return Apollo11({})
+
+
+@pytest.fixture
+def saturn5():
+    from Saturn5 import Saturn5  # pylint: disable=import-outside-toplevel
+
+    return Saturn5({})
@@ -0,0 +1,91 @@
+# pylint: disable=redefined-outer-name
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.backtests.analytics import TradeAnalytics
+from tests.backtests.windows import max_drawdown
+
+
+@pytest.fixture(scope="module")
+def trades():
+    rng = np.random.default_rng(7)
+    count = 20_000
+    open_date = pd.Timestamp("2021-01-01", tz="UTC") + pd.to_timedelta(rng.integers(0, 270 * 24 * 60, count), "min")
+    close_date = open_date + pd.to_timedelta(rng.integers(15, 3 * 24 * 60, count), "min")
+    profit_ratio = rng.normal(0.002, 0.03, count)
+    return pd.DataFrame(
+        {
+            "pair": rng.choice(["BTC/BUSD", "ETH/BUSD", "ADA/BUSD", "SOL/BUSD"], count),
+            "buy_tag": rng.choice(
+                np.array(["buy_signal_1", "buy_signal_2", "buy_signal_3", None], dtype=object), count
+            ),
+            "sell_reason": rng.choice(["roi", "stop_loss", "trailing_stop_loss", "force_sell"], count),
+            "open_date": open_date,
+            "close_date": close_date,
+            "profit_ratio": profit_ratio,
+            "profit_abs": profit_ratio * 150,
+        }
+    )
+
+
+def reference_breakdown(trades, key):
+    stats = defaultdict(lambda: {"trades": 0, "wins": 0, "losses": 0, "force_sells": 0, "profit_abs": 0.0})
+    for trade in trades.itertuples():
+        group = stats[key(trade)]
+        group["trades"] += 1
+        group["profit_abs"] += trade.profit_abs
+        if trade.sell_reason == "force_sell":
+            group["force_sells"] += 1
+        elif trade.profit_abs > 0:
+            group["wins"] += 1
+        else:
+            group["losses"] += 1
+    return stats
+
+
+@pytest.mark.parametrize(
+    "by,key",
+    [
+        ("buy_tag", lambda trade: trade.buy_tag if isinstance(trade.buy_tag, str) else "None"),
+        ("pair", lambda trade: trade.pair),
+        ("month", lambda trade: trade.close_date.tz_localize(None).to_period("M")),
+        ("exit_reason", lambda trade: trade.sell_reason),
+    ],
+)
+def test_breakdown(trades, by, key):
+    stats = TradeAnalytics(trades).breakdown(by)
+    expected = reference_breakdown(trades, key)
+
+    assert stats.index.name == by
+    assert set(stats.index) == set(expected)
+    for group, values in expected.items():
+        row = stats.loc[group]
+        for column in ("trades", "wins", "losses", "force_sells"):
+            assert row[column] == values[column], (group, column)
+        assert row["profit_abs"] == pytest.approx(values["profit_abs"])
+        assert row["winrate"] == round(values["wins"] * 100.0 / values["trades"], 2)
+    assert stats["trades"].sum() == len(trades)
+
+
+def test_durations(trades):
+    stats = TradeAnalytics(trades).by_pair()
+    durations = (trades["close_date"] - trades["open_date"]).dt.total_seconds() / 60
+
+    assert stats.loc["BTC/BUSD", "duration_mean"] == pytest.approx(durations[trades["pair"] == "BTC/BUSD"].mean())
+    assert stats["duration_max"].max() == durations.max()
+
+
+@pytest.mark.parametrize("by", ["buy_tag", "pair", "month", "exit_reason"])
+def test_drawdown_contributions_add_up(trades, by):
+    stats = TradeAnalytics(trades).breakdown(by)
+    profit_ratios = trades.sort_values("close_date", kind="stable")["profit_ratio"].to_numpy()
+
+    assert stats["drawdown_contribution"].sum() == pytest.approx(max_drawdown(profit_ratios))
+
+
+def test_no_trades():
+    stats = TradeAnalytics(pd.DataFrame()).by_buy_tag()
+    assert stats.empty
@@ -0,0 +1,123 @@
+# pylint: disable=redefined-outer-name
+import logging
+
+import pytest
+
+from tests.backtests import cache as backtest_cache
+from tests.backtests.cache import BacktestCache
+from tests.backtests.helpers import backtest_cmdline
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / "repo"
+    (root / "goddard").mkdir(parents=True)
+    (root / "goddard" / "engine.py").write_text("# engine")
+    (root / "Apollo11.py").write_text("# Apollo11")
+    data_dir = root / "user_data" / "data"
+    (data_dir / "binance").mkdir(parents=True)
+    (data_dir / "binance" / "BTC_BUSD-15m.json.gz").write_bytes(b"candles")
+    for name in ("pairlists.json", "pairlists-busd.json", "binance-busd-static.json"):
+        (data_dir / name).write_text("{}")
+    return root
+
+
+@pytest.fixture
+def cache(root, tmp_path):
+    return BacktestCache(tmp_path / "cache", root=root)
+
+
+def cmdline(results_file="results.json", timerange="20210801-20210901"):
+    return backtest_cmdline(
+        exchange="binance",
+        stake_currency="busd",
+        strategies=["Apollo11"],
+        timerange=timerange,
+        results_file=results_file,
+    )
+
+
+def key(cache, **kwargs):
+    return cache.key(cmdline(**kwargs), "Apollo11", "binance")
+
+
+def test_key_is_stable(cache):
+    assert key(cache) == key(cache, results_file="elsewhere.json")
+    assert key(cache) == key(BacktestCache(cache.path, root=cache.root))
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "Apollo11.py",
+        "goddard/engine.py",
+        "user_data/data/pairlists-busd.json",
+        "user_data/data/binance/BTC_BUSD-15m.json.gz",
+    ],
+)
+def test_key_changes_with_inputs(cache, root, path):
+    before = key(cache)
+    (root / path).write_text("changed")
+    assert key(cache) != before
+
+
+def test_key_changes_with_arguments(cache):
+    assert key(cache) != key(cache, timerange="20210901-20211001")
+
+
+@pytest.mark.parametrize("name", ["python", "freqtrade", "TA-Lib", "numpy", "pandas"])
+def test_key_changes_with_dependency_versions(cache, name):
+    versions = dict(cache.versions, **{name: "0.0.0"})
+    assert cache.versions[name] != "0.0.0"
+
+    assert key(cache) != key(BacktestCache(cache.path, root=cache.root, versions=versions))
+
+
+@pytest.mark.parametrize("value,expected", [("true", True), ("1", True), ("", False), ("false", False)])
+def test_on_ci(monkeypatch, value, expected):
+    monkeypatch.setenv("CI", value)
+    assert backtest_cache.on_ci() is expected
+
+
+def test_not_on_ci_without_the_variable(monkeypatch):
+    monkeypatch.delenv("CI", raising=False)
+    assert backtest_cache.on_ci() is False
+
+
+def test_key_uses_the_data_root_candles(cache, root, tmp_path):
+    data_root = tmp_path / "synthetic"
+    (data_root / "binance").mkdir(parents=True)
+    candles = data_root / "binance" / "BTC_USDT-5m.json.gz"
+    candles.write_bytes(b"candles")
+    args = {
+        "exchange": "binance",
+        "stake_currency": "busd",
+        "strategies": ["Apollo11"],
+        "timerange": "20210801-20210901",
+    }
+    synthetic_cmdline = backtest_cmdline(results_file="results.json", data_root=data_root, **args)
+    before = cache.key(synthetic_cmdline, "Apollo11", "binance")
+
+    (root / "user_data" / "data" / "binance" / "BTC_BUSD-15m.json.gz").write_text("changed")
+    assert cache.key(synthetic_cmdline, "Apollo11", "binance") == before
+    candles.write_bytes(b"changed")
+    assert cache.key(synthetic_cmdline, "Apollo11", "binance") != before
+
+
+def test_store_load_and_clear(cache, tmp_path, caplog):
+    results_file = tmp_path / "backtest-results-2021.json"
+    results_file.write_text('{"strategy": {}}')
+    caplog.set_level(logging.INFO)
+    cache_key = key(cache)
+
+    assert cache.load(cache_key) is None
+    cache.store(cache_key, results_file, "output")
+    cached_file, stdout = cache.load(cache_key)
+    assert cached_file.name == results_file.name
+    assert cached_file.read_text() == results_file.read_text()
+    assert stdout == "output"
+    assert "Backtest cache miss" in caplog.text
+    assert "Backtest cache hit" in caplog.text
+
+    cache.clear()
+    assert cache.load(cache_key) is None
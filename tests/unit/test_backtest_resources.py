@@ -0,0 +1,48 @@
+import sys
+
+from tests.backtests import resources
+from tests.conftest import REPO_ROOT
+
+# Allocates and touches 64MiB, then spins for 0.2s of CPU time
+ALLOCATE_AND_SPIN = """
+import time
+data = b"\x01" * (64 * 2**20)
+start = time.process_time()
+while time.process_time() - start < 0.2:
+    pass
+print("done")
+"""
+
+
+def test_run_process():
+    exitcode, stdout, stderr, usage = resources.run_process([sys.executable, "-c", ALLOCATE_AND_SPIN], cwd=REPO_ROOT)
+
+    assert (exitcode, stdout, stderr) == (0, "done", "")
+    assert usage.cpu_seconds >= 0.2
+    assert usage.wall_seconds >= usage.cpu_seconds * 0.9
+    # The process peak only, not the test process one
+    assert 64 * 2**20 < usage.peak_rss < 128 * 2**20
+
+
+def test_run_process_failure():
+    exitcode, _, stderr, usage = resources.run_process(
+        [sys.executable, "-c", "import sys; sys.exit('failed')"], cwd=REPO_ROOT
+    )
+
+    assert (exitcode, stderr) == (1, "failed")
+    assert usage.wall_seconds > 0
+
+
+def test_peak_rss():
+    resources.reset_peak_rss()
+    before = resources.peak_rss()
+    data = b"\x01" * (32 * 2**20)
+
+    assert resources.peak_rss() >= before + 30 * 2**20
+    del data
+
+
+def test_ci_results():
+    usage = resources.ResourceUsage(wall_seconds=61.26, cpu_seconds=58.04, peak_rss=int(1.5 * 2**30))
+
+    assert usage.ci_results() == {"runtime_seconds": 61.3, "cpu_seconds": 58.0, "peak_rss_mib": 1536.0}
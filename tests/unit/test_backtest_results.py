@@ -0,0 +1,86 @@
+# pylint: disable=redefined-outer-name
+import json
+
+import attr
+import pytest
+
+from tests.backtests.helpers import BacktestResults
+from tests.backtests.helpers import store_artifacts
+from tests.backtests.resources import ResourceUsage
+
+
+@pytest.fixture
+def results():
+    trades = [
+        {"buy_tag": "buy_signal_2", "profit_abs": 1.5, "sell_reason": "roi", "open_date": "2021-08-01 00:00:00+00:00"},
+        {"buy_tag": None, "profit_abs": -1.0, "sell_reason": "stop_loss", "open_date": "2021-08-02 00:00:00+00:00"},
+        {"buy_tag": "buy_signal_2", "profit_abs": 0, "sell_reason": "roi", "open_date": "2021-08-03 00:00:00+00:00"},
+        {
+            "buy_tag": "buy_signal_1",
+            "profit_abs": 2.0,
+            "sell_reason": "force_sell",
+            "open_date": "2021-08-04 00:00:00+00:00",
+        },
+    ]
+    raw_data = {
+        "strategy": {"Apollo11": {"trades": trades, "max_drawdown": 0.1234}},
+        "strategy_comparison": [
+            {
+                "duration_avg": "1:00:00",
+                "profit_sum_pct": 2.5,
+                "profit_mean_pct": 0.62,
+                "profit_total_pct": 1.67,
+                "trades": 4,
+                "wins": 1,
+            }
+        ],
+    }
+    return BacktestResults(strategy="Apollo11", stdout="", stderr="", raw_data=raw_data)
+
+
+def test_stats_pct(results):
+    assert results._stats_pct == {
+        "duration_avg": "1:00:00",
+        "profit_sum_pct": 2.5,
+        "profit_mean_pct": 0.62,
+        "profit_total_pct": 1.67,
+        "max_drawdown": 12.34,
+        "trades": 4,
+        "winrate": 25.0,
+        "buy_signal_2 wins / losses / force-sell": "1 / 1 / 0",
+        "None wins / losses / force-sell": "0 / 1 / 0",
+        "buy_signal_1 wins / losses / force-sell": "0 / 0 / 1",
+    }
+    assert results.stats_pct.winrate == 25.0
+
+
+def test_trades_are_only_loaded_when_asked(results):
+    assert results.results.max_drawdown == 0.1234
+    assert not hasattr(results.results, "trades")
+    assert "trades" not in vars(results)
+
+    trades = results.trades
+
+    assert len(trades) == 4
+    assert str(trades["open_date"].dt.tz) == "UTC"
+    assert results.trades is trades
+
+
+def test_ci_results_hold_the_resource_usage(results, tmp_path):
+    results_file = tmp_path / "backtest-results-2021.json"
+    results_file.write_text("{}")
+    usage = ResourceUsage(wall_seconds=12.345, cpu_seconds=11.96, peak_rss=512 * 2**20)
+
+    store_artifacts(tmp_path / "artifacts", "20210801-20210901", results_file, attr.evolve(results, usage=usage))
+    # A cached backtest has no resource usage to report
+    store_artifacts(tmp_path / "cached", "20210801-20210901", results_file, results)
+
+    ci_results = json.loads((tmp_path / "artifacts" / "ci-results-20210801-20210901.json").read_text())
+    assert ci_results["20210801-20210901"] == {
+        **results._stats_pct,  # pylint: disable=protected-access
+        "runtime_seconds": 12.3,
+        "cpu_seconds": 12.0,
+        "peak_rss_mib": 512.0,
+    }
+    cached = json.loads((tmp_path / "cached" / "ci-results-20210801-20210901.json").read_text())
+    assert "runtime_seconds" not in cached["20210801-20210901"]
@@ -0,0 +1,45 @@
+import pandas as pd
+from freqtrade.configuration import TimeRange
+
+from tests.backtests.runner import _chunk_jobs
+from tests.backtests.runner import _slice_data
+from tests.backtests.runner import BacktestJob
+
+
+def test_chunks_only_hold_one_group():
+    jobs = [
+        BacktestJob(exchange=exchange, stake_currency=stake_currency, strategy=strategy, timerange=timerange)
+        for exchange, stake_currency in (("binance", "busd"), ("binance", "usdt"), ("kucoin", "usdt"))
+        for strategy in ("Apollo11", "Saturn5")
+        for timerange in ("20210801-20210901", "20210901-20211001")
+    ]
+
+    chunks = _chunk_jobs(jobs, processes=6)
+
+    assert len(chunks) == 6
+    assert sorted(job for chunk in chunks for job in chunk) == sorted(jobs)
+    for chunk in chunks:
+        assert len({job.group for job in chunk}) == 1
+
+
+def test_less_jobs_than_processes():
+    jobs = [BacktestJob(exchange="binance", stake_currency="busd", strategy="Apollo11", timerange="20210801-")]
+
+    assert _chunk_jobs(jobs, processes=8) == [jobs]
+
+
+def test_slice_data_keeps_startup_candles():
+    dates = pd.date_range("2021-07-01", "2021-10-01", freq="15min", tz="UTC")
+    data = {
+        "BTC/BUSD": pd.DataFrame({"date": dates, "close": range(len(dates))}),
+        # Listed after the timerange end
+        "NEW/BUSD": pd.DataFrame({"date": dates[-10:], "close": range(10)}),
+    }
+
+    window = _slice_data(data, TimeRange.parse_timerange("20210801-20210901"), startup_candles=200)
+
+    assert list(window) == ["BTC/BUSD"]
+    frame = window["BTC/BUSD"]
+    start = frame["date"].searchsorted(pd.Timestamp("2021-08-01", tz="UTC"))
+    assert start == 200
+    assert frame["date"].iloc[-1] == pd.Timestamp("2021-09-01", tz="UTC")
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from tests.backtests.helpers import BacktestResults
+from tests.backtests.windows import evaluate_windows
+from tests.backtests.windows import max_drawdown
+from tests.backtests.windows import widest_timerange
+
+
+def reference_max_drawdown(profit_ratios):
+    """
+    freqtrade's ``calculate_max_drawdown`` on the profit ratio column.
+    """
+    cumulative = pd.Series(profit_ratios).cumsum()
+    return abs(min(cumulative - cumulative.cummax()))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_max_drawdown(seed):
+    profit_ratios = np.random.default_rng(seed).normal(0.001, 0.03, size=500)
+    assert max_drawdown(profit_ratios) == pytest.approx(reference_max_drawdown(profit_ratios))
+
+
+def test_widest_timerange():
+    assert widest_timerange(["20210801-20210901", "20210101-20211001", "20210901-20211101"]) == "20210101-20211101"
+
+
+def trade(open_date, close_date, profit_ratio):
+    return {
+        "open_date": f"{open_date} 00:00:00+00:00",
+        "close_date": f"{close_date} 00:00:00+00:00",
+        "profit_ratio": profit_ratio,
+        "profit_abs": profit_ratio * 100,
+    }
+
+
+def test_evaluate_windows():
+    trades = [
+        trade("2021-07-20", "2021-08-02", 0.01),
+        trade("2021-08-05", "2021-08-06", 0.02),
+        trade("2021-08-10", "2021-08-11", -0.05),
+        trade("2021-08-20", "2021-08-21", 0.01),
+        trade("2021-08-30", "2021-09-03", 0.01),
+        trade("2021-09-05", "2021-09-06", -0.01),
+    ]
+    results = BacktestResults(
+        strategy="Apollo11",
+        stdout="",
+        stderr="",
+        raw_data={"strategy": {"Apollo11": {"trades": trades, "starting_balance": 1000}}},
+    )
+
+    windows = evaluate_windows(results, ["20210801-20210901", "20210901-20211001"])
+
+    august = windows["20210801-20210901"]
+    assert august.stats_pct.trades == 3
+    assert august.stats_pct.winrate == 66.67
+    assert august.stats_pct.max_drawdown == pytest.approx(5)
+    assert august.stats_pct.open_trades_at_start == 1
+    assert august.stats_pct.open_trades_at_stop == 1
+    assert august.start.wallet == 1000
+    assert august.stop.wallet == pytest.approx(1000 + 1 + 2 - 5 + 1)
+
+    september = windows["20210901-20211001"]
+    assert september.stats_pct.trades == 1
+    assert september.stats_pct.winrate == 0
+
+
+def test_evaluate_windows_without_trades():
+    results = BacktestResults(
+        strategy="Apollo11",
+        stdout="",
+        stderr="",
+        raw_data={"strategy": {"Apollo11": {"trades": [], "starting_balance": 1000}}},
+    )
+
+    window = evaluate_windows(results, ["20210801-20210901"])["20210801-20210901"]
+
+    assert window.stats_pct.trades == 0
+    assert window.stats_pct.max_drawdown == 0
+    assert window.stop.wallet == 1000
@@ -0,0 +1,235 @@
+# pylint: disable=redefined-outer-name
+import http.server
+import importlib.util
+import io
+import json
+import os
+import threading
+import urllib.parse
+import zipfile
+
+import pytest
+
+from tests.conftest import REPO_ROOT
+
+TOKEN = "test-token"
+
+
+@pytest.fixture(scope="module")
+def script():
+    path = REPO_ROOT / ".github" / "workflows" / "scripts" / "download-previous-artifacts.py"
+    spec = importlib.util.spec_from_file_location("download_previous_artifacts", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class Unseekable(io.RawIOBase):
+    """
+    A write only stream, so that zipfile writes data descriptors, like archives made while streaming.
+    """
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        return self.buffer.write(data)
+
+
+def make_zip(files, compression=zipfile.ZIP_DEFLATED, seekable=True):
+    output = io.BytesIO() if seekable else Unseekable()
+    with zipfile.ZipFile(output, "w", compression=compression) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return output.getvalue() if seekable else output.buffer.getvalue()
+
+
+FILES = {
+    "binance/busd/Apollo11/ci-results-20210801-20210901.json": b'{"20210801-20210901": {"winrate": 50}}',
+    # Spanning several download chunks
+    "binance/busd/Apollo11/backtest-output-20210801-20210901.txt": os.urandom(600 * 1024) + b"x" * 2**20,
+    "binance/usdt/": b"",
+}
+
+
+@pytest.mark.parametrize(
+    "compression,seekable",
+    [(zipfile.ZIP_DEFLATED, True), (zipfile.ZIP_DEFLATED, False), (zipfile.ZIP_STORED, True)],
+    ids=["deflated", "deflated-descriptors", "stored"],
+)
+def test_extract_zip_stream(script, tmp_path, compression, seekable):
+    files = dict(FILES, **{"../outside.txt": b"kept inside"})
+
+    names = script.extract_zip_stream(io.BytesIO(make_zip(files, compression, seekable)), tmp_path)
+
+    assert names == list(files)
+    for name, data in FILES.items():
+        if not name.endswith("/"):
+            assert (tmp_path / name).read_bytes() == data
+    assert (tmp_path / "binance" / "usdt").is_dir()
+    assert (tmp_path / "outside.txt").read_bytes() == b"kept inside"
+
+
+def test_extract_zip_stream_unsupported(script, tmp_path):
+    archive = make_zip(FILES, zipfile.ZIP_STORED, seekable=False)
+
+    with pytest.raises(script.UnsupportedZipStream):
+        script.extract_zip_stream(io.BytesIO(archive), tmp_path)
+
+
+def test_extract_zip_stream_bad_crc(script, tmp_path):
+    archive = bytearray(make_zip({"file.txt": b"data" * 100}, zipfile.ZIP_STORED))
+    archive[archive.index(b"data")] = ord("D")
+
+    with pytest.raises(zipfile.BadZipFile):
+        script.extract_zip_stream(io.BytesIO(bytes(archive)), tmp_path)
+
+
+class StandInGitHub(http.server.ThreadingHTTPServer):
+    """
+    Answers the few GitHub API endpoints the script uses.
+    """
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.requests = []
+        self.tags = [{"name": "v1.0", "commit": {"sha": "sha-v1.0"}}, {"name": "v0.9", "commit": {"sha": "sha-v0.9"}}]
+        # The latest first, over two pages
+        self.runs = [
+            self.run(10, "feature", "sha-current"),
+            self.run(9, "main", "sha-main-without-artifacts"),
+            self.run(8, "main", "sha-previous"),
+            self.run(7, "v1.0", "sha-v1.0"),
+            self.run(6, "main", "sha-older"),
+        ]
+        self.page_size = 3
+        self.artifacts = {
+            10: make_zip({"current.txt": b"current"}, seekable=False),
+            8: make_zip({"previous.txt": b"previous"}),
+            7: make_zip({"release.txt": b"release"}, zipfile.ZIP_STORED, seekable=False),
+            6: make_zip({"older.txt": b"older"}),
+        }
+
+    def run(self, run_id, branch, sha):
+        return {
+            "id": run_id,
+            "head_branch": branch,
+            "head_sha": sha,
+            "artifacts_url": f"{self.url}/repos/o/r/actions/runs/{run_id}/artifacts",
+        }
+
+
+class StandInHandler(http.server.BaseHTTPRequestHandler):
+    server: StandInGitHub
+
+    def do_GET(self):  # noqa: N802 pylint: disable=invalid-name
+        url = urllib.parse.urlsplit(self.path)
+        query = dict(urllib.parse.parse_qsl(url.query))
+        parts = url.path.strip("/").split("/")
+        self.server.requests.append(url.path)
+        if parts[0] == "blobs":
+            # The archives storage, which needs no token
+            self.respond(self.server.artifacts[int(parts[1])], "application/zip")
+            return
+        if self.headers["Authorization"] != f"Bearer {TOKEN}":
+            self.respond(b"{}", status=401)
+        elif url.path == "/repos/o/r/tags":
+            self.respond_json(self.server.tags[: int(query["per_page"])])
+        elif url.path == "/repos/o/r/actions/workflows/ci.yml/runs":
+            start = (int(query["page"]) - 1) * self.server.page_size
+            self.respond_json({"workflow_runs": self.server.runs[start : start + self.server.page_size]})
+        elif parts[-1] == "artifacts":
+            run_id = int(parts[-2])
+            artifacts = []
+            if run_id in self.server.artifacts:
+                url = f"{self.server.url}/repos/o/r/actions/artifacts/{run_id}/zip"
+                artifacts.append({"name": "binance-testrun-artifacts", "archive_download_url": url})
+            self.respond_json({"artifacts": artifacts})
+        elif parts[-1] == "zip":
+            self.send_response(302)
+            self.send_header("Location", f"{self.server.url}/blobs/{parts[-2]}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.respond(b"{}", status=404)
+
+    def respond_json(self, data):
+        self.respond(json.dumps(data).encode(), "application/json")
+
+    def respond(self, body, content_type="application/json", status=200):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def github():
+    server = StandInGitHub()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def download(script, github, path, *args):
+    with pytest.raises(SystemExit) as exc:
+        script.main(
+            [
+                "--repo=o/r",
+                "--exchange=binance",
+                "--name=binance-testrun-artifacts",
+                "--workflow=ci.yml",
+                "--branch=main",
+                f"--api-url={github.url}/",
+                *args,
+                str(path),
+            ]
+        )
+    assert exc.value.code == 0
+
+
+def test_download_previous_artifacts(script, github, tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", TOKEN)
+    monkeypatch.setenv("GITHUB_RUN_ID", "10")
+    monkeypatch.setenv("GITHUB_SHA", "sha-current")
+
+    download(script, github, tmp_path, "--releases=2")
+
+    reports_info = json.loads((tmp_path / "reports-info.json").read_text())
+    assert reports_info == {
+        "binance": {
+            "Current": {"sha": "sha-current", "path": str(tmp_path / "current")},
+            "Previous": {"sha": "sha-previous", "path": str(tmp_path / "previous")},
+            "v1.0": {"sha": "sha-v1.0", "path": str(tmp_path / "v1.0")},
+        }
+    }
+    assert (tmp_path / "current" / "current.txt").read_bytes() == b"current"
+    assert (tmp_path / "previous" / "previous.txt").read_bytes() == b"previous"
+    # Stored with data descriptors, downloaded again to a temporary file
+    assert (tmp_path / "v1.0" / "release.txt").read_bytes() == b"release"
+    # Without a v0.9 run, every page was listed, but only the candidate runs artifacts looked up
+    assert github.requests.count("/repos/o/r/actions/workflows/ci.yml/runs") == 3
+    assert "/repos/o/r/actions/runs/6/artifacts" not in github.requests
+
+
+def test_stops_listing_runs_once_found(script, github, tmp_path, monkeypatch):
+    monkeypatch.setenv("GITHUB_TOKEN", TOKEN)
+    monkeypatch.setenv("GITHUB_RUN_ID", "10")
+    monkeypatch.setenv("GITHUB_SHA", "sha-current")
+
+    download(script, github, tmp_path, "--releases=0")
+
+    assert set(json.loads((tmp_path / "reports-info.json").read_text())["binance"]) == {"Current", "Previous"}
+    assert github.requests.count("/repos/o/r/actions/workflows/ci.yml/runs") == 1
+    assert "/repos/o/r/tags" not in github.requests
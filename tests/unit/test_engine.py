@@ -0,0 +1,191 @@
+from functools import reduce
+
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+import numpy as np
+import pytest
+from pandas.testing import assert_frame_equal
+from pandas.testing import assert_series_equal
+
+from goddard import engine
+from tests.candles import make_ohlcv
+
+
+def test_indicators_reused_across_strategies(mocker, ohlcv, saturn5, apollo11):
+    compute = mocker.spy(engine, "compute_indicators")
+    metadata = {"pair": "BTC/BUSD"}
+
+    saturn5_frame = saturn5.populate_indicators(ohlcv.copy(), metadata)
+    apollo11_frame = apollo11.populate_indicators(ohlcv.copy(), metadata)
+
+    assert compute.call_count == 1
+    assert_frame_equal(saturn5_frame, apollo11_frame)
+
+
+def test_indicators_recomputed_on_new_candle(mocker, ohlcv, saturn5, apollo11):
+    compute = mocker.spy(engine, "compute_indicators")
+    metadata = {"pair": "BTC/BUSD"}
+
+    saturn5.populate_indicators(ohlcv.iloc[:-1].copy(), metadata)
+    frame = apollo11.populate_indicators(ohlcv.copy(), metadata)
+
+    assert compute.call_count == 2
+    expected = engine.compute_indicators(
+        ohlcv, engine.IndicatorParameters.from_strategy(apollo11), engine.required_indicators(apollo11)
+    )
+    assert_frame_equal(frame[expected.columns], expected)
+
+
+def test_indicators_not_shared_between_pairs(mocker, ohlcv, apollo11):
+    compute = mocker.spy(engine, "compute_indicators")
+
+    apollo11.populate_indicators(ohlcv.copy(), {"pair": "BTC/BUSD"})
+    apollo11.populate_indicators(ohlcv.copy(), {"pair": "ETH/BUSD"})
+
+    assert compute.call_count == 2
+
+
+def test_indicators_cache_holds_the_pairlist(mocker, ohlcv, apollo11):
+    compute = mocker.spy(engine, "compute_indicators")
+    pairs = ["BTC/BUSD", "ETH/BUSD", "XRP/BUSD"]
+    apollo11.config["exchange"] = {"pair_whitelist": pairs[:2]}
+
+    for pair in pairs + pairs[1:]:
+        apollo11.populate_indicators(ohlcv.copy(), {"pair": pair})
+
+    # BTC/BUSD, the least recently used, was evicted for XRP/BUSD, the others were reused
+    assert compute.call_count == 3
+    cached = engine._INDICATORS_CACHE  # pylint: disable=protected-access
+    assert list(cached) == [("ETH/BUSD", "15m"), ("XRP/BUSD", "15m")]
+
+
+def test_cache_size_follows_the_current_pairlist(mocker, apollo11):
+    apollo11.config["exchange"] = {"pair_whitelist": ["BTC/BUSD"]}
+    assert engine.cache_size(apollo11) == 1
+
+    apollo11.dp = mocker.Mock(**{"current_whitelist.return_value": ["BTC/BUSD", "ETH/BUSD", "XRP/BUSD"]})
+    assert engine.cache_size(apollo11) == 3
+
+
+def test_buy_trend_tags(ohlcv, apollo11):
+    metadata = {"pair": "BTC/BUSD"}
+    frame = apollo11.populate_buy_trend(apollo11.populate_indicators(ohlcv.copy(), metadata), metadata)
+
+    tags = set(frame["buy_tag"].dropna())
+    assert tags
+    assert tags <= {"buy_signal_1", "buy_signal_2", "buy_signal_3"}
+    assert (frame.loc[frame["buy_tag"].notna(), "buy"] == 1).all()
+
+
+def test_only_required_indicators_are_computed(ohlcv, apollo11):
+    frame = apollo11.populate_indicators(ohlcv.copy(), {"pair": "BTC/BUSD"})
+
+    required = {column for columns in engine.SIGNAL_INDICATORS.values() for column in columns}
+    assert set(frame.columns) == set(ohlcv.columns) | required
+    assert "hist" not in frame.columns
+
+
+def test_disabled_signals_indicators_are_not_computed(ohlcv, apollo11):
+    apollo11.buy_signal_1 = apollo11.buy_signal_3 = False
+    frame = apollo11.populate_indicators(ohlcv.copy(), {"pair": "BTC/BUSD"})
+
+    assert set(frame.columns) == set(ohlcv.columns) | set(engine.SIGNAL_INDICATORS["buy_signal_2"])
+
+
+def test_debug_indicators(ohlcv, apollo11, saturn5):
+    metadata = {"pair": "BTC/BUSD"}
+    apollo11.debug_indicators = True
+    debug_frame = apollo11.populate_buy_trend(apollo11.populate_indicators(ohlcv.copy(), metadata), metadata)
+    lean_frame = saturn5.populate_buy_trend(saturn5.populate_indicators(ohlcv.copy(), metadata), metadata)
+
+    assert set(engine.INDICATOR_COLUMNS).issubset(debug_frame.columns)
+    assert_frame_equal(lean_frame, debug_frame[lean_frame.columns])
+
+
+def test_compact_dtypes(ohlcv, apollo11):
+    metadata = {"pair": "BTC/BUSD"}
+    apollo11.compact_dtypes = apollo11.debug_indicators = True
+    frame = apollo11.populate_buy_trend(apollo11.populate_indicators(ohlcv.copy(), metadata), metadata)
+    frame = apollo11.populate_sell_trend(frame, metadata)
+
+    for column in engine.INDICATOR_COLUMNS:
+        expected = np.float64 if column in engine.FLOAT64_INDICATORS else np.float32
+        assert frame[column].dtype == expected, column
+    assert frame["buy"].dtype == np.int8
+    assert frame["sell"].dtype == np.int8
+    assert list(frame["buy_tag"].cat.categories) == list(engine.BUY_SIGNALS)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_compact_dtypes_signals(seed, apollo11, saturn5):
+    ohlcv = make_ohlcv(seed=seed)
+    metadata = {"pair": "BTC/BUSD"}
+    apollo11.compact_dtypes = True
+    compact = apollo11.populate_buy_trend(apollo11.populate_indicators(ohlcv.copy(), metadata), metadata)
+    regular = saturn5.populate_buy_trend(saturn5.populate_indicators(ohlcv.copy(), metadata), metadata)
+
+    assert_series_equal(compact["buy"] == 1, regular["buy"] == 1)
+    assert_series_equal(compact["buy_tag"].astype(object), regular["buy_tag"].astype(object))
+
+
+def reference_buy_trend(strategy, dataframe):
+    """
+    The buy trend as computed before the NumPy fast path.
+    """
+    if strategy.buy_signal_1:
+        conditions = [
+            dataframe["vwmacd"] < dataframe["signal"],
+            dataframe["low"] < dataframe["s1_ema_xxl"],
+            dataframe["close"] > dataframe["s1_ema_xxl"],
+            qtpylib.crossed_above(dataframe["s1_ema_sm"], dataframe["s1_ema_md"]),
+            dataframe["s1_ema_xs"] < dataframe["s1_ema_xl"],
+            dataframe["volume"] > 0,
+        ]
+        dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_1")
+    if strategy.buy_signal_2:
+        conditions = [
+            qtpylib.crossed_above(dataframe["s2_fib_lower_band"], dataframe["s2_bb_lower_band"]),
+            dataframe["close"] < dataframe["s2_ema"],
+            dataframe["volume"] > 0,
+        ]
+        dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_2")
+    if strategy.buy_signal_3:
+        conditions = [
+            dataframe["low"] < dataframe["s3_bb_lowerband"],
+            dataframe["high"] > dataframe["s3_slow_ma"],
+            dataframe["high"] < dataframe["s3_ema_long"],
+            dataframe["volume"] > 0,
+        ]
+        dataframe.loc[reduce(lambda x, y: x & y, conditions), ["buy", "buy_tag"]] = (1, "buy_signal_3")
+    return dataframe
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize(
+    "signals",
+    [(True, True, True), (True, False, True), (False, True, False), (False, False, True)],
+)
+def test_buy_trend_matches_reference(seed, signals, apollo11):
+    apollo11.buy_signal_1, apollo11.buy_signal_2, apollo11.buy_signal_3 = signals
+    metadata = {"pair": "BTC/BUSD"}
+    frame = apollo11.populate_indicators(make_ohlcv(seed=seed), metadata)
+
+    expected = reference_buy_trend(apollo11, frame.copy())
+    frame = apollo11.populate_buy_trend(frame, metadata)
+
+    assert_series_equal(frame["buy"], expected["buy"])
+    assert_series_equal(frame["buy_tag"], expected["buy_tag"])
+
+
+def test_buy_trend_later_signal_wins(ohlcv, apollo11):
+    metadata = {"pair": "BTC/BUSD"}
+    frame = apollo11.populate_indicators(ohlcv.copy(), metadata)
+    # Make buy signal 3 fire on every candle
+    frame["s3_bb_lowerband"] = frame["high"] + 1
+    frame["s3_slow_ma"] = frame["low"] - 1
+    frame["s3_ema_long"] = frame["high"] + 1
+
+    frame = apollo11.populate_buy_trend(frame, metadata)
+
+    fired = frame["volume"] > 0
+    assert (frame.loc[fired, "buy_tag"] == "buy_signal_3").all()
+    assert frame.loc[~fired, "buy_tag"].isna().all()
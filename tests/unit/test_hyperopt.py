@@ -0,0 +1,96 @@
+# pylint: disable=redefined-outer-name
+from freqtrade.enums import RunMode
+from freqtrade.strategy import IntParameter
+from freqtrade.strategy.parameters import BaseParameter
+from pandas.testing import assert_frame_equal
+
+from goddard import engine
+from goddard.memo import IndicatorMemo
+from tests.backtests.synthetic import generate_candles
+
+METADATA = {"pair": "BTC/BUSD"}
+# The parameter values of a few epochs
+EPOCHS = (
+    {"s1_ema_xs": 2, "s1_ema_xxl": 200, "s2_bb_sma_length": 60, "s3_ma_fast": 6, "s2_fib_lower_value": 3.5},
+    {"s1_ema_sm": 8, "s1_ema_md": 15, "s2_bb_std_dev_length": 50, "s3_ma_slow": 30},
+    {"s1_ema_xl": 40, "s1_ema_xxl": 280, "s2_fib_lower_value": 5.25},
+)
+
+
+def parameters(strategy):
+    parameters = {name: getattr(strategy, name) for name in engine.IndicatorParameters._fields}
+    return {name: parameter for name, parameter in parameters.items() if isinstance(parameter, BaseParameter)}
+
+
+def hyperopting(strategy, monkeypatch):
+    """
+    Set the strategy up as hyperopt does, every indicator parameter in the searched space.
+    """
+    monkeypatch.setitem(strategy.config, "runmode", RunMode.HYPEROPT)
+    for parameter in parameters(strategy).values():
+        monkeypatch.setattr(parameter, "in_space", True)
+        # The parameters are class attributes, restore their value once done
+        monkeypatch.setattr(parameter, "value", parameter.value)
+    return strategy
+
+
+def candles():
+    return generate_candles(seed=3, candles=15 * 288, timeframe="15m")
+
+
+def test_no_candidates_when_not_hyperopting(apollo11):
+    assert engine.hyperopt_candidates(apollo11) == {}
+
+
+def test_candidates(apollo11, monkeypatch):
+    candidates = engine.hyperopt_candidates(hyperopting(apollo11, monkeypatch))
+
+    assert candidates["s1_ema_xxl"] == list(range(200, 281))
+    # Decimal parameters are multipliers, they need no indicators of their own
+    assert "s2_fib_lower_value" not in candidates
+    assert set(candidates) == {
+        name for name, parameter in parameters(apollo11).items() if isinstance(parameter, IntParameter)
+    }
+
+
+def test_epochs_match_a_plain_computation(apollo11, monkeypatch):
+    strategy = hyperopting(apollo11, monkeypatch)
+    # Hyperopt computes the indicators once, and then the buy trend of each epoch
+    indicators = strategy.populate_indicators(candles(), METADATA)
+
+    for epoch in EPOCHS:
+        for name, value in epoch.items():
+            monkeypatch.setattr(getattr(strategy, name), "value", value)
+        frame = strategy.populate_buy_trend(indicators.copy(), METADATA)
+
+        with monkeypatch.context() as context:
+            context.setitem(strategy.config, "runmode", RunMode.BACKTEST)
+            engine.clear_cache()
+            expected = strategy.populate_buy_trend(strategy.populate_indicators(candles(), METADATA), METADATA)
+        assert frame["buy"].notna().any()
+        assert_frame_equal(frame[["buy", "buy_tag"]], expected[["buy", "buy_tag"]])
+
+
+def test_epochs_compute_no_indicators(apollo11, monkeypatch, mocker):
+    strategy = hyperopting(apollo11, monkeypatch)
+    indicators = strategy.populate_indicators(candles(), METADATA)
+    bank = engine.indicator_bank(strategy, indicators, METADATA)
+    misses = bank.memo.misses
+    build = mocker.spy(engine.IndicatorBank, "__init__")
+    memo = mocker.spy(IndicatorMemo, "__init__")
+
+    for epoch in EPOCHS:
+        for name, value in epoch.items():
+            monkeypatch.setattr(getattr(strategy, name), "value", value)
+        strategy.populate_buy_trend(indicators.copy(), METADATA)
+
+    assert bank.memo.misses == misses
+    assert build.call_count == memo.call_count == 0
+
+
+def test_bank_rebuilt_for_other_candles(apollo11, monkeypatch):
+    strategy = hyperopting(apollo11, monkeypatch)
+    first = engine.indicator_bank(strategy, candles(), METADATA)
+
+    assert engine.indicator_bank(strategy, candles(), METADATA) is first
+    assert engine.indicator_bank(strategy, candles().iloc[:-1], METADATA) is not first
@@ -0,0 +1,92 @@
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+import numpy as np
+import pandas as pd
+import pytest
+
+from goddard import indicators
+from tests.candles import make_ohlcv
+
+
+def assert_close_to_prices(actual, expected, prices):
+    """
+    Equal up to floating point rounding, relative to the prices the values were computed from.
+    """
+    actual = np.asarray(actual)
+    expected = np.asarray(expected, dtype=np.float64)
+    np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+    valid = ~np.isnan(expected)
+    np.testing.assert_array_less(np.abs(actual[valid] - expected[valid]), 1e-9 * np.asarray(prices)[valid])
+
+
+def test_typical_price(ohlcv):
+    np.testing.assert_array_equal(indicators.typical_price(ohlcv), qtpylib.typical_price(ohlcv).to_numpy())
+
+
+@pytest.mark.parametrize("candles", [1, 2, 19, 20, 21, indicators.BLOCK_ROWS, indicators.BLOCK_ROWS + 1, 5000])
+@pytest.mark.parametrize("window,stds", [(20, 3), (5, 2)])
+def test_bollinger_bands(candles, window, stds):
+    typical_price = qtpylib.typical_price(make_ohlcv(candles=candles))
+
+    bands = indicators.bollinger_bands(typical_price.to_numpy(), window=window, stds=stds)
+    expected = qtpylib.bollinger_bands(typical_price, window=window, stds=stds)
+
+    for band in ("upper", "mid", "lower"):
+        assert_close_to_prices(getattr(bands, band), expected[band], typical_price)
+
+
+def test_bollinger_bands_without_price_moves():
+    prices = make_ohlcv(candles=3000)["close"].to_numpy(copy=True)
+    prices[1500:1530] = prices[1500]
+
+    bands = indicators.bollinger_bands(prices, window=20, stds=3)
+
+    # The windows of the candles without moves have no standard deviation, beside rounding errors, which
+    # pandas has too
+    np.testing.assert_allclose(bands.lower[1519:1530], prices[1500], rtol=1e-7)
+    np.testing.assert_allclose(bands.upper[1519:1530], prices[1500], rtol=1e-7)
+
+
+def test_bollinger_bands_matrix():
+    candles = pd.concat([make_ohlcv(candles=3000, seed=seed)["close"] for seed in range(3)], axis=1).to_numpy()
+    # A pair with fewer candles
+    candles[2000:, 1] = np.nan
+
+    bands = indicators.bollinger_bands(candles, window=20, stds=3)
+
+    assert bands.lower.shape == candles.shape
+    for column, count in enumerate((3000, 2000, 3000)):
+        expected = indicators.bollinger_bands(candles[:count, column], window=20, stds=3)
+        np.testing.assert_array_equal(bands.lower[:count, column], expected.lower)
+    assert np.isnan(bands.lower[2000:, 1]).all()
+
+
+def test_bollinger_bands_long_history():
+    # Prices moving over orders of magnitude, the pandas running sums lose precision there
+    rng = np.random.default_rng(1)
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 200_000)))
+
+    bands = indicators.bollinger_bands(prices, window=20, stds=3)
+
+    windows = np.lib.stride_tricks.sliding_window_view(prices, 20)
+    assert_close_to_prices(bands.mid[19:], windows.mean(axis=1), prices[19:])
+    assert_close_to_prices((bands.mid - bands.lower)[19:] / 3, windows.std(axis=1, ddof=1), prices[19:])
+
+
+def test_bollinger_bands_empty():
+    bands = indicators.bollinger_bands(np.array([]))
+
+    assert len(bands.lower) == len(bands.mid) == len(bands.upper) == 0
+
+
+def test_crossed_above(ohlcv):
+    fast = qtpylib.rolling_mean(ohlcv["close"], window=5)
+    slow = qtpylib.rolling_mean(ohlcv["close"], window=20)
+
+    np.testing.assert_array_equal(
+        indicators.crossed_above(fast.to_numpy(), slow.to_numpy()), qtpylib.crossed_above(fast, slow).to_numpy()
+    )
+    # Against a constant
+    level = float(ohlcv["close"].median())
+    np.testing.assert_array_equal(
+        indicators.crossed_above(fast.to_numpy(), level), qtpylib.crossed_above(fast, level).to_numpy()
+    )
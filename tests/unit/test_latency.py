@@ -0,0 +1,171 @@
+# pylint: disable=redefined-outer-name
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+from freqtrade.enums import RunMode
+
+from goddard import latency
+from tests.candles import make_ohlcv
+
+PAIRS = ("BTC/BUSD", "ETH/BUSD")
+# The close of the last make_ohlcv candle, 2021-01-21 19:45 + 15 minutes
+CANDLE_CLOSE = 1611259200.0
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock(CANDLE_CLOSE + 2.0)
+
+
+@pytest.fixture
+def recorder(tmp_path, clock):
+    recorder = latency.enable(
+        latency.LatencyRecorder("Apollo11", "15m", throttle_secs=5, log_path=tmp_path / "latency.jsonl", clock=clock)
+    )
+    try:
+        yield recorder
+    finally:
+        latency.disable()
+
+
+def analyze(strategy, clock, pairs=PAIRS, seconds_per_pair=1.5):
+    # Each pair takes seconds_per_pair, on the recorder clock
+    for seed, pair in enumerate(pairs):
+        dataframe = strategy.populate_indicators(make_ohlcv(seed=seed), {"pair": pair})
+        clock.now += seconds_per_pair
+        strategy.populate_buy_trend(dataframe, {"pair": pair})
+
+
+def read_records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_disabled_by_default():
+    assert latency.active() is None
+
+
+def test_records(tmp_path, recorder, clock, apollo11):
+    recorder.loop_start()
+    analyze(apollo11, clock)
+    # A loop without new candles isn't recorded
+    recorder.loop_start()
+    recorder.loop_start()
+    analyze(apollo11, clock, pairs=PAIRS[:1], seconds_per_pair=10)
+    recorder.close()
+
+    records = read_records(tmp_path / "latency.jsonl")
+
+    assert [(record["type"], record["loop"]) for record in records] == [
+        ("pair", 0),
+        ("pair", 0),
+        ("loop", 0),
+        ("pair", 1),
+        ("loop", 1),
+    ]
+    first, second, loop = records[:3]
+    assert first["pair"] == "BTC/BUSD"
+    assert first["candle_close"] == "2021-01-21T20:00:00+00:00"
+    assert first["start_delay_seconds"] == 2.0
+    assert first["decision_delay_seconds"] == 3.5
+    assert first["indicators_seconds"] > 0
+    assert first["signals_seconds"] > 0
+    assert second["start_delay_seconds"] == 3.5
+    assert second["decision_delay_seconds"] == 5.0
+    assert loop["pairs"] == 2
+    assert loop["loop_seconds"] == 3.0
+    assert loop["max_decision_delay_seconds"] == 5.0
+    assert loop["slowest_pair"] == "ETH/BUSD"
+    assert loop["within_throttle"]
+    assert not records[4]["within_throttle"]
+    assert (recorder.loops, recorder.loops_over_throttle) == (2, 1)
+
+
+def test_same_signals_when_recording(apollo11, clock, tmp_path):
+    metadata = {"pair": PAIRS[0]}
+    expected = apollo11.populate_buy_trend(apollo11.populate_indicators(make_ohlcv(), metadata), metadata)
+    latency.enable(latency.LatencyRecorder("Apollo11", "15m", clock=clock)).loop_start()
+    try:
+        recorded = apollo11.populate_buy_trend(apollo11.populate_indicators(make_ohlcv(), metadata), metadata)
+    finally:
+        latency.disable()
+
+    assert recorded.equals(expected)
+
+
+def test_log_rotation(tmp_path, apollo11, clock):
+    recorder = latency.enable(
+        latency.LatencyRecorder(
+            "Apollo11", "15m", log_path=tmp_path / "latency.jsonl", max_bytes=1000, backup_count=2, clock=clock
+        )
+    )
+    try:
+        for _ in range(10):
+            recorder.loop_start()
+            analyze(apollo11, clock)
+    finally:
+        latency.disable()
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["latency.jsonl", "latency.jsonl.1", "latency.jsonl.2"]
+    for name in ("latency.jsonl", "latency.jsonl.1"):
+        assert read_records(tmp_path / name)
+
+
+def test_metrics_endpoint(recorder, clock, apollo11):
+    recorder.loop_start()
+    analyze(apollo11, clock)
+    recorder.loop_start()
+    port = recorder.serve(0)
+
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+        content_type = response.headers["Content-Type"]
+        metrics = response.read().decode()
+
+    assert content_type.startswith("text/plain; version=0.0.4")
+    lines = metrics.splitlines()
+    assert "# TYPE goddard_signal_decision_delay_seconds gauge" in lines
+    assert 'goddard_signal_decision_delay_seconds{strategy="Apollo11",pair="BTC/BUSD"} 3.5' in lines
+    assert 'goddard_signal_start_delay_seconds{strategy="Apollo11",pair="ETH/BUSD"} 3.5' in lines
+    assert 'goddard_signal_loop_seconds{strategy="Apollo11"} 3.0' in lines
+    assert 'goddard_signal_pairs{strategy="Apollo11"} 2' in lines
+    assert 'goddard_signal_throttle_seconds{strategy="Apollo11"} 5.0' in lines
+    assert 'goddard_signal_loops_total{strategy="Apollo11"} 1' in lines
+    assert 'goddard_signal_loops_over_throttle_total{strategy="Apollo11"} 0' in lines
+    with pytest.raises(urllib.error.HTTPError):
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/")  # pylint: disable=consider-using-with
+
+
+@pytest.mark.parametrize("runmode,enabled", [(RunMode.DRY_RUN, True), (RunMode.LIVE, True), (RunMode.BACKTEST, False)])
+def test_enabled_from_environment(monkeypatch, tmp_path, apollo11, runmode, enabled):
+    monkeypatch.setenv(latency.LOG_ENV_VAR, str(tmp_path / "latency.jsonl"))
+    apollo11.config = {"runmode": runmode, "internals": {"process_throttle_secs": 10}}
+    try:
+        apollo11.bot_loop_start(current_time=None)
+        recorder = latency.active()
+        assert (recorder is not None) == enabled
+        if enabled:
+            assert recorder.throttle_secs == 10
+            analyze(apollo11, Clock(0), pairs=PAIRS[:1])
+            apollo11.bot_loop_start(current_time=None)
+            assert recorder.loops == 1
+    finally:
+        latency.disable()
+
+
+def test_not_enabled_without_environment(monkeypatch, apollo11):
+    monkeypatch.delenv(latency.LOG_ENV_VAR, raising=False)
+    monkeypatch.delenv(latency.PORT_ENV_VAR, raising=False)
+    apollo11.config = {"runmode": RunMode.LIVE}
+
+    apollo11.bot_loop_start(current_time=None)
+
+    assert latency.active() is None
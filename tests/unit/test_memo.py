@@ -0,0 +1,72 @@
+import numpy as np
+import talib.abstract as ta
+
+from goddard import engine
+from goddard import talib_direct
+from goddard.memo import IndicatorMemo
+
+
+def test_repeated_calls_are_hits(ohlcv):
+    memo = IndicatorMemo(ohlcv)
+    first = memo(ta.EMA, timeperiod=200)
+    second = memo(ta.EMA, timeperiod=200)
+    assert first is second
+    assert (memo.hits, memo.misses) == (1, 1)
+
+
+def test_keyed_by_function_source_and_parameters(ohlcv):
+    memo = IndicatorMemo(ohlcv)
+    memo(ta.EMA, timeperiod=10)
+    memo(ta.EMA, timeperiod=20)
+    memo(ta.SMA, timeperiod=10)
+    memo(ta.EMA, "volume", timeperiod=10)
+    assert (memo.hits, memo.misses) == (0, 4)
+    np.testing.assert_array_equal(memo(ta.EMA, "volume", timeperiod=10), ta.EMA(ohlcv["volume"], timeperiod=10))
+    assert memo.hits == 1
+
+
+def test_derived_sources_computed_once(ohlcv):
+    calls = []
+
+    def volume_close(dataframe):
+        calls.append(dataframe)
+        return dataframe["volume"] * dataframe["close"]
+
+    memo = IndicatorMemo(ohlcv)
+    memo.source("volume_close", volume_close)
+    memo.source("volume_close", volume_close)
+    result = memo(ta.EMA, "volume_close", timeperiod=12)
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(result, ta.EMA(ohlcv["volume"] * ohlcv["close"], timeperiod=12))
+
+
+def test_compute_indicators_saves_duplicates(ohlcv, apollo11):
+    memo = IndicatorMemo(ohlcv)
+    engine.compute_indicators(ohlcv, engine.IndicatorParameters.from_strategy(apollo11), memo=memo)
+    # The 200 EMA is asked twice, and the 50 EMA three times
+    assert memo.hits == 3
+
+
+def test_vwma_banks_reused_for_fewer_periods(ohlcv):
+    memo = IndicatorMemo(ohlcv)
+    bank = memo.vwmas([10, 20, 30], macd=(12, 26, 9))
+
+    assert memo.vwmas([20], macd=(12, 26, 9)) is bank
+    assert memo.vwmas([30, 10]) is bank
+    assert (memo.hits, memo.misses) == (2, 1)
+    np.testing.assert_array_equal(bank.period(20), memo.vwmas([20, 40]).period(20))
+    assert memo.misses == 2
+
+
+def test_talib_functions_called_on_the_candle_arrays(mocker, ohlcv):
+    memo = IndicatorMemo(ohlcv)
+    candle_arrays = mocker.spy(talib_direct, "candle_arrays")
+
+    ema = memo(ta.EMA, timeperiod=50)
+    atr = memo(ta.ATR, timeperiod=14)
+
+    assert candle_arrays.call_count == 1
+    assert isinstance(ema, np.ndarray)
+    np.testing.assert_array_equal(ema, ta.EMA(ohlcv, timeperiod=50).to_numpy())
+    np.testing.assert_array_equal(atr, ta.ATR(ohlcv, timeperiod=14).to_numpy())
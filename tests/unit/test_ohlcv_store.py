@@ -0,0 +1,88 @@
+# pylint: disable=redefined-outer-name
+import gzip
+import json
+
+import numpy as np
+import pytest
+from freqtrade.configuration import TimeRange
+from freqtrade.data.history import load_pair_history
+from freqtrade.data.history.datahandlers import idatahandler
+from pandas.testing import assert_frame_equal
+
+from tests.backtests import ohlcv_store
+from tests.backtests.ohlcv_store import convert
+from tests.backtests.ohlcv_store import OHLCVStore
+from tests.candles import make_ohlcv
+
+START = 1609459200000  # 2021-01-01
+
+
+@pytest.fixture
+def data_root(tmp_path):
+    data_root = tmp_path / "data"
+    (data_root / "binance").mkdir(parents=True)
+    for pair, seed in (("BTC_BUSD", 1), ("ETH_BUSD", 2)):
+        for timeframe, minutes in (("15m", 15), ("5m", 5)):
+            ohlcv = make_ohlcv(candles=3000, seed=seed)
+            dates = START + np.arange(len(ohlcv), dtype=np.int64) * minutes * 60000
+            rows = [
+                [int(date), *values]
+                for date, values in zip(dates, ohlcv[["open", "high", "low", "close", "volume"]].to_numpy().tolist())
+            ]
+            with gzip.open(data_root / "binance" / f"{pair}-{timeframe}.json.gz", "wt") as wfh:
+                json.dump(rows, wfh)
+    return data_root
+
+
+@pytest.fixture
+def store_root(tmp_path, data_root):
+    store_root = tmp_path / "columnar"
+    convert("binance", data_root=data_root, store_root=store_root)
+    return store_root
+
+
+def test_convert_skips_converted_files(data_root, store_root):
+    assert convert("binance", data_root=data_root, store_root=store_root) == 0
+    (data_root / "binance" / "BTC_BUSD-15m.json.gz").write_bytes(
+        gzip.compress(json.dumps([[START, 1, 2, 0.5, 1.5, 10]]).encode())
+    )
+    assert convert("binance", data_root=data_root, store_root=store_root) == 1
+
+
+def test_has(data_root, store_root):
+    store = OHLCVStore(store_root / "binance", data_dir=data_root / "binance")
+    assert store.has("BTC/BUSD", "15m")
+    assert not store.has("ADA/BUSD", "15m")
+
+    # Changed since the conversion
+    (data_root / "binance" / "BTC_BUSD-15m.json.gz").write_bytes(gzip.compress(b"[]"))
+    assert not store.has("BTC/BUSD", "15m")
+
+
+def test_columns_are_sliced_without_copying(store_root):
+    store = OHLCVStore(store_root / "binance")
+    everything = store.columns("BTC/BUSD", "15m")
+    start, stop = START + 100 * 900000 + 1, START + 200 * 900000
+
+    columns = store.columns("BTC/BUSD", "15m", start, stop)
+
+    assert columns["date"][0] == START + 101 * 900000
+    assert columns["date"][-1] == stop
+    for name, values in columns.items():
+        assert isinstance(values.base, np.memmap) or isinstance(values, np.memmap)
+        np.testing.assert_array_equal(values, everything[name][101:201])
+    assert len(store.columns("BTC/BUSD", "15m", stop, start)["close"]) == 0
+
+
+def test_same_data_as_freqtrade(mocker, monkeypatch, data_root, store_root):
+    timerange = TimeRange.parse_timerange("20210105-20210110")
+    kwargs = {"datadir": data_root / "binance", "timeframe": "5m", "timerange": timerange, "data_format": "jsongz"}
+    expected = load_pair_history("BTC/BUSD", **kwargs)
+
+    monkeypatch.setattr(idatahandler, "get_datahandlerclass", idatahandler.get_datahandlerclass)
+    ohlcv_store.install(store_root)
+    load = mocker.spy(OHLCVStore, "load")
+    frame = load_pair_history("BTC/BUSD", **kwargs)
+
+    assert load.call_count == 1
+    assert_frame_equal(frame, expected)
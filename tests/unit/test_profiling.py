@@ -0,0 +1,107 @@
+# pylint: disable=redefined-outer-name
+import json
+import subprocess
+import sys
+
+import pytest
+from pandas.testing import assert_frame_equal
+
+from goddard import profiling
+from tests.candles import make_ohlcv
+from tests.conftest import REPO_ROOT
+
+PAIRS = ("BTC/BUSD", "ETH/BUSD")
+
+
+@pytest.fixture
+def profiler():
+    profiler = profiling.enable()
+    try:
+        yield profiler
+    finally:
+        profiling.disable()
+
+
+def populate(strategy, pairs=PAIRS):
+    frames = {}
+    for seed, pair in enumerate(pairs):
+        dataframe = strategy.populate_indicators(make_ohlcv(seed=seed), {"pair": pair})
+        frames[pair] = strategy.populate_buy_trend(dataframe, {"pair": pair})
+    return frames
+
+
+def test_disabled_by_default():
+    assert profiling.active() is None
+
+
+def test_report(profiler, apollo11):
+    populate(apollo11)
+
+    report = profiler.report()
+
+    assert report["pairs"] == len(PAIRS)
+    steps = report["steps"]
+    for name in (
+        "populate_indicators",
+        "populate_buy_trend",
+        "EMA(timeperiod=240)",
+        "typical_price",
+        "bollinger_bands(typical_price, stds=3, window=20)",
+        "vwma_bank",
+        "buy_signal_1",
+        "buy_signal_2",
+        "buy_signal_3",
+    ):
+        assert steps[name]["pairs"] == len(PAIRS), name
+        assert steps[name]["calls"] == len(PAIRS), name
+        assert steps[name]["total_seconds"] > 0, name
+        assert set(report["per_pair"][name]) == set(PAIRS)
+    # One float64 value per candle
+    assert steps["EMA(timeperiod=240)"]["max_pair_bytes"] == 2000 * 8
+    assert steps["buy_signal_1"]["total_bytes"] == len(PAIRS) * 2000
+    # The slowest steps first
+    totals = [step["total_seconds"] for step in steps.values()]
+    assert totals == sorted(totals, reverse=True)
+
+
+def test_same_signals_when_profiling(apollo11):
+    expected = populate(apollo11)
+    profiling.enable()
+    try:
+        # Bypass the indicators cache
+        frames = populate(apollo11, pairs=[f"{pair}:profiled" for pair in PAIRS])
+    finally:
+        profiling.disable()
+    for pair in PAIRS:
+        assert_frame_equal(frames[f"{pair}:profiled"], expected[pair])
+
+
+def test_cached_indicators_are_not_profiled(profiler, apollo11, saturn5):
+    for strategy in (apollo11, saturn5):
+        # The indicators cache holds the pairlist pairs
+        strategy.config["exchange"] = {"pair_whitelist": list(PAIRS)}
+    populate(apollo11)
+    populate(saturn5)
+
+    steps = profiler.report()["steps"]
+    assert steps["populate_indicators"]["calls"] == 2 * len(PAIRS)
+    assert steps["EMA(timeperiod=240)"]["calls"] == len(PAIRS)
+
+
+def test_environment_variable(tmp_path):
+    report_path = tmp_path / "indicator-profile.json"
+    code = (
+        "from Apollo11 import Apollo11\n"
+        "from tests.candles import make_ohlcv\n"
+        "Apollo11({}).populate_indicators(make_ohlcv(), {'pair': 'BTC/BUSD'})\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        cwd=REPO_ROOT,
+        env={"PATH": "", profiling.ENV_VAR: str(report_path)},
+        capture_output=True,
+    )
+    report = json.loads(report_path.read_text())
+    assert report["pairs"] == 1
+    assert report["steps"]["populate_indicators"]["calls"] == 1
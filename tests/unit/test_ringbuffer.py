@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from goddard.ringbuffer import CandleRing
+
+COLUMNS = ("close", "volume")
+
+
+def load(ring, ohlcv):
+    ring.load(ohlcv["date"], {column: ohlcv[column].to_numpy() for column in COLUMNS})
+
+
+def test_load(ohlcv):
+    ring = CandleRing(COLUMNS, 100)
+
+    load(ring, ohlcv)
+
+    assert len(ring) == 100
+    assert ring.holds(ohlcv["date"].iloc[-100], ohlcv["date"].iloc[-1], 100)
+    np.testing.assert_array_equal(ring.window("close"), ohlcv["close"].to_numpy()[-100:])
+
+
+def test_load_fewer_candles_than_capacity(ohlcv):
+    ring = CandleRing(COLUMNS + ("missing",), 100)
+
+    load(ring, ohlcv.head(10))
+
+    assert len(ring) == 10
+    np.testing.assert_array_equal(ring.window("volume"), ohlcv["volume"].to_numpy()[:10])
+    assert np.isnan(ring.window("missing")).all()
+
+
+def test_append_overwrites_the_oldest_candles(ohlcv):
+    ring = CandleRing(COLUMNS, 64)
+    load(ring, ohlcv.head(50))
+    storage = ring._values  # pylint: disable=protected-access
+
+    for candle in ohlcv.iloc[50:250].itertuples(index=False):
+        ring.append(candle.date, {"close": candle.close})
+
+    assert len(ring) == 64
+    assert ring._values is storage  # pylint: disable=protected-access
+    assert ring.holds(ohlcv["date"].iloc[186], ohlcv["date"].iloc[249], 64)
+    assert ring.holds(ohlcv["date"].iloc[247], ohlcv["date"].iloc[249], 3)
+    assert not ring.holds(ohlcv["date"].iloc[185], ohlcv["date"].iloc[249], 65)
+    np.testing.assert_array_equal(ring.window("close"), ohlcv["close"].to_numpy()[186:250])
+    np.testing.assert_array_equal(ring.window("close", 3), ohlcv["close"].to_numpy()[247:250])
+    assert np.isnan(ring.window("volume", 200)).all()
+
+
+def test_window_is_a_read_only_view(ohlcv):
+    ring = CandleRing(COLUMNS, 10)
+    load(ring, ohlcv)
+
+    window = ring.window("close")
+
+    with pytest.raises(ValueError):
+        window[0] = 0
+    assert np.shares_memory(window, ring._values)  # pylint: disable=protected-access
+
+
+def test_capacity():
+    with pytest.raises(ValueError):
+        CandleRing(COLUMNS, 0)
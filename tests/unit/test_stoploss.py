@@ -0,0 +1,54 @@
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from goddard.stoploss import tiered_stoploss
+from goddard.stoploss import tiered_stoploss_batch
+
+PROFITS = np.round(np.arange(-0.3, 0.3, 0.0025), 4).tolist() + [0.2, 0.1, 0.06, 0.03, -0.1, -0.08]
+AGES = [timedelta(hours=hours) for hours in (0, 1, 59, 60, 61, 119, 120, 121, 500)]
+AGES.append(timedelta(hours=60, microseconds=1))
+
+
+def if_chain_stoploss(trade, current_time, current_profit):
+    # The custom_stoploss implementation before the tiers became tables
+    if current_profit > 0.2:
+        return 0.04
+    if current_profit > 0.1:
+        return 0.03
+    if current_profit > 0.06:
+        return 0.02
+    if current_profit > 0.03:
+        return 0.01
+    if current_profit <= -0.10:
+        if trade.open_date_utc + timedelta(hours=60) < current_time:
+            return current_profit / 1.75
+    if current_profit <= -0.08:
+        if trade.open_date_utc + timedelta(hours=120) < current_time:
+            return current_profit / 1.70
+    return -1
+
+
+@pytest.mark.parametrize("age", AGES, ids=str)
+def test_custom_stoploss_unchanged(apollo11, age):
+    current_time = datetime(2021, 9, 1, tzinfo=timezone.utc)
+    trade = SimpleNamespace(open_date_utc=current_time - age)
+    for profit in PROFITS:
+        expected = if_chain_stoploss(trade, current_time, profit)
+        assert tiered_stoploss(profit, age) == expected
+        assert apollo11.custom_stoploss("BTC/BUSD", trade, current_time, 1.0, profit) == expected
+
+
+def test_batch_matches_single_trades():
+    profits, ages = np.meshgrid(PROFITS, [age.total_seconds() for age in AGES])
+    expected = [tiered_stoploss(profit, timedelta(seconds=age)) for profit, age in zip(profits.flat, ages.flat)]
+
+    np.testing.assert_array_equal(tiered_stoploss_batch(profits, ages).ravel(), expected)
+    np.testing.assert_array_equal(
+        tiered_stoploss_batch(profits, (ages * 1e6).astype("timedelta64[us]")).ravel(),
+        expected,
+    )
@@ -0,0 +1,157 @@
+# pylint: disable=redefined-outer-name
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+from freqtrade.enums import RunMode
+
+from goddard import engine
+from goddard.streaming import ATR
+from goddard.streaming import EMA
+from goddard.streaming import IncrementalIndicators
+from goddard.streaming import RollingWindow
+from goddard.streaming import TOLERANCE
+
+
+@pytest.fixture
+def dry_run_strategy():
+    from Apollo11 import Apollo11  # pylint: disable=import-outside-toplevel
+
+    return Apollo11({"runmode": RunMode.DRY_RUN})
+
+
+def assert_indicators_close(streamed, computed, ohlcv):
+    atol = TOLERANCE * ohlcv["close"].abs().mean()
+    for column in computed.columns:
+        np.testing.assert_allclose(
+            streamed[column].to_numpy(), computed[column].to_numpy(), rtol=TOLERANCE, atol=atol, err_msg=column
+        )
+
+
+def test_ema_matches_talib(ohlcv):
+    close = ohlcv["close"].to_numpy()
+    expected = talib.EMA(close, timeperiod=10)
+    ema = EMA(10, expected[999])
+    streamed = [ema.update(value) for value in close[1000:]]
+    np.testing.assert_array_equal(streamed, expected[1000:])
+
+
+def test_rolling_window_matches_talib_and_pandas(ohlcv):
+    close = ohlcv["close"].to_numpy()
+    window = RollingWindow(64, close[:1000])
+    means, stddevs, sample_stddevs = [], [], []
+    for value in close[1000:]:
+        window.update(value)
+        means.append(window.mean())
+        stddevs.append(window.stddev())
+        sample_stddevs.append(window.stddev(ddof=1))
+    np.testing.assert_allclose(means, talib.SMA(close, timeperiod=64)[1000:], rtol=1e-12)
+    np.testing.assert_allclose(stddevs, talib.STDDEV(close, timeperiod=64)[1000:], rtol=1e-9)
+    np.testing.assert_allclose(sample_stddevs, pd.Series(close).rolling(64).std()[1000:], rtol=1e-9)
+
+
+def test_atr_matches_talib(ohlcv):
+    high, low, close = (ohlcv[column].to_numpy() for column in ("high", "low", "close"))
+    expected = talib.ATR(high, low, close, timeperiod=14)
+    atr = ATR(14, expected[999], close[999])
+    streamed = [atr.update(*candle) for candle in zip(high[1000:], low[1000:], close[1000:])]
+    np.testing.assert_allclose(streamed, expected[1000:], rtol=1e-12)
+
+
+def test_streamed_indicators_match_full_recompute(mocker, ohlcv, dry_run_strategy):
+    compute = mocker.spy(engine, "compute_indicators")
+    metadata = {"pair": "BTC/BUSD"}
+    for end in range(1000, 1090):
+        frame = dry_run_strategy.populate_indicators(ohlcv.iloc[:end].copy(), metadata)
+
+    assert compute.call_count == 1
+    expected = engine.compute_indicators(
+        ohlcv.iloc[:1089],
+        engine.IndicatorParameters.from_strategy(dry_run_strategy),
+        engine.required_indicators(dry_run_strategy),
+    )
+    assert_indicators_close(frame, expected, ohlcv)
+
+
+@pytest.mark.parametrize("window", [500, 1000])
+def test_streamed_indicators_on_a_moving_window(mocker, ohlcv, dry_run_strategy, window):
+    metadata = {"pair": "BTC/BUSD"}
+    params = engine.IndicatorParameters.from_strategy(dry_run_strategy)
+    columns = engine.required_indicators(dry_run_strategy)
+    dry_run_strategy.populate_indicators(ohlcv.iloc[:window].copy(), metadata)
+    compute = mocker.spy(engine, "compute_indicators")
+    # Like the live candles once the window holds the exchange candle limit, over a couple of resyncs
+    for start in range(1, 2 * engine.INCREMENTAL_RESYNC_CANDLES + 10):
+        frame = dry_run_strategy.populate_indicators(ohlcv.iloc[start : start + window].copy(), metadata)
+
+        # The streamed indicators carry on from the first window, so they're those of every candle since
+        expected = engine.compute_indicators(ohlcv.iloc[: start + window], params, columns).iloc[-window:]
+        assert_indicators_close(frame, expected, ohlcv)
+
+    assert compute.call_count == 2 * engine.INCREMENTAL_RESYNC_CANDLES + 9
+
+
+def test_streaming_resyncs(mocker, ohlcv, dry_run_strategy):
+    compute = mocker.spy(engine, "compute_indicators")
+    resync = mocker.spy(IncrementalIndicators, "resync")
+    metadata = {"pair": "BTC/BUSD"}
+    for start in range(0, 2 + engine.INCREMENTAL_RESYNC_CANDLES):
+        dry_run_strategy.populate_indicators(ohlcv.iloc[start : start + 1000].copy(), metadata)
+
+    # Only the rolling windows are seeded again, the indicators are not recomputed
+    assert compute.call_count == 1
+    assert resync.call_count == 1
+    cached = engine._INDICATORS_CACHE[
+        (metadata["pair"], dry_run_strategy.timeframe)
+    ]  # pylint: disable=protected-access
+    assert cached.state.updates == 1
+
+
+def test_streams_by_default(mocker, ohlcv, saturn5):
+    saturn5.config["runmode"] = RunMode.DRY_RUN
+    compute = mocker.spy(engine, "compute_indicators")
+    for end in range(1000, 1005):
+        saturn5.populate_indicators(ohlcv.iloc[:end].copy(), {"pair": "BTC/BUSD"})
+
+    assert compute.call_count == 1
+
+
+def test_no_streaming_when_backtesting(mocker, ohlcv, apollo11):
+    compute = mocker.spy(engine, "compute_indicators")
+    metadata = {"pair": "BTC/BUSD"}
+    for end in range(1000, 1005):
+        apollo11.populate_indicators(ohlcv.iloc[:end].copy(), metadata)
+
+    assert compute.call_count == 5
+
+
+def test_streaming_keeps_the_computed_indicators(ohlcv, dry_run_strategy):
+    metadata = {"pair": "BTC/BUSD"}
+    computed = dry_run_strategy.populate_indicators(ohlcv.iloc[:600].copy(), metadata)
+
+    for end in range(601, 604):
+        frame = dry_run_strategy.populate_indicators(ohlcv.iloc[:end].copy(), metadata)
+
+    for column in engine.required_indicators(dry_run_strategy):
+        np.testing.assert_array_equal(frame[column].to_numpy()[:600], computed[column].to_numpy(), err_msg=column)
+        assert not np.isnan(frame[column].to_numpy()[-3:]).any(), column
+
+
+def test_streamed_indicators_held_in_a_fixed_ring(ohlcv, dry_run_strategy):
+    metadata = {"pair": "BTC/BUSD"}
+    key = (metadata["pair"], dry_run_strategy.timeframe)
+    dry_run_strategy.populate_indicators(ohlcv.iloc[:600].copy(), metadata)
+    ring = engine._INDICATORS_CACHE[key].ring  # pylint: disable=protected-access
+    storage = ring._values  # pylint: disable=protected-access
+
+    for end in range(601, 601 + engine.INCREMENTAL_RESYNC_CANDLES):
+        frame = dry_run_strategy.populate_indicators(ohlcv.iloc[:end].copy(), metadata)
+
+    cached = engine._INDICATORS_CACHE[key]  # pylint: disable=protected-access
+    assert cached.ring is ring
+    assert ring._values is storage  # pylint: disable=protected-access
+    assert ring.capacity == 600 + engine.INCREMENTAL_RING_HEADROOM
+    for column in ring.columns:
+        np.testing.assert_array_equal(ring.window(column, len(frame)), frame[column].to_numpy(), err_msg=column)
+        # The dataframe has its own copy
+        assert not np.shares_memory(frame[column].to_numpy(), storage), column
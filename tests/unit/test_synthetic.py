@@ -0,0 +1,163 @@
+# pylint: disable=redefined-outer-name
+import json
+from pathlib import Path
+
+import ccxt
+import numpy as np
+import pandas as pd
+import pytest
+from freqtrade.data.history import load_pair_history
+from pandas.testing import assert_frame_equal
+
+from goddard import engine
+from tests.backtests import synthetic
+from tests.backtests.helpers import backtest_cmdline
+from tests.backtests.synthetic import CANDLES_PER_DAY
+from tests.backtests.synthetic import exchange_pairs
+from tests.backtests.synthetic import generate_candles
+from tests.backtests.synthetic import main
+from tests.backtests.synthetic import read_pairs_file
+from tests.backtests.synthetic import resample
+from tests.backtests.synthetic import write_exchange_data
+
+DAYS = 60
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def load_markets(exchange):
+        raise ccxt.NetworkError(f"{exchange} is unreachable")
+
+    monkeypatch.setattr(synthetic, "load_markets", load_markets)
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return generate_candles(seed=3, candles=DAYS * CANDLES_PER_DAY)
+
+
+def test_deterministic(candles):
+    assert_frame_equal(generate_candles(seed=3, candles=DAYS * CANDLES_PER_DAY), candles)
+    assert not generate_candles(seed=4, candles=DAYS * CANDLES_PER_DAY)["close"].equals(candles["close"])
+
+
+def test_candles_are_consistent(candles):
+    assert (candles["low"] <= candles[["open", "close"]].min(axis=1)).all()
+    assert (candles["high"] >= candles[["open", "close"]].max(axis=1)).all()
+    assert (candles["date"].diff().dropna() == pd.Timedelta(minutes=5)).all()
+    volume = candles["volume"]
+    assert 0 < (volume == 0).sum() < len(volume) * 0.05
+    # Volume spikes
+    assert volume.max() > 10 * volume[volume > 0].median()
+
+
+def test_resample(candles):
+    resampled = resample(candles, "15m")
+
+    assert len(resampled) == len(candles) // 3
+    assert (resampled["date"].diff().dropna() == pd.Timedelta(minutes=15)).all()
+    np.testing.assert_array_equal(resampled["open"], candles["open"].to_numpy()[::3])
+    np.testing.assert_array_equal(resampled["close"], candles["close"].to_numpy()[2::3])
+    np.testing.assert_array_equal(resampled["high"], candles["high"].to_numpy().reshape(-1, 3).max(axis=1))
+    np.testing.assert_array_equal(resampled["low"], candles["low"].to_numpy().reshape(-1, 3).min(axis=1))
+    np.testing.assert_allclose(resampled["volume"], candles["volume"].to_numpy().reshape(-1, 3).sum(axis=1))
+
+
+@pytest.mark.parametrize("strategy", ["apollo11", "saturn5"])
+def test_every_buy_signal_fires(request, strategy):
+    strategy = request.getfixturevalue(strategy)
+    tags = set()
+    for seed in range(5):
+        engine.clear_cache()
+        dataframe = generate_candles(seed=seed, candles=DAYS * CANDLES_PER_DAY, timeframe="15m")
+        dataframe = strategy.populate_indicators(dataframe, {"pair": f"PAIR{seed}/USDT"})
+        dataframe = strategy.populate_buy_trend(dataframe, {"pair": f"PAIR{seed}/USDT"})
+        tags.update(dataframe["buy_tag"].dropna())
+    assert tags == set(engine.BUY_SIGNALS)
+
+
+def test_exchange_pairs(offline):
+    assert exchange_pairs(3, "binance", "busd") == ["BTC/BUSD", "ETH/BUSD", "XRP/BUSD"]
+    assert exchange_pairs(len(synthetic.KNOWN_BASES)) == [f"{base}/USDT" for base in synthetic.KNOWN_BASES]
+    with pytest.raises(ValueError):
+        exchange_pairs(len(synthetic.KNOWN_BASES) + 1)
+
+
+def test_exchange_pairs_from_the_markets(monkeypatch):
+    markets = {
+        "AAA/USDT": {"spot": True, "active": True, "quote": "USDT"},
+        "ETH/USDT": {"spot": True, "active": True, "quote": "USDT"},
+        "BTC/USDT": {"spot": True, "active": True, "quote": "USDT"},
+        "ZZZ/USDT": {"spot": True, "active": True, "quote": "USDT"},
+        "OLD/USDT": {"spot": True, "active": False, "quote": "USDT"},
+        "BTC/USDT:USDT": {"spot": False, "active": True, "quote": "USDT"},
+        "BTC/BUSD": {"spot": True, "active": False, "quote": "BUSD"},
+    }
+    monkeypatch.setattr(synthetic, "load_markets", lambda exchange: markets)
+
+    assert exchange_pairs(4, "kucoin", "usdt", markets=True) == ["BTC/USDT", "ETH/USDT", "AAA/USDT", "ZZZ/USDT"]
+    with pytest.raises(ValueError):
+        exchange_pairs(5, "kucoin", "usdt", markets=True)
+    # Inactive markets are left out
+    with pytest.raises(ValueError):
+        exchange_pairs(1, "kucoin", "busd", markets=True)
+
+
+def test_read_pairs_file(tmp_path):
+    busd = read_pairs_file(Path(__file__).parents[2] / "alternative_configs" / "whitelist_busd.json")
+    assert len(busd) > len(synthetic.KNOWN_BASES)
+    assert all(pair.endswith("/BUSD") for pair in busd)
+
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"exchange": {"pair_whitelist": ["BTC/USDT"]}}))
+    assert read_pairs_file(config) == ["BTC/USDT"]
+    config.write_text(json.dumps({"exchange": {"name": "binance"}}))
+    with pytest.raises(ValueError):
+        read_pairs_file(config)
+
+
+def test_write_exchange_data(tmp_path, offline):
+    data_root = tmp_path / "data"
+
+    pairs = write_exchange_data(data_root, exchange="binance", stake_currency="usdt", pairs=3, days=2, processes=1)
+
+    assert pairs == ["BTC/USDT", "ETH/USDT", "XRP/USDT"]
+    # Every file a backtest of the generated data passes to freqtrade exists
+    cmdline = backtest_cmdline(
+        exchange="binance",
+        stake_currency="usdt",
+        strategies=["Apollo11"],
+        timerange="20210101-20210103",
+        results_file=tmp_path / "results.json",
+        data_root=data_root,
+    )
+    assert f"--datadir={data_root / 'binance'}" in cmdline
+    configs = [arg.split("=", 1)[1] for arg in cmdline if arg.startswith("--config=")]
+    assert len(configs) == 3
+    static = json.loads((data_root / "binance-usdt-static.json").read_text())
+    assert static["exchange"]["pair_whitelist"] == pairs
+    for config in configs:
+        assert json.loads(Path(config).read_text())
+
+    for pair in pairs:
+        for timeframe, candles in (("5m", 2 * CANDLES_PER_DAY), ("15m", 2 * CANDLES_PER_DAY // 3)):
+            frame = load_pair_history(pair, timeframe, data_root / "binance", data_format="jsongz")
+            assert len(frame) == candles
+    # Regenerating gives the same candles
+    again = tmp_path / "again"
+    write_exchange_data(again, exchange="binance", stake_currency="usdt", pairs=3, days=2, processes=1)
+    for pair in pairs:
+        assert_frame_equal(
+            load_pair_history(pair, "15m", again / "binance", data_format="jsongz"),
+            load_pair_history(pair, "15m", data_root / "binance", data_format="jsongz"),
+        )
+
+
+def test_main_pairs_file(tmp_path, offline):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"pair_whitelist": ["ADA/BUSD", "BNB/BUSD"]}))
+
+    assert main([str(tmp_path / "data"), "--stake-currency", "busd", "--days", "1", "--pairs-file", str(config)]) == 0
+
+    static = json.loads((tmp_path / "data" / "binance-busd-static.json").read_text())
+    assert static["exchange"]["pair_whitelist"] == ["ADA/BUSD", "BNB/BUSD"]
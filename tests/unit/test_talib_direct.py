@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+import talib
+import talib.abstract as ta
+
+from goddard import talib_direct
+
+
+def test_resolve():
+    assert talib_direct.resolve(ta.ATR) == talib_direct.DirectFunction(
+        name="ATR", func=talib.ATR, inputs=("high", "low", "close"), outputs=("real",)
+    )
+    assert talib_direct.resolve(ta.EMA).inputs == ("close",)
+    assert talib_direct.resolve(ta.BBANDS).outputs == ("upperband", "middleband", "lowerband")
+
+
+def test_candle_arrays(ohlcv):
+    ohlcv = ohlcv.astype({"volume": np.float32})
+
+    arrays = talib_direct.candle_arrays(ohlcv)
+
+    assert list(arrays) == ["open", "high", "low", "close", "volume"]
+    for column, values in arrays.items():
+        assert values.dtype == np.float64
+        assert values.flags.c_contiguous
+        np.testing.assert_array_equal(values, ohlcv[column].to_numpy(dtype=np.float64))
+
+
+@pytest.mark.parametrize(
+    "function,params",
+    [
+        (ta.EMA, {"timeperiod": 50}),
+        (ta.SMA, {"timeperiod": 20}),
+        (ta.STDDEV, {"timeperiod": 20, "nbdev": 1.0}),
+        (ta.ATR, {"timeperiod": 14}),
+    ],
+)
+def test_call_matches_abstract(ohlcv, function, params):
+    result = talib_direct.call(function, talib_direct.candle_arrays(ohlcv), **params)
+
+    np.testing.assert_array_equal(result, function(ohlcv, **params).to_numpy())
+
+
+def test_call_on_a_series(ohlcv):
+    volume_close = ohlcv["volume"] * ohlcv["close"]
+
+    result = talib_direct.call(ta.EMA, volume_close, timeperiod=12)
+
+    np.testing.assert_array_equal(result, ta.EMA(volume_close, timeperiod=12))
+
+
+def test_call_several_outputs(ohlcv):
+    upper, middle, lower = talib_direct.call(ta.BBANDS, talib_direct.candle_arrays(ohlcv), timeperiod=20)
+
+    expected = ta.BBANDS(ohlcv, timeperiod=20)
+    assert isinstance(expected, pd.DataFrame)
+    np.testing.assert_array_equal(upper, expected["upperband"].to_numpy())
+    np.testing.assert_array_equal(middle, expected["middleband"].to_numpy())
+    np.testing.assert_array_equal(lower, expected["lowerband"].to_numpy())
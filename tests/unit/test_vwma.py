@@ -0,0 +1,38 @@
+import numpy as np
+import talib.abstract as ta
+
+from goddard.vwma import vwma_bank
+
+
+def talib_vwma(dataframe, period):
+    return ta.EMA(dataframe["volume"] * dataframe["close"], period) / ta.EMA(dataframe["volume"], period)
+
+
+def test_matches_talib_abstract(ohlcv):
+    periods = (10, 20, 12, 26)
+    bank = vwma_bank(ohlcv["close"].to_numpy(), ohlcv["volume"].to_numpy(), periods)
+
+    assert bank.values.shape == (len(ohlcv), len(periods))
+    for column, period in enumerate(periods):
+        expected = talib_vwma(ohlcv, period)
+        np.testing.assert_array_equal(bank.values[:, column], expected)
+        np.testing.assert_array_equal(bank.period(period), expected)
+
+    vwmacd = talib_vwma(ohlcv, 12) - talib_vwma(ohlcv, 26)
+    signal = ta.EMA(vwmacd, 9)
+    np.testing.assert_array_equal(bank.vwmacd, vwmacd)
+    np.testing.assert_array_equal(bank.signal, signal)
+    np.testing.assert_array_equal(bank.hist, vwmacd - signal)
+
+
+def test_repeated_periods(ohlcv):
+    bank = vwma_bank(ohlcv["close"].to_numpy(), ohlcv["volume"].to_numpy(), (12, 12, 30))
+    np.testing.assert_array_equal(bank.values[:, 0], bank.values[:, 1])
+    np.testing.assert_array_equal(bank.values[:, 2], talib_vwma(ohlcv, 30))
+
+
+def test_leading_candles_without_volume(ohlcv):
+    ohlcv.loc[:99, "volume"] = 0
+    bank = vwma_bank(ohlcv["close"].to_numpy(), ohlcv["volume"].to_numpy(), (10,))
+    np.testing.assert_array_equal(bank.period(10), talib_vwma(ohlcv, 10))
+    np.testing.assert_array_equal(bank.signal, ta.EMA(talib_vwma(ohlcv, 12) - talib_vwma(ohlcv, 26), 9))